@@ -127,11 +127,12 @@ def get_session_extensions(session_id: str) -> list[dict[str, Any]]:
 
     cursor.execute("""
         SELECT
-            LOWER(file_extension) as extension,
+            LOWER(e.value) as extension,
             COUNT(*) as count
-        FROM files
-        WHERE session_id = ? AND file_extension IS NOT NULL
-        GROUP BY LOWER(file_extension)
+        FROM files f
+        JOIN extensions e ON f.extension_id = e.id
+        WHERE f.session_id = ?
+        GROUP BY LOWER(e.value)
         ORDER BY count DESC
         LIMIT 10
     """, (session_id,))
@@ -35,16 +35,17 @@ def get_labeling_session_data(db_path: str, ml_session: str) -> List[Dict]:
     SELECT
         f.original_path,
         f.filename,
-        f.file_extension,
-        f.mime_type,
+        e.value as file_extension,
+        m.value as mime_type,
         f.file_size,
         f.schema_type,
-        f.extracted_text,
         f.extracted_text_length,
         c.name as subcategory,
         c.full_path as full_category_path,
         f.session_id
     FROM files f
+    LEFT JOIN extensions e ON f.extension_id = e.id
+    LEFT JOIN mime_types m ON f.mime_type_id = m.id
     JOIN file_categories fc ON f.id = fc.file_id
     JOIN categories c ON fc.category_id = c.id
     WHERE f.session_id <> ?
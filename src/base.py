@@ -9,6 +9,7 @@ from abc import ABC, abstractmethod
 from datetime import datetime
 from typing import Any, Dict, List, Optional, Union
 from enum import Enum
+import copy
 import json
 import uuid
 
@@ -531,6 +532,24 @@ class SchemaOrgBase(ABC):
 
         return min(present / len(required) if required else 1.0, 1.0)
 
+    def __copy__(self) -> 'SchemaOrgBase':
+        """
+        Copy the generator so the copy can be filled in independently.
+
+        ``data`` is deep-copied, since setters extend nested lists and
+        dicts in place. The copy keeps the original @id; call ``set_id``
+        if it describes a different entity.
+
+        Returns:
+            New generator of the same class
+        """
+        clone = self.__class__.__new__(self.__class__)
+        clone.__dict__.update(self.__dict__)
+        clone.data = copy.deepcopy(self.data)
+        clone._required_properties = list(self._required_properties)
+        clone._recommended_properties = list(self._recommended_properties)
+        return clone
+
     def __str__(self) -> str:
         """String representation."""
         return self.to_json_ld()
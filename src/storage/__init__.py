@@ -14,6 +14,7 @@ from .models import (
     Location,
     OrganizationSession,
     FileRelationship,
+    DuplicateGroup,
     CostRecord,
     SchemaMetadata,
     KeyValueStore,
@@ -31,6 +32,7 @@ __all__ = [
     'Location',
     'OrganizationSession',
     'FileRelationship',
+    'DuplicateGroup',
     'CostRecord',
     'SchemaMetadata',
     'KeyValueStore',
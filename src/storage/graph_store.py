@@ -6,24 +6,239 @@ Provides high-level operations for managing files, categories, and their
 relationships using a graph-like structure built on SQLAlchemy.
 """
 
+import atexit
+import hashlib
+import queue
+import sqlite3
+import threading
+import time
 import uuid
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional, Any, Tuple, Union
+from typing import Dict, Iterable, Iterator, List, Optional, Any, Tuple, Union
 from collections import defaultdict
 
-from sqlalchemy import create_engine, event, func, and_, or_, text
-from sqlalchemy.orm import Session, sessionmaker, joinedload
+from sqlalchemy import (
+    create_engine, delete, event, func, and_, insert, lambda_stmt, select, text, update
+)
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session, sessionmaker, joinedload, lazyload, selectinload
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.pool import StaticPool
 
 from .models import (
     Base, File, Category, Company, Person, Location,
-    OrganizationSession, FileRelationship, CostRecord,
-    SchemaMetadata, KeyValueStore, FileStatus, RelationshipType,
-    file_categories, file_companies, file_people, file_locations
+    OrganizationSession, FileRelationship, CostRecord, DuplicateGroup,
+    SchemaMetadata, KeyValueStore, FileStatus, RelationshipType, FileExtractedText, Extension,
+    file_categories, file_companies, file_people, file_locations, decompress_text,
+    SEARCH_MIN_QUERY, SEARCH_TABLE, create_canonical_id_trigger, create_search_index,
+    rebuild_search_index, search_index_available, create_location_index,
+    rebuild_location_index, location_index_available, locations_rtree
 )
 
 
+# Session.info key counting open GraphStore.transaction() scopes
+_DEFERRED_COMMIT = 'graph_store_deferred_commit'
+
+# INSERT ... RETURNING needs SQLite 3.35; older builds insert, then select
+SQLITE_RETURNING = sqlite3.sqlite_version_info >= (3, 35)
+
+
+class HashBloomFilter:
+    """
+    Bloom filter over SHA-256 content hashes.
+
+    Bit positions are cut from the hex digest itself, so membership tests
+    need no extra hashing. 2**24 bits (2MB) with 10 probes keeps false
+    positives near 0.1% up to about a million hashes.
+    """
+
+    BITS = 1 << 24
+    PROBES = 10
+
+    def __init__(self):
+        self._bits = bytearray(self.BITS // 8)
+
+    @classmethod
+    def _positions(cls, content_hash: str) -> List[int]:
+        if len(content_hash) == 64:
+            try:
+                return [int(content_hash[i * 6:i * 6 + 6], 16) for i in range(cls.PROBES)]
+            except ValueError:
+                pass  # Not a hex digest; hash it like any other value
+        content_hash = hashlib.sha256(content_hash.encode()).hexdigest()
+        return [int(content_hash[i * 6:i * 6 + 6], 16) for i in range(cls.PROBES)]
+
+    def add(self, content_hash: str) -> None:
+        bits = self._bits
+        for pos in self._positions(content_hash):
+            bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, content_hash: str) -> bool:
+        bits = self._bits
+        return all(bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(content_hash))
+
+
+class CostRecordSink:
+    """
+    Background writer for cost records.
+
+    Records are queued by the caller and written by a worker thread in
+    Core executemany batches, every ``flush_interval`` seconds or every
+    ``max_batch`` rows, so cost logging stays off the processing loop.
+    """
+
+    # Every row carries the same keys so a batch is one executemany
+    DEFAULTS = {
+        'session_id': None,
+        'file_id': None,
+        'cost': 0.0,
+        'success': True,
+        'error_message': None,
+    }
+
+    _STOP = object()
+
+    def __init__(self, engine, flush_interval: float = 1.0, max_batch: int = 5000):
+        """
+        Start the writer thread.
+
+        Args:
+            engine: Engine to write through
+            flush_interval: Seconds between flushes of a partial batch
+            max_batch: Rows that trigger an immediate flush
+        """
+        self.engine = engine
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self._queue: queue.Queue = queue.Queue()
+        self._error: Optional[Exception] = None
+        self._thread = threading.Thread(target=self._run, name='cost-record-sink', daemon=True)
+        self._thread.start()
+
+    def put(self, record: Dict[str, Any]) -> None:
+        """
+        Queue a cost record.
+
+        Args:
+            record: CostRecord column values; ``feature_name`` and
+                ``processing_time_sec`` are required
+        """
+        self._queue.put({**self.DEFAULTS, **record})
+
+    def flush(self) -> None:
+        """
+        Block until every record queued so far is written.
+
+        Raises:
+            Exception: The first error a background write hit since the
+                last flush, once the rest of the queue is written
+        """
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait()
+        self._raise_error()
+
+    def close(self) -> None:
+        """Write what is queued and stop the writer thread (raises like ``flush``)."""
+        if self._thread.is_alive():
+            self._queue.put(self._STOP)
+            self._thread.join()
+        self._raise_error()
+
+    def _raise_error(self) -> None:
+        error, self._error = self._error, None
+        if error is not None:
+            raise error
+
+    def _run(self) -> None:
+        batch: List[Dict[str, Any]] = []
+        deadline = time.monotonic() + self.flush_interval
+        while True:
+            try:
+                item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                item = None
+
+            if item is self._STOP:
+                self._write(batch)
+                return
+            if isinstance(item, threading.Event):
+                self._write(batch)
+                batch = []
+                item.set()
+                continue
+            if item is not None:
+                batch.append(item)
+
+            if len(batch) >= self.max_batch or time.monotonic() >= deadline:
+                self._write(batch)
+                batch = []
+                deadline = time.monotonic() + self.flush_interval
+
+    def _write(self, batch: List[Dict[str, Any]]) -> None:
+        if not batch:
+            return
+        try:
+            with self.engine.begin() as conn:
+                conn.execute(insert(CostRecord.__table__), batch)
+        except Exception as e:
+            # Surfaced to the caller by the next flush() or close()
+            if self._error is None:
+                self._error = e
+
+
+class InlineCostRecordSink(CostRecordSink):
+    """
+    Cost record writer for a store on one shared connection.
+
+    A ':memory:' store has a single DBAPI connection behind a StaticPool,
+    so a worker thread, or any second pool checkout, would commit or roll
+    back whatever transaction the caller has open on it. Records are
+    buffered instead and written on the caller's thread straight onto
+    that connection, joining an open transaction rather than ending it.
+    """
+
+    COLUMNS = ('feature_name', 'processing_time_sec', *CostRecordSink.DEFAULTS)
+
+    def __init__(self, dbapi_connection, max_batch: int = 5000):
+        """
+        Set up the write buffer.
+
+        Args:
+            dbapi_connection: The store's shared DBAPI connection
+            max_batch: Rows that trigger an immediate write
+        """
+        self.connection = dbapi_connection
+        self.max_batch = max_batch
+        self._batch: List[Tuple[Any, ...]] = []
+        self._sql = (
+            f"INSERT INTO {CostRecord.__tablename__} ({', '.join(self.COLUMNS)}) "
+            f"VALUES ({', '.join('?' * len(self.COLUMNS))})"
+        )
+
+    def put(self, record: Dict[str, Any]) -> None:
+        record = {**self.DEFAULTS, **record}
+        self._batch.append(tuple(record[column] for column in self.COLUMNS))
+        if len(self._batch) >= self.max_batch:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write the buffered records, committing only if no transaction is open."""
+        if not self._batch:
+            return
+        batch, self._batch = self._batch, []
+        joined = self.connection.in_transaction
+        self.connection.executemany(self._sql, batch)
+        if not joined:
+            self.connection.commit()
+
+    def close(self) -> None:
+        """Write the buffered records."""
+        self.flush()
+
+
 class GraphStore:
     """
     High-level interface for graph-based file storage.
@@ -35,35 +250,133 @@ class GraphStore:
     - Statistics and aggregations
     """
 
+    # File collections eager-loaded by default (see File relationships)
+    FILE_COLLECTIONS = ('categories', 'companies', 'people', 'locations')
+
     def __init__(self, db_path: str = 'results/file_organization.db'):
         """
         Initialize the graph store.
 
         Args:
-            db_path: Path to SQLite database
+            db_path: Path to SQLite database, or ':memory:' for a private
+                in-memory database
         """
         self.db_path = db_path
-        self.engine = create_engine(f'sqlite:///{db_path}', echo=False)
+        self._memory_connection = None
+        if db_path == ':memory:':
+            # One connection shared by every session and thread, so they
+            # all see the same in-memory database
+            self.engine = create_engine(
+                'sqlite://', echo=False,
+                connect_args={'check_same_thread': False}, poolclass=StaticPool
+            )
+        else:
+            self.engine = create_engine(f'sqlite:///{db_path}', echo=False)
 
         # Enable SQLite optimizations
         @event.listens_for(self.engine, "connect")
         def set_sqlite_pragma(dbapi_connection, connection_record):
             cursor = dbapi_connection.cursor()
             cursor.execute("PRAGMA foreign_keys=ON")
-            cursor.execute("PRAGMA journal_mode=WAL")
-            cursor.execute("PRAGMA synchronous=NORMAL")
+            if db_path != ':memory:':
+                cursor.execute("PRAGMA journal_mode=WAL")
+                cursor.execute("PRAGMA synchronous=NORMAL")  # WAL keeps this crash-safe
+            cursor.execute("PRAGMA temp_store=MEMORY")
             cursor.execute("PRAGMA cache_size=-64000")  # 64MB cache
+            cursor.execute("PRAGMA busy_timeout=5000")  # Wait on writers sharing the file
             cursor.close()
+            if db_path == ':memory:':
+                # StaticPool connects once; cost records are written onto it directly
+                self._memory_connection = dbapi_connection
 
         # Create tables
         Base.metadata.create_all(self.engine)
+        with self.engine.begin() as connection:
+            create_canonical_id_trigger(connection)
+            if create_search_index(connection):
+                rebuild_search_index(connection)
+            if create_location_index(connection):
+                rebuild_location_index(connection)
 
         # Session factory
         self.SessionLocal = sessionmaker(bind=self.engine)
 
-    def get_session(self) -> Session:
-        """Get a new database session."""
-        return self.SessionLocal()
+        # Content hashes seen, seeded on first duplicate check
+        self._hash_bloom: Optional[HashBloomFilter] = None
+
+        # Cost record writer, started on first record_cost
+        self._cost_sink: Optional[CostRecordSink] = None
+
+    def get_session(self, **options) -> Session:
+        """
+        Get a new database session.
+
+        Args:
+            **options: Overrides for the session factory defaults
+                (e.g. ``autoflush=False, expire_on_commit=False`` for bulk loads)
+        """
+        return self.SessionLocal(**options)
+
+    @contextmanager
+    def transaction(self, session: Session = None) -> Iterator[Session]:
+        """
+        Run a series of operations as one transaction.
+
+        Operations given the yielded session flush instead of committing,
+        and everything is committed once on exit (rolled back on error),
+        so N writes cost one commit instead of N. Scopes may nest; only
+        the outermost one commits.
+
+        Args:
+            session: Optional existing session
+
+        Yields:
+            Session to pass to the store's operations
+        """
+        close_session = session is None
+        session = session or self.get_session()
+        depth = session.info.get(_DEFERRED_COMMIT, 0)
+        session.info[_DEFERRED_COMMIT] = depth + 1
+        try:
+            yield session
+            if not depth:
+                session.commit()
+        except Exception:
+            if not depth:
+                session.rollback()
+            raise
+        finally:
+            session.info[_DEFERRED_COMMIT] = depth
+            if close_session:
+                session.close()
+
+    @staticmethod
+    def _commit(session: Session) -> None:
+        """Commit, or only flush inside a ``transaction()`` scope."""
+        if session.info.get(_DEFERRED_COMMIT):
+            session.flush()
+        else:
+            session.commit()
+
+    def optimize(self) -> None:
+        """Refresh stale query planner statistics (``PRAGMA optimize``)."""
+        with self.engine.connect() as conn:
+            conn.exec_driver_sql("PRAGMA optimize")
+
+    def close(self) -> None:
+        """
+        Shut the store down after a run.
+
+        Writes queued cost records (re-raising a failed write), refreshes planner statistics so the
+        next run plans against the data just loaded, and releases the
+        pooled connections.
+        """
+        try:
+            if self._cost_sink is not None:
+                self._cost_sink.close()
+        finally:
+            self.optimize()
+            self.engine.dispose()
 
     # =========================================================================
     # File Operations
@@ -74,6 +387,7 @@ class GraphStore:
         original_path: str,
         filename: str,
         session: Session = None,
+        file_id: str = None,
         **kwargs
     ) -> File:
         """
@@ -83,6 +397,8 @@ class GraphStore:
             original_path: Original file path
             filename: File name
             session: Optional existing session
+            file_id: ``File.generate_id(original_path)``, if the caller
+                already has it
             **kwargs: Additional file properties
 
         Returns:
@@ -92,7 +408,7 @@ class GraphStore:
         session = session or self.get_session()
 
         try:
-            file_id = File.generate_id(original_path)
+            file_id = file_id or File.generate_id(original_path)
 
             # Check if file already exists
             existing = session.query(File).filter(File.id == file_id).first()
@@ -101,20 +417,25 @@ class GraphStore:
                 for key, value in kwargs.items():
                     if hasattr(existing, key):
                         setattr(existing, key, value)
-                session.commit()
+                self._join_duplicate_group(session, existing)
+                self._commit(session)
+                if self._hash_bloom is not None and existing.content_hash:
+                    self._hash_bloom.add(existing.content_hash)
                 return existing
 
-            # Create new file with canonical ID
+            # Create new file; SQLite derives its canonical ID
             file = File(
                 id=file_id,
-                canonical_id=File.generate_canonical_id(original_path),
                 original_path=original_path,
                 filename=filename,
                 file_extension=Path(filename).suffix.lower() if filename else None,
                 **kwargs
             )
+            self._join_duplicate_group(session, file)
             session.add(file)
-            session.commit()
+            self._commit(session)
+            if self._hash_bloom is not None and file.content_hash:
+                self._hash_bloom.add(file.content_hash)
             return file
 
         except Exception as e:
@@ -124,7 +445,82 @@ class GraphStore:
             if close_session:
                 session.close()
 
-    def get_file(self, file_id: str = None, path: str = None, session: Session = None) -> Optional[File]:
+    def add_files(self, rows: List[Dict[str, Any]], session: Session = None) -> List[File]:
+        """
+        Add many files with one existence query and one batched INSERT.
+
+        Behaves like calling ``add_file`` for each row, but existing files
+        are looked up together, new ones are flushed as a single
+        executemany, and everything is committed once.
+
+        Args:
+            rows: Dicts of ``add_file`` arguments; each needs
+                ``original_path`` and ``filename``
+            session: Optional existing session
+
+        Returns:
+            File objects in row order
+        """
+        close_session = session is None
+        session = session or self.get_session()
+
+        try:
+            ids = [File.generate_id(row['original_path']) for row in rows]
+            files = {
+                file.id: file
+                for file in session.query(File).filter(File.id.in_(set(ids)))
+            }
+
+            new_files = []
+            for file_id, row in zip(ids, rows):
+                file = files.get(file_id)
+                if file is not None:
+                    # Existing file, or a repeat within this batch
+                    for key, value in row.items():
+                        if key != 'original_path' and hasattr(file, key):
+                            setattr(file, key, value)
+                    continue
+
+                kwargs = dict(row)
+                original_path = kwargs.pop('original_path')
+                filename = kwargs.pop('filename')
+                file = files[file_id] = File(
+                    id=file_id,
+                    original_path=original_path,
+                    filename=filename,
+                    file_extension=Path(filename).suffix.lower() if filename else None,
+                    **kwargs
+                )
+                new_files.append(file)
+
+            session.add_all(new_files)
+            session.flush()
+
+            hashed = [files[file_id] for file_id in dict.fromkeys(ids)
+                      if files[file_id].content_hash]
+            if self._hash_bloom is not None:
+                for file in hashed:
+                    self._hash_bloom.add(file.content_hash)
+            for file in hashed:
+                self._join_duplicate_group(session, file)
+
+            self._commit(session)
+            return [files[file_id] for file_id in ids]
+
+        except Exception as e:
+            session.rollback()
+            raise e
+        finally:
+            if close_session:
+                session.close()
+
+    def get_file(
+        self,
+        file_id: str = None,
+        path: str = None,
+        session: Session = None,
+        load_relations: Optional[Iterable[str]] = None
+    ) -> Optional[File]:
         """
         Get a file by ID or path.
 
@@ -132,6 +528,9 @@ class GraphStore:
             file_id: File ID (hash)
             path: Original file path
             session: Optional existing session
+            load_relations: Entity collections to load with the file, e.g.
+                ``('categories',)``; the others are left to load lazily.
+                By default all of them are loaded (one SELECT IN each).
 
         Returns:
             File object or None
@@ -140,12 +539,20 @@ class GraphStore:
         session = session or self.get_session()
 
         try:
-            if file_id:
-                return session.query(File).filter(File.id == file_id).first()
-            elif path:
+            if not file_id:
+                if not path:
+                    return None
                 file_id = File.generate_id(path)
-                return session.query(File).filter(File.id == file_id).first()
-            return None
+            if load_relations is not None:
+                wanted = set(load_relations)
+                stmt = select(File).where(File.id == file_id).options(*(
+                    (selectinload if name in wanted else lazyload)(getattr(File, name))
+                    for name in self.FILE_COLLECTIONS
+                ))
+            else:
+                # Built once and cached by the lambda's code; only file_id varies
+                stmt = lambda_stmt(lambda: select(File).where(File.id == file_id))
+            return session.execute(stmt).scalar_one_or_none()
         finally:
             if close_session:
                 session.close()
@@ -187,7 +594,7 @@ class GraphStore:
             if status:
                 query = query.filter(File.status == status)
             if extension:
-                query = query.filter(File.file_extension == extension.lower())
+                query = query.join(File.extension_row).filter(Extension.value == extension.lower())
             if category:
                 query = query.join(File.categories).filter(Category.name == category)
             if company:
@@ -234,7 +641,7 @@ class GraphStore:
             if status == FileStatus.ORGANIZED:
                 file.organized_at = datetime.utcnow()
 
-            session.commit()
+            self._commit(session)
             return True
 
         except Exception as e:
@@ -318,7 +725,8 @@ class GraphStore:
         category_name: str,
         subcategory_name: str = None,
         confidence: float = 1.0,
-        session: Session = None
+        session: Session = None,
+        file: File = None
     ) -> bool:
         """
         Associate a file with a category.
@@ -329,6 +737,7 @@ class GraphStore:
             subcategory_name: Optional subcategory
             confidence: Classification confidence
             session: Optional existing session
+            file: Already-loaded file in ``session``; skips the lookup by ID
 
         Returns:
             True if successful
@@ -337,7 +746,8 @@ class GraphStore:
         session = session or self.get_session()
 
         try:
-            file = session.query(File).filter(File.id == file_id).first()
+            if file is None:
+                file = session.query(File).filter(File.id == file_id).first()
             if not file:
                 return False
 
@@ -381,29 +791,29 @@ class GraphStore:
         session = session or self.get_session()
 
         try:
-            categories = session.query(Category).order_by(Category.level, Category.name).all()
-
-            # Build tree structure
-            tree = []
-            category_map = {c.id: c for c in categories}
+            # Every category comes back in this one query, so the tree is
+            # linked by parent_id here rather than through subcategories
+            categories = session.query(Category)\
+                .options(lazyload(Category.subcategories))\
+                .order_by(Category.level, Category.name)\
+                .all()
 
+            children = defaultdict(list)
             for category in categories:
-                if category.parent_id is None:
-                    tree.append(self._build_category_node(category, category_map))
+                children[category.parent_id].append(category)
 
-            return tree
+            return [self._build_category_node(root, children) for root in children[None]]
 
         finally:
             if close_session:
                 session.close()
 
-    def _build_category_node(self, category: Category, category_map: Dict) -> Dict[str, Any]:
+    def _build_category_node(self, category: Category, children: Dict) -> Dict[str, Any]:
         """Build a category tree node recursively."""
         node = category.to_dict()
-        node['subcategories'] = []
-
-        for sub in category.subcategories:
-            node['subcategories'].append(self._build_category_node(sub, category_map))
+        node['subcategories'] = [
+            self._build_category_node(sub, children) for sub in children[category.id]
+        ]
 
         return node
 
@@ -411,6 +821,30 @@ class GraphStore:
     # Company Operations
     # =========================================================================
 
+    @staticmethod
+    def _insert_or_ignore(session: Session, model, values: Dict[str, Any]):
+        """
+        Insert a row unless it collides with a unique key, in one statement.
+
+        Unlike add + flush, a duplicate does not raise IntegrityError, so
+        the caller's transaction is never rolled back to recover.
+
+        Args:
+            session: Database session
+            model: Mapped class to insert
+            values: Column values
+
+        Returns:
+            The new instance, or None if an existing row conflicted
+        """
+        stmt = sqlite_insert(model).values(**values).on_conflict_do_nothing()
+        if SQLITE_RETURNING:
+            return session.scalars(stmt.returning(model)).first()
+        result = session.execute(stmt)
+        if not result.rowcount:
+            return None
+        return session.get(model, result.inserted_primary_key)
+
     def get_or_create_company(self, name: str, session: Session = None) -> Optional[Company]:
         """Get or create a company by name."""
         close_session = session is None
@@ -421,23 +855,20 @@ class GraphStore:
             company = session.query(Company).filter(Company.normalized_name == normalized).first()
 
             if not company:
-                company = Company(
-                    name=name,
-                    normalized_name=normalized,
-                    canonical_id=Company.generate_canonical_id(name)
-                )
-                session.add(company)
-                # Only commit if we own the session
-                if close_session:
+                company = self._insert_or_ignore(session, Company, {
+                    'name': name,
+                    'normalized_name': normalized,
+                    'canonical_id': Company.generate_canonical_id(name),
+                })
+                if company is None:
+                    # Created concurrently since the lookup
+                    company = session.query(Company)\
+                        .filter(Company.normalized_name == normalized).first()
+                elif close_session:
                     session.commit()
-                else:
-                    session.flush()
 
             return company
 
-        except IntegrityError:
-            session.rollback()
-            return session.query(Company).filter(Company.normalized_name == normalized).first()
         finally:
             if close_session:
                 session.close()
@@ -448,14 +879,16 @@ class GraphStore:
         company_name: str,
         confidence: float = 1.0,
         context: str = None,
-        session: Session = None
+        session: Session = None,
+        file: File = None
     ) -> bool:
-        """Associate a file with a company."""
+        """Associate a file with a company; ``file`` skips the lookup by ID."""
         close_session = session is None
         session = session or self.get_session()
 
         try:
-            file = session.query(File).filter(File.id == file_id).first()
+            if file is None:
+                file = session.query(File).filter(File.id == file_id).first()
             if not file:
                 return False
 
@@ -502,24 +935,22 @@ class GraphStore:
             person = session.query(Person).filter(Person.normalized_name == normalized).first()
 
             if not person:
-                person = Person(
-                    name=name,
-                    normalized_name=normalized,
-                    canonical_id=Person.generate_canonical_id(name),
-                    email=email,
-                    role=role
-                )
-                session.add(person)
-                if close_session:
+                person = self._insert_or_ignore(session, Person, {
+                    'name': name,
+                    'normalized_name': normalized,
+                    'canonical_id': Person.generate_canonical_id(name),
+                    'email': email,
+                    'role': role,
+                })
+                if person is None:
+                    # Created concurrently since the lookup
+                    person = session.query(Person)\
+                        .filter(Person.normalized_name == normalized).first()
+                elif close_session:
                     session.commit()
-                else:
-                    session.flush()
 
             return person
 
-        except IntegrityError:
-            session.rollback()
-            return session.query(Person).filter(Person.normalized_name == normalized).first()
         finally:
             if close_session:
                 session.close()
@@ -583,12 +1014,21 @@ class GraphStore:
         try:
             # Try to find by coordinates first
             if latitude and longitude:
-                location = session.query(Location).filter(
-                    and_(
-                        func.abs(Location.latitude - latitude) < 0.001,
-                        func.abs(Location.longitude - longitude) < 0.001
-                    )
-                ).first()
+                nearby = and_(
+                    func.abs(Location.latitude - latitude) < 0.001,
+                    func.abs(Location.longitude - longitude) < 0.001
+                )
+                if location_index_available(session.connection()):
+                    # Probe the R*Tree, whose float32 boxes are only a
+                    # candidate filter; the exact test runs on the rows
+                    box = locations_rtree.c
+                    nearby = and_(nearby, Location.id.in_(
+                        select(box.id).where(
+                            box.max_lat >= latitude - 0.001, box.min_lat <= latitude + 0.001,
+                            box.max_lon >= longitude - 0.001, box.min_lon <= longitude + 0.001
+                        )
+                    ))
+                location = session.query(Location).filter(nearby).first()
                 if location:
                     return location
 
@@ -714,7 +1154,7 @@ class GraphStore:
             if existing:
                 existing.confidence = confidence
                 existing.metadata = metadata
-                session.commit()
+                self._commit(session)
                 return existing
 
             relationship = FileRelationship(
@@ -725,7 +1165,7 @@ class GraphStore:
                 metadata=metadata
             )
             session.add(relationship)
-            session.commit()
+            self._commit(session)
             return relationship
 
         except Exception as e:
@@ -806,38 +1246,200 @@ class GraphStore:
             if close_session:
                 session.close()
 
+    def may_have_content_hash(self, content_hash: str, session: Session = None) -> bool:
+        """
+        Cheap preflight for duplicate detection.
+
+        A False answer costs no query; True means the hash may exist and
+        should be confirmed in SQL. The filter is seeded from the files
+        table on first use and kept current by ``add_file`` and
+        ``add_files`` only, so False is definite only for this store's own
+        writes: it gates the insert-time group lookup, never a read. Call
+        ``reset_hash_filter`` after writing files by other means.
+
+        Args:
+            content_hash: SHA-256 of file content
+            session: Optional existing session
+
+        Returns:
+            False if no stored file has this content hash
+        """
+        if self._hash_bloom is None:
+            close_session = session is None
+            session = session or self.get_session()
+            try:
+                bloom = HashBloomFilter()
+                rows = session.query(File.content_hash)\
+                    .filter(File.content_hash.isnot(None))\
+                    .yield_per(10000)
+                for (stored_hash,) in rows:
+                    bloom.add(stored_hash)
+                self._hash_bloom = bloom
+            finally:
+                if close_session:
+                    session.close()
+
+        return content_hash in self._hash_bloom
+
+    def reset_hash_filter(self) -> None:
+        """Drop the content hash filter so the next check reseeds it."""
+        self._hash_bloom = None
+
+    def _join_duplicate_group(self, session: Session, file: File) -> None:
+        """
+        Put a file in the duplicate group for its content hash.
+
+        The group is created when a second file with the hash appears.
+        Groups are not updated when a file's content hash changes; call
+        ``rebuild_duplicate_groups`` after rewriting hashes. Duplicate
+        lookups group on the hash itself, so stale groups never hide files.
+
+        Args:
+            session: Session the file belongs to
+            file: File being added or updated
+        """
+        content_hash = file.content_hash
+        if not content_hash or not self.may_have_content_hash(content_hash, session=session):
+            return
+
+        group = session.query(DuplicateGroup).filter(
+            DuplicateGroup.content_hash == content_hash
+        ).first()
+        if group is None:
+            first = session.query(File.id).filter(
+                File.content_hash == content_hash, File.id != file.id
+            ).order_by(File.id).first()
+            if first is None:
+                return
+            group = DuplicateGroup(content_hash=content_hash, canonical_file_id=first.id,
+                                   member_count=0)
+            session.add(group)
+            session.flush()
+
+        # Stored copies outside the group, e.g. several written by bulk paths
+        attached = session.execute(
+            update(File)
+            .where(File.content_hash == content_hash, File.id != file.id,
+                   File.duplicate_group_id.is_distinct_from(group.id))
+            .values(duplicate_group_id=group.id)
+        ).rowcount
+        group.member_count += attached
+
+        if file.duplicate_group_id != group.id:
+            file.duplicate_group = group
+            group.member_count += 1
+
+    def rebuild_duplicate_groups(self, session: Session = None) -> int:
+        """
+        Recompute every duplicate group from the files' content hashes.
+
+        Args:
+            session: Optional existing session
+
+        Returns:
+            Number of groups
+        """
+        close_session = session is None
+        session = session or self.get_session()
+
+        try:
+            # Hashes were likely rewritten outside add_file; reseed on next use
+            self.reset_hash_filter()
+            session.execute(update(File).values(duplicate_group_id=None))
+            session.execute(delete(DuplicateGroup))
+            session.execute(
+                insert(DuplicateGroup).from_select(
+                    ['content_hash', 'canonical_file_id', 'member_count'],
+                    select(File.content_hash, func.min(File.id), func.count())
+                    .where(File.content_hash.isnot(None))
+                    .group_by(File.content_hash)
+                    .having(func.count() > 1)
+                )
+            )
+            session.execute(
+                update(File)
+                .where(File.content_hash == DuplicateGroup.content_hash)
+                .values(duplicate_group_id=DuplicateGroup.id)
+            )
+            self._commit(session)
+            return session.query(func.count(DuplicateGroup.id)).scalar()
+
+        except Exception as e:
+            session.rollback()
+            raise e
+        finally:
+            if close_session:
+                session.close()
+
+    @staticmethod
+    def _duplicate_hashes(content_hash: str = None):
+        """Content hashes shared by more than one file, optionally just one."""
+        stmt = select(File.content_hash)\
+            .where(File.content_hash.isnot(None))\
+            .group_by(File.content_hash)\
+            .having(func.count() > 1)
+        if content_hash:
+            stmt = stmt.where(File.content_hash == content_hash)
+        return stmt
+
     def find_duplicates(self, content_hash: str = None, session: Session = None) -> List[List[File]]:
         """
         Find groups of duplicate files by content hash.
 
+        Files are grouped on ``content_hash`` itself, so files written by
+        any path are found, whether or not their DuplicateGroup is current.
+
         Args:
             content_hash: Specific hash to look for (or all if None)
             session: Optional existing session
 
         Returns:
-            List of file groups (files with same content)
+            List of file groups (files with same content), members ordered by ID
         """
         close_session = session is None
         session = session or self.get_session()
 
         try:
-            if content_hash:
-                files = session.query(File).filter(File.content_hash == content_hash).all()
-                return [files] if len(files) > 1 else []
-
-            # Find all hashes with more than one file
-            duplicates = session.query(File.content_hash, func.count(File.id).label('count'))\
-                .filter(File.content_hash.isnot(None))\
-                .group_by(File.content_hash)\
-                .having(func.count(File.id) > 1)\
-                .all()
+            stmt = select(File)\
+                .where(File.content_hash.in_(self._duplicate_hashes(content_hash)))\
+                .order_by(File.content_hash, File.id)
+
+            groups: Dict[str, List[File]] = {}
+            for file in session.scalars(stmt).unique():
+                groups.setdefault(file.content_hash, []).append(file)
+            return list(groups.values())
+
+        finally:
+            if close_session:
+                session.close()
 
-            result = []
-            for hash_val, _ in duplicates:
-                files = session.query(File).filter(File.content_hash == hash_val).all()
-                result.append(files)
+    def find_duplicate_hashes(
+        self,
+        content_hash: str = None,
+        session: Session = None
+    ) -> List[Tuple[str, List[str]]]:
+        """
+        Find groups of duplicate files as IDs, without loading File objects.
 
-            return result
+        Args:
+            content_hash: Specific hash to look for (or all if None)
+            session: Optional existing session
+
+        Returns:
+            List of (content hash, member file IDs ordered by ID) pairs
+        """
+        close_session = session is None
+        session = session or self.get_session()
+
+        try:
+            stmt = select(File.content_hash, File.id)\
+                .where(File.content_hash.in_(self._duplicate_hashes(content_hash)))\
+                .order_by(File.content_hash, File.id)
+
+            groups: Dict[str, List[str]] = {}
+            for group_hash, file_id in session.execute(stmt):
+                groups.setdefault(group_hash, []).append(file_id)
+            return list(groups.items())
 
         finally:
             if close_session:
@@ -880,7 +1482,7 @@ class GraphStore:
                 file_limit=file_limit
             )
             session.add(org_session)
-            session.commit()
+            self._commit(session)
             return org_session
 
         except Exception as e:
@@ -925,7 +1527,7 @@ class GraphStore:
             org_session.total_cost = stats.get('total_cost', 0.0)
             org_session.total_processing_time_sec = stats.get('processing_time', 0.0)
 
-            db_session.commit()
+            self._commit(db_session)
             return True
 
         except Exception as e:
@@ -957,7 +1559,7 @@ class GraphStore:
                 'total_categories': session.query(func.count(Category.id)).scalar(),
                 'total_companies': session.query(func.count(Company.id)).scalar(),
                 'total_locations': session.query(func.count(Location.id)).scalar(),
-                'total_relationships': session.query(func.count(FileRelationship.id)).scalar(),
+                'total_relationships': session.query(func.count()).select_from(FileRelationship).scalar(),
                 'total_sessions': session.query(func.count(OrganizationSession.id)).scalar(),
             }
 
@@ -971,9 +1573,10 @@ class GraphStore:
 
             # Extension breakdown
             extension_counts = session.query(
-                File.file_extension,
+                Extension.value,
                 func.count(File.id)
-            ).group_by(File.file_extension).order_by(func.count(File.id).desc()).limit(20).all()
+            ).select_from(File).outerjoin(File.extension_row)\
+                .group_by(File.extension_id).order_by(func.count(File.id).desc()).limit(20).all()
 
             stats['extensions'] = {ext or 'none': count for ext, count in extension_counts}
 
@@ -983,6 +1586,35 @@ class GraphStore:
             if close_session:
                 session.close()
 
+    def record_cost(self, feature_name: str, processing_time_sec: float, **fields) -> None:
+        """
+        Queue a cost record for the background writer.
+
+        A ':memory:' store has no writer thread; records are buffered and
+        written into whatever transaction is open on its connection.
+
+        Args:
+            feature_name: Feature that was invoked
+            processing_time_sec: Time spent in the feature
+            **fields: Other CostRecord columns (session_id, file_id, cost, ...)
+        """
+        if self._cost_sink is None:
+            if self._memory_connection is not None:
+                self._cost_sink = InlineCostRecordSink(self._memory_connection)
+            else:
+                self._cost_sink = CostRecordSink(self.engine)
+            atexit.register(self._cost_sink.close)
+        self._cost_sink.put({
+            'feature_name': feature_name,
+            'processing_time_sec': processing_time_sec,
+            **fields,
+        })
+
+    def flush_cost_records(self) -> None:
+        """Write every queued cost record before returning."""
+        if self._cost_sink is not None:
+            self._cost_sink.flush()
+
     def get_cost_statistics(
         self,
         session_id: str = None,
@@ -1004,6 +1636,7 @@ class GraphStore:
         Returns:
             Cost statistics dictionary
         """
+        self.flush_cost_records()
         close_session = session is None
         session = session or self.get_session()
 
@@ -1080,25 +1713,101 @@ class GraphStore:
         session = session or self.get_session()
 
         try:
-            filters = []
-
-            if search_filename:
-                filters.append(File.filename.ilike(f'%{query}%'))
-            if search_content:
-                filters.append(File.extracted_text.ilike(f'%{query}%'))
+            indexed = search_index_available(session.connection())
+            if len(query) >= SEARCH_MIN_QUERY and indexed:
+                file_ids = self._match_search_index(
+                    session, query, search_content, search_filename, limit
+                )
+            else:
+                file_ids = self._scan_files(
+                    session, query, search_content, search_filename, limit, indexed
+                )
 
-            if not filters:
+            if not file_ids:
                 return []
 
-            return session.query(File)\
-                .filter(or_(*filters))\
-                .limit(limit)\
-                .all()
+            # IN () loses the ranking; put files back in match order
+            position = {file_id: i for i, file_id in enumerate(file_ids)}
+            files = list(session.scalars(
+                lambda_stmt(lambda: select(File).where(File.id.in_(file_ids)))
+            ))
+            files.sort(key=lambda file: position[file.id])
+            return files
 
         finally:
             if close_session:
                 session.close()
 
+    @staticmethod
+    def _match_search_index(session: Session, query: str, search_content: bool,
+                            search_filename: bool, limit: int) -> List[str]:
+        """Find file IDs through the FTS5 index, filename matches first."""
+        phrase = '"' + query.replace('"', '""') + '"'
+        file_ids: List[str] = []
+        columns = [c for c, wanted in (('filename', search_filename),
+                                       ('extracted_text', search_content)) if wanted]
+        for column in columns:
+            if len(file_ids) >= limit:
+                break
+            seen = set(file_ids)
+            rows = session.execute(
+                text(f"SELECT file_id FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH :q LIMIT :n"),
+                {'q': f'{column} : {phrase}', 'n': limit + len(seen)}
+            )
+            for (file_id,) in rows:
+                if file_id not in seen:
+                    file_ids.append(file_id)
+                    if len(file_ids) >= limit:
+                        break
+        return file_ids
+
+    @staticmethod
+    def _scan_files(session: Session, query: str, search_content: bool,
+                    search_filename: bool, limit: int, indexed: bool = False) -> List[str]:
+        """
+        Find file IDs by scanning, for short queries or without FTS5.
+
+        With the search table present, text is scanned there in SQL, where
+        it is stored uncompressed; otherwise extracted text has to be
+        decompressed and matched in Python.
+        """
+        file_ids = []
+        pattern = f'%{query}%'
+
+        if search_filename:
+            file_ids = list(session.scalars(lambda_stmt(
+                lambda: select(File.id).where(File.filename.ilike(pattern)).limit(limit)
+            )))
+
+        if search_content and len(file_ids) < limit and indexed:
+            seen = set(file_ids)
+            rows = session.execute(
+                text(f"SELECT file_id FROM {SEARCH_TABLE} WHERE extracted_text LIKE :p LIMIT :n"),
+                {'p': pattern, 'n': limit + len(seen)}
+            )
+            for (file_id,) in rows:
+                if file_id not in seen:
+                    file_ids.append(file_id)
+                    if len(file_ids) >= limit:
+                        break
+        elif search_content and len(file_ids) < limit:
+            needle = query.lower()
+            seen = set(file_ids)
+            rows = session.query(FileExtractedText.file_id, FileExtractedText.data)\
+                .yield_per(500)
+            for file_id, data in rows:
+                if file_id not in seen and needle in decompress_text(data).lower():
+                    file_ids.append(file_id)
+                    if len(file_ids) >= limit:
+                        break
+
+        return file_ids
+
+    def rebuild_search_index(self) -> None:
+        """Re-index every file for full-text search, e.g. after raw SQL writes."""
+        with self.engine.begin() as connection:
+            rebuild_search_index(connection)
+
     def search_by_location(
         self,
         latitude: float,
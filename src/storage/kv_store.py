@@ -11,10 +11,11 @@ Design allows easy migration to Redis/Memcached in the future.
 import json
 import hashlib
 from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
 from contextlib import contextmanager
 
-from sqlalchemy import create_engine, event, func, and_
+from sqlalchemy import create_engine, delete, event, func, and_, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import Session, sessionmaker
 
 from .models import Base, KeyValueStore
@@ -65,6 +66,20 @@ class KeyValueStorage:
 
         self.SessionLocal = sessionmaker(bind=self.engine)
 
+        # Batch writes: insert new keys, overwrite existing ones like set()
+        table = KeyValueStore.__table__
+        upsert = sqlite_insert(table)
+        self._upsert = upsert.on_conflict_do_update(
+            index_elements=[table.c.namespace, table.c.key],
+            set_={
+                'value': upsert.excluded.value,
+                'value_type': upsert.excluded.value_type,
+                'expires_at': upsert.excluded.expires_at,
+                'file_id': upsert.excluded.file_id,
+                'updated_at': upsert.excluded.updated_at,
+            }
+        )
+
     def get_session(self) -> Session:
         """Get a database session."""
         return self.SessionLocal()
@@ -282,10 +297,41 @@ class KeyValueStorage:
         Returns:
             True if successful
         """
-        for key, value in mapping.items():
-            self.set(key, value, namespace, ttl_seconds)
+        expires_at = None
+        if ttl_seconds:
+            expires_at = datetime.utcnow() + timedelta(seconds=ttl_seconds)
+
+        self._set_many(
+            (namespace, key, value, expires_at) for key, value in mapping.items()
+        )
         return True
 
+    def _set_many(self, entries: Iterable[Tuple[str, str, Any, Optional[datetime]]]):
+        """
+        Upsert (namespace, key, value, expires_at) entries in one executemany.
+
+        Args:
+            entries: Entries to write
+        """
+        now = datetime.utcnow()
+        rows = [
+            {
+                'namespace': namespace,
+                'key': key,
+                'value': value,
+                'value_type': self._get_value_type(value),
+                'expires_at': expires_at,
+                'file_id': None,
+                'updated_at': now,
+            }
+            for namespace, key, value, expires_at in entries
+        ]
+        if not rows:
+            return
+
+        with self.session_scope() as session:
+            session.execute(self._upsert, rows)
+
     # =========================================================================
     # Counter Operations
     # =========================================================================
@@ -520,6 +566,22 @@ class KeyValueStorage:
         hash_key = f"{name}:{key}"
         return self.set(hash_key, value, namespace)
 
+    def hmset_many(self, entries: Iterable[Tuple[str, str, Any, str]]) -> bool:
+        """
+        Set fields across several hashes in one transaction.
+
+        Args:
+            entries: (hash name, field key, value, namespace) tuples
+
+        Returns:
+            True if successful
+        """
+        self._set_many(
+            (namespace, f"{name}:{key}", value, None)
+            for name, key, value, namespace in entries
+        )
+        return True
+
     def hgetall(
         self,
         name: str,
@@ -661,21 +723,35 @@ class KeyValueStorage:
     # Cleanup Operations
     # =========================================================================
 
-    def cleanup_expired(self) -> int:
+    def cleanup_expired(self, namespace: str = None, batch_size: int = 10_000) -> int:
         """
-        Remove all expired keys.
+        Remove expired keys.
+
+        Deletes in batches, one transaction each, so a large sweep never
+        holds the write lock for long. With a namespace, only that
+        namespace's expiring rows are read, via ``ix_kv_namespace_expires``.
+
+        Args:
+            namespace: Only sweep this namespace (all namespaces if None)
+            batch_size: Rows deleted per transaction
 
         Returns:
             Number of keys removed
         """
-        with self.session_scope() as session:
-            result = session.query(KeyValueStore).filter(
-                and_(
-                    KeyValueStore.expires_at.isnot(None),
-                    KeyValueStore.expires_at < datetime.utcnow()
-                )
-            ).delete()
-            return result
+        table = KeyValueStore.__table__
+        conditions = [table.c.expires_at.isnot(None), table.c.expires_at < datetime.utcnow()]
+        if namespace is not None:
+            conditions.append(table.c.namespace == namespace)
+        batch = select(table.c.id).where(*conditions).limit(batch_size)
+        stmt = delete(table).where(table.c.id.in_(batch.scalar_subquery()))
+
+        removed = 0
+        while True:
+            with self.session_scope() as session:
+                deleted = session.execute(stmt).rowcount
+            removed += deleted
+            if deleted < batch_size:
+                return removed
 
     def flush_namespace(self, namespace: str) -> int:
         """
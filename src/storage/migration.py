@@ -7,22 +7,302 @@ and key-value store.
 """
 
 import json
+import functools
 import hashlib
+import mmap
+import os
+import re
+from concurrent.futures import Future, ProcessPoolExecutor
 from datetime import datetime
+from itertools import islice
 from pathlib import Path
-from typing import Dict, List, Any, Optional, Tuple
-from collections import defaultdict
+from typing import Deque, Dict, List, Any, Callable, Iterable, Iterator, Optional, Tuple
+from collections import Counter, defaultdict, deque
 
+from sqlalchemy import Table, bindparam, func, insert, select, update
+from sqlalchemy.dialects import sqlite as sqlite_dialect
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.schema import CreateIndex, CreateTable, DefaultClause
 from sqlalchemy.orm import Session
 
 from .models import (
     File, Category, Company, Person, Location,
-    OrganizationSession, CostRecord, SchemaMetadata,
-    FileStatus, RelationshipType
+    OrganizationSession, CostRecord, SchemaMetadata, FileRelationship, DuplicateGroup,
+    Base, FileStatus, RelationshipType, MsgPackType, NAMESPACES, MSGPACK_AVAILABLE, compress_text,
+    SEARCH_TABLE, CANONICAL_ID_TRIGGER, CANONICAL_ID_TRIGGER_SQL, canonical_id_is_stored,
+    _SHA1_FACTORY, _search_rowid, index_files_for_search, search_index_available,
+    file_categories, file_companies, file_people, file_locations
 )
 from .graph_store import GraphStore
 from .kv_store import KeyValueStorage
 
+# orjson parses straight from the mapped buffer; stdlib json is the fallback
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# One decoder shared by every stdlib parse
+_DECODE = json.JSONDecoder().decode
+
+
+def _stdlib_loads(data: bytes) -> Any:
+    """Decode UTF-8 JSON bytes with the shared stdlib decoder."""
+    return _DECODE(data.decode('utf-8-sig'))
+
+
+_loads = orjson.loads if ORJSON_AVAILABLE else _stdlib_loads
+
+# ijson lets reports be streamed and counted without building the whole tree
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
+
+# ijson events for scalar values, and for any value starting
+_SCALAR_EVENTS = frozenset({'string', 'number', 'boolean', 'null'})
+_VALUE_START_EVENTS = _SCALAR_EVENTS | {'start_map', 'start_array'}
+
+
+def _parse_report_timestamp(timestamp_str: str) -> datetime:
+    """
+    Parse a report filename timestamp in ``YYYYMMDD_HHMMSS`` form.
+
+    The format is fixed-width, so slicing avoids the overhead of
+    ``datetime.strptime`` when migrating many reports.
+
+    Raises:
+        ValueError: If the string is not a valid timestamp
+    """
+    if (len(timestamp_str) != 15 or timestamp_str[8] != '_'
+            or not timestamp_str[:8].isdigit() or not timestamp_str[9:].isdigit()):
+        raise ValueError(f"Invalid report timestamp: {timestamp_str!r}")
+
+    return datetime(
+        int(timestamp_str[0:4]), int(timestamp_str[4:6]), int(timestamp_str[6:8]),
+        int(timestamp_str[9:11]), int(timestamp_str[11:13]), int(timestamp_str[13:15])
+    )
+
+
+def _load_json(file_path: Path) -> Any:
+    """
+    Parse a JSON report through a read-only memory map.
+
+    Mapping the file avoids copying it into a separate read buffer before
+    parsing, which keeps peak memory down on very large reports.
+
+    Args:
+        file_path: JSON file to parse
+
+    Returns:
+        Parsed JSON value
+    """
+    with open(file_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            # Empty files cannot be mapped; let the parser report the error
+            return _loads(f.read())
+
+        if hasattr(os, 'posix_fadvise'):
+            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if ORJSON_AVAILABLE:
+                view = memoryview(mm)
+                try:
+                    return orjson.loads(view)
+                finally:
+                    view.release()
+            return _stdlib_loads(mm[:])
+
+
+def _count_report(file_path: Path) -> Tuple[int, int]:
+    """
+    Read ``total_files`` and the number of ``results`` from a report.
+
+    Streams the file with ijson when available so the results array is
+    never materialized; otherwise parses the whole report.
+
+    Args:
+        file_path: Organization report path
+
+    Returns:
+        Tuple of (total_files, result records)
+    """
+    if not IJSON_AVAILABLE:
+        data = _load_json(file_path)
+        return data.get('total_files', 0), len(data.get('results', []))
+
+    total_files = 0
+    records = 0
+    with open(file_path, 'rb') as f:
+        for prefix, event, value in ijson.parse(f):
+            if prefix == 'results.item' and event in _VALUE_START_EVENTS:
+                records += 1
+            elif prefix == 'total_files' and event == 'number':
+                total_files = int(value)
+    return total_files, records
+
+
+def _read_report_header(file_path: Path) -> Dict[str, Any]:
+    """
+    Read a report's top-level scalar fields (totals, dry_run) with ijson.
+
+    Nested values such as the ``results`` array are skipped, not built.
+    """
+    header = {}
+    with open(file_path, 'rb') as f:
+        for prefix, event, value in ijson.parse(f, use_float=True):
+            if prefix and '.' not in prefix and event in _SCALAR_EVENTS:
+                header[prefix] = value
+    return header
+
+
+def _stream_results(file_path: Path) -> Iterator[Dict[str, Any]]:
+    """Yield a report's results one at a time with ijson."""
+    with open(file_path, 'rb') as f:
+        yield from ijson.items(f, 'results.item', use_float=True)
+
+
+def _has_category(result: Dict[str, Any]) -> bool:
+    """Whether a file result names a real (not 'uncategorized') category."""
+    category = result.get('category')
+    return bool(category) and category != 'uncategorized'
+
+
+# Result filename patterns
+# Audit hash holding per-report totals, keyed by report stem
+_VERIFY_TOTALS = 'verify:totals'
+
+_ORG_REPORT_PREFIX = 'content_organization_report_'
+_COST_SEARCH = re.compile('cost', re.IGNORECASE).search
+
+
+def _classify_report(filename: str) -> str:
+    """
+    Classify a result file by name.
+
+    Returns:
+        'organization', 'cost' or 'other'
+    """
+    if filename.startswith(_ORG_REPORT_PREFIX):
+        return 'organization'
+    if _COST_SEARCH(filename):
+        return 'cost'
+    return 'other'
+
+
+# Report result status -> file status
+_STATUS_MAP = {
+    'organized': FileStatus.ORGANIZED,
+    'would_organize': FileStatus.ORGANIZED,  # Dry run
+    'skipped': FileStatus.SKIPPED,
+    'error': FileStatus.ERROR,
+    'already_organized': FileStatus.ALREADY_ORGANIZED
+}
+
+
+def _canonical_id_builder(namespace: str) -> Callable[[str], str]:
+    """
+    Bind a deterministic UUID v5 generator to one namespace.
+
+    Produces the same strings as ``str(uuid.uuid5(ns, name.lower().strip()))``,
+    but hashes the namespace once and copies the SHA-1 state per name,
+    formatting the digest directly instead of building UUID objects.
+
+    Raises:
+        ValueError: If the namespace is unknown
+    """
+    ns_uuid = NAMESPACES.get(namespace)
+    if not ns_uuid:
+        raise ValueError(f"Unknown namespace: {namespace}")
+
+    base = _SHA1_FACTORY(ns_uuid.bytes)
+
+    def build(name: str) -> str:
+        hasher = base.copy()
+        hasher.update(name.lower().strip().encode())
+        digest = bytearray(hasher.digest()[:16])
+        digest[6] = (digest[6] & 0x0F) | 0x50  # version 5
+        digest[8] = (digest[8] & 0x3F) | 0x80  # RFC 4122 variant
+        h = digest.hex()
+        return f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
+
+    return build
+
+
+def _session_id(file_path: Path) -> str:
+    """Derive the organization session ID (SHA-256 of the report path)."""
+    return hashlib.sha256(str(file_path).encode()).hexdigest()
+
+
+# Number of leading results sampled to infer a report's row shape
+_ROW_SHAPE_SAMPLE = 10
+
+
+@functools.lru_cache(maxsize=32)
+def _compile_row_builder(present_keys: frozenset) -> Callable[..., Dict[str, Any]]:
+    """
+    Generate a file row builder specialized for one result shape.
+
+    Keys in ``present_keys`` are read by subscript; any other key falls back
+    to ``dict.get`` with its default. Builders raise ``KeyError`` when a
+    result lacks a key the shape promised, so callers can retry with
+    ``_compile_row_builder(frozenset())``, which never assumes a key.
+
+    Args:
+        present_keys: Result keys known to be present
+
+    Returns:
+        ``build_row(result, file_id, status, session_id, exif_datetime,
+        gps_latitude, gps_longitude)`` returning a file row dict
+    """
+    def access(key: str, default: Any) -> str:
+        if key in present_keys:
+            return f"result[{key!r}]"
+        return f"result.get({key!r}, {default!r})"
+
+    source = f"""
+def build_row(result, file_id, status, session_id, exif_datetime, gps_latitude, gps_longitude):
+    source_path = result['source']
+    schema_data = {access('schema', {})}
+    return {{
+        'id': file_id,
+        'filename': basename(source_path),
+        'original_path': source_path,
+        'current_path': {access('destination', None)},
+        'status': status,
+        'organization_reason': {access('reason', None)},
+        'extracted_text_length': {access('extracted_text_length', 0)},
+        'schema_type': schema_data.get('@type'),
+        'schema_data': schema_data,
+        'session_id': session_id,
+        'exif_datetime': exif_datetime,
+        'gps_latitude': gps_latitude,
+        'gps_longitude': gps_longitude,
+    }}
+"""
+    namespace = {'basename': os.path.basename}
+    exec(source, namespace)
+    return namespace['build_row']
+
+
+def _infer_row_builder(results: List[Dict[str, Any]]) -> Callable[..., Dict[str, Any]]:
+    """Pick a row builder for the keys shared by the first few results."""
+    sample = [frozenset(r) for r in results[:_ROW_SHAPE_SAMPLE]]
+    return _compile_row_builder(frozenset.intersection(*sample) if sample else frozenset())
+
+
+# Association tables written directly during migration:
+# table -> (entity id column, entity model whose file_count is maintained)
+_LINK_TABLES = {
+    file_categories: ('category_id', Category),
+    file_companies: ('company_id', Company),
+    file_people: ('person_id', Person),
+    file_locations: ('location_id', Location),
+}
+
 
 class JSONMigrator:
     """
@@ -51,15 +331,52 @@ class JSONMigrator:
         self.graph_store = GraphStore(db_path)
         self.kv_store = KeyValueStorage(db_path)
 
+        # Statements are built once and reused for every batch
+        file_table = File.__table__
+        file_insert = sqlite_insert(file_table)
+        excluded = file_insert.excluded
+        # Re-migrated files only move and change status; a NULL path keeps the stored one
+        self._file_upsert = file_insert.on_conflict_do_update(
+            index_elements=[file_table.c.id],
+            set_={
+                'current_path': func.coalesce(excluded.current_path, file_table.c.current_path),
+                'status': excluded.status,
+                'db_updated_at': excluded.db_updated_at,
+            }
+        )
+        self._link_inserts = {
+            table: insert(table).prefix_with('OR IGNORE') for table in _LINK_TABLES
+        }
+        self._file_count_updates = {}
+        for table, (_, entity_model) in _LINK_TABLES.items():
+            entity_table = entity_model.__table__
+            values = {'file_count': entity_table.c.file_count + bindparam('b_count')}
+            if 'last_seen' in entity_table.c:
+                values['last_seen'] = bindparam('b_seen')
+            self._file_count_updates[table] = (
+                update(entity_table)
+                .where(entity_table.c.id == bindparam('b_id'))
+                .values(**values)
+            )
+
         # Statistics
         self.stats = defaultdict(int)
 
-    def migrate_all(self, verbose: bool = True) -> Dict[str, Any]:
+        # Entity ID caches, reloaded for each organization report
+        self._category_ids: Dict[str, int] = {}
+        self._company_ids: Dict[str, int] = {}
+        self._person_ids: Dict[str, int] = {}
+        self._location_ids: Dict[Tuple[str, Optional[float], Optional[float]], int] = {}
+
+    def migrate_all(self, verbose: bool = True, workers: int = 1) -> Dict[str, Any]:
         """
         Migrate all JSON files in the results directory.
 
         Args:
             verbose: Print progress messages
+            workers: Processes used to parse organization reports. With more
+                than one, reports are parsed in a process pool while this
+                process writes already-parsed reports to the database.
 
         Returns:
             Migration statistics
@@ -76,17 +393,13 @@ class JSONMigrator:
             print(f"\nFound {len(json_files)} JSON files")
 
         # Categorize files
-        organization_reports = []
-        cost_reports = []
-        other_files = []
-
+        groups: Dict[str, List[Path]] = {'organization': [], 'cost': [], 'other': []}
         for f in json_files:
-            if 'content_organization_report' in f.name:
-                organization_reports.append(f)
-            elif 'cost' in f.name.lower():
-                cost_reports.append(f)
-            else:
-                other_files.append(f)
+            groups[_classify_report(f.name)].append(f)
+
+        organization_reports = groups['organization']
+        cost_reports = groups['cost']
+        other_files = groups['other']
 
         if verbose:
             print(f"  - Organization reports: {len(organization_reports)}")
@@ -97,12 +410,37 @@ class JSONMigrator:
         if organization_reports:
             if verbose:
                 print(f"\n{'Migrating Organization Reports':=^60}")
-            for f in organization_reports:
-                try:
-                    self._migrate_organization_report(f, verbose)
-                except Exception as e:
-                    print(f"  Error migrating {f.name}: {e}")
-                    self.stats['errors'] += 1
+            executor = None
+            if workers > 1 and len(organization_reports) > 1:
+                executor = ProcessPoolExecutor(max_workers=workers)
+            # SQLite has a single writer, so only parsing is farmed out, at
+            # most two reports per worker ahead of the writer so parsed
+            # reports don't pile up in memory; serial runs leave parsing to
+            # the report (which may stream it)
+            window = workers * 2 if executor else 1
+            reports = iter(organization_reports)
+            pending: Deque[Tuple[Path, Optional[Future]]] = deque()
+            try:
+                while True:
+                    for f in islice(reports, window - len(pending)):
+                        pending.append((f, executor.submit(_load_json, f) if executor else None))
+                    if not pending:
+                        break
+
+                    f, future = pending.popleft()
+                    try:
+                        data = future.result() if future else None
+                        self._migrate_organization_report(f, verbose, data=data)
+                    except Exception as e:
+                        print(f"  Error migrating {f.name}: {e}")
+                        self.stats['errors'] += 1
+                    # Release the parsed report before the next one is submitted
+                    future = data = None
+            finally:
+                if executor:
+                    for _, future in pending:
+                        future.cancel()
+                    executor.shutdown()
 
         # Migrate cost reports
         if cost_reports:
@@ -126,39 +464,60 @@ class JSONMigrator:
                     print(f"  Error storing {f.name}: {e}")
                     self.stats['errors'] += 1
 
+        # Refresh planner statistics for the rows just loaded
+        self.graph_store.optimize()
+
         # Print summary
         if verbose:
             self._print_summary()
 
         return dict(self.stats)
 
-    def _migrate_organization_report(self, file_path: Path, verbose: bool = True):
+    def _migrate_organization_report(
+        self,
+        file_path: Path,
+        verbose: bool = True,
+        data: Optional[Dict[str, Any]] = None
+    ):
         """
         Migrate a content organization report.
 
+        When ``data`` is omitted and ijson is installed, results are streamed
+        from the file so memory stays proportional to one batch.
+
         Args:
             file_path: Path to JSON file
             verbose: Print progress
+            data: Already-parsed report contents, read from ``file_path`` if omitted
         """
+        report_name = file_path.name
         if verbose:
-            print(f"\n  Processing: {file_path.name}")
+            print(f"\n  Processing: {report_name}")
 
-        with open(file_path, 'r') as f:
-            data = json.load(f)
+        results: Iterable[Dict[str, Any]]
+        if data is not None:
+            results = data.get('results', [])
+        elif IJSON_AVAILABLE:
+            data = _read_report_header(file_path)
+            results = _stream_results(file_path)
+        else:
+            data = _load_json(file_path)
+            results = data.get('results', [])
 
         # Extract timestamp from filename
-        timestamp_str = file_path.stem.replace('content_organization_report_', '')
+        stem = file_path.stem
+        timestamp_str = stem[len(_ORG_REPORT_PREFIX):] if stem.startswith(_ORG_REPORT_PREFIX) else stem
         try:
-            session_timestamp = datetime.strptime(timestamp_str, '%Y%m%d_%H%M%S')
+            session_timestamp = _parse_report_timestamp(timestamp_str)
         except ValueError:
             session_timestamp = datetime.utcnow()
 
-        # Create organization session
-        session = self.graph_store.get_session()
+        # Bulk session: nothing is read back through the ORM after a commit
+        session = self.graph_store.get_session(autoflush=False, expire_on_commit=False)
 
         try:
             org_session = OrganizationSession(
-                id=hashlib.sha256(str(file_path).encode()).hexdigest()[:64],
+                id=_session_id(file_path),
                 started_at=session_timestamp,
                 completed_at=session_timestamp,
                 dry_run=data.get('dry_run', False),
@@ -168,25 +527,50 @@ class JSONMigrator:
                 error_count=data.get('errors', 0)
             )
             session.merge(org_session)
-            session.commit()
-            self.stats['sessions'] += 1
+            # Autoflush is off; file rows reference the session row
+            session.flush()
 
             # Migrate individual file results in batches
-            results = data.get('results', [])
             batch_size = 100
-            for i, result in enumerate(results):
+            links = defaultdict(set)
+            self._category_ids = dict(
+                session.execute(select(Category.full_path, Category.id)).all()
+            )
+            self._company_ids = dict(
+                session.execute(select(Company.normalized_name, Company.id)).all()
+            )
+            self._person_ids = dict(
+                session.execute(select(Person.normalized_name, Person.id)).all()
+            )
+            self._location_ids = {}
+
+            results = iter(results)
+            batch = list(islice(results, batch_size))
+            build_row = _infer_row_builder(batch)
+            record_count = 0
+            while batch:
                 with session.no_autoflush:
-                    self._migrate_file_result(result, org_session.id, session)
+                    self._migrate_file_batch(batch, org_session.id, session, links, build_row)
+
+                self._flush_links(links, session)
+                # Keep the identity map from growing across batches
+                session.expunge_all()
 
-                # Commit in batches to avoid large transactions
-                if (i + 1) % batch_size == 0:
-                    session.commit()
+                record_count += len(batch)
+                batch = list(islice(results, batch_size))
 
-            # Final commit for remaining items
+            # One transaction per report: a single commit (and fsync) at the end
             session.commit()
+            self.stats['sessions'] += 1
+            # Recorded for verify_migration, which then needs no JSON re-read
+            self.kv_store.hset(
+                _VERIFY_TOTALS, file_path.stem,
+                {'total_files': data.get('total_files', 0), 'records': record_count},
+                namespace='audit'
+            )
 
             if verbose:
-                print(f"    - Migrated {len(results)} file records")
+                print(f"    - Migrated {record_count} file records")
                 print(f"    - Session ID: {org_session.id[:16]}...")
 
         except Exception as e:
@@ -195,103 +579,167 @@ class JSONMigrator:
         finally:
             session.close()
 
+    def _migrate_file_batch(
+        self,
+        results: List[Dict[str, Any]],
+        session_id: str,
+        db_session: Session,
+        links: Dict[Table, set],
+        build_row: Callable[..., Dict[str, Any]]
+    ):
+        """
+        Migrate a batch of file results.
+
+        Files are collected as plain row dicts and written with a single
+        upsert executemany before any relationships are linked. One ``IN``
+        query finds which files already exist so only new ones are counted.
+
+        Args:
+            results: File result dictionaries
+            session_id: Organization session ID
+            db_session: Database session
+            links: Pending association rows, keyed by association table
+            build_row: Row builder for this report's result shape
+        """
+        batch_ids = {
+            File.generate_id(result['source']) for result in results if result.get('source')
+        }
+        existing_ids = set(db_session.execute(
+            select(File.id).where(File.id.in_(batch_ids))
+        ).scalars()) if batch_ids else set()
+
+        rows: Dict[str, Dict[str, Any]] = {}
+        migrated = []
+
+        for result in results:
+            file_id = self._migrate_file_result(result, session_id, rows, build_row)
+            if file_id:
+                migrated.append((file_id, result))
+
+        if rows:
+            db_session.execute(self._file_upsert, list(rows.values()))
+            self.stats['files'] += len(rows.keys() - existing_ids)
+            # Core upserts skip the ORM flush hook that maintains the index
+            connection = db_session.connection()
+            if search_index_available(connection):
+                index_files_for_search(connection, rows.keys())
+
+        # Count links in locals and fold them into stats once per batch
+        categories = companies = people = locations = 0
+        for file_id, result in migrated:
+            n_categories, n_companies, n_people, n_locations = self._link_file_result(
+                file_id, result, db_session, links
+            )
+            categories += n_categories
+            companies += n_companies
+            people += n_people
+            locations += n_locations
+
+        for key, count in (('categories', categories), ('companies', companies),
+                           ('people', people), ('locations', locations)):
+            if count:
+                self.stats[key] += count
+
     def _migrate_file_result(
         self,
         result: Dict[str, Any],
         session_id: str,
-        db_session: Session
-    ):
+        rows: Dict[str, Dict[str, Any]],
+        build_row: Callable[..., Dict[str, Any]]
+    ) -> Optional[str]:
         """
         Migrate a single file result.
 
+        The file's row is added to ``rows`` for the caller to upsert in bulk.
+
         Args:
             result: File result dictionary
             session_id: Organization session ID
-            db_session: Database session
+            rows: Pending file rows keyed by file ID
+            build_row: Row builder from ``_compile_row_builder``
+
+        Returns:
+            File ID, or None if the result has no source path
         """
         source_path = result.get('source', '')
         if not source_path:
-            return
+            return None
 
         file_id = File.generate_id(source_path)
 
-        # Map status
-        status_map = {
-            'organized': FileStatus.ORGANIZED,
-            'would_organize': FileStatus.ORGANIZED,  # Dry run
-            'skipped': FileStatus.SKIPPED,
-            'error': FileStatus.ERROR,
-            'already_organized': FileStatus.ALREADY_ORGANIZED
-        }
-        status = status_map.get(result.get('status'), FileStatus.PENDING)
-
-        # Extract schema data
-        schema_data = result.get('schema', {})
-
-        # Create or update file
-        file = db_session.query(File).filter(File.id == file_id).first()
-
-        if not file:
-            file = File(
-                id=file_id,
-                filename=Path(source_path).name,
-                original_path=source_path,
-                current_path=result.get('destination'),
-                status=status,
-                organization_reason=result.get('reason'),
-                extracted_text_length=result.get('extracted_text_length', 0),
-                schema_type=schema_data.get('@type'),
-                schema_data=schema_data,
-                session_id=session_id
-            )
+        status = _STATUS_MAP.get(result.get('status'), FileStatus.PENDING)
 
-            # Image metadata
-            image_meta = result.get('image_metadata', {})
-            if image_meta:
-                if image_meta.get('datetime'):
-                    try:
-                        file.exif_datetime = datetime.fromisoformat(image_meta['datetime'])
-                    except (ValueError, TypeError):
-                        pass
-
-                coords = image_meta.get('gps_coordinates')
-                if coords and len(coords) == 2:
-                    file.gps_latitude = coords[0]
-                    file.gps_longitude = coords[1]
-
-            db_session.add(file)
-            db_session.flush()  # Ensure file ID is committed before relationships
-            self.stats['files'] += 1
-        else:
-            # Update existing
-            file.current_path = result.get('destination') or file.current_path
-            file.status = status
-            db_session.flush()  # Ensure updates are visible
+        # Same file seen earlier in this batch
+        pending = rows.get(file_id)
+        if pending is not None:
+            pending['current_path'] = result.get('destination') or pending['current_path']
+            pending['status'] = status
+            return file_id
 
-        # Add category relationship
-        category = result.get('category')
-        subcategory = result.get('subcategory')
+        # Image metadata
+        exif_datetime = None
+        gps_latitude = gps_longitude = None
+        image_meta = result.get('image_metadata', {})
+        if image_meta:
+            if image_meta.get('datetime'):
+                try:
+                    exif_datetime = datetime.fromisoformat(image_meta['datetime'])
+                except (ValueError, TypeError):
+                    pass
 
-        if category and category != 'uncategorized':
-            self.graph_store.add_file_to_category(
-                file_id, category, subcategory, session=db_session
+            coords = image_meta.get('gps_coordinates')
+            if coords and len(coords) == 2:
+                gps_latitude, gps_longitude = coords
+
+        # Every row carries the same keys so the batch compiles to one executemany
+        row_args = (file_id, status, session_id, exif_datetime, gps_latitude, gps_longitude)
+        try:
+            rows[file_id] = build_row(result, *row_args)
+        except KeyError:
+            # This result is missing a key the sampled shape promised
+            rows[file_id] = _compile_row_builder(frozenset())(result, *row_args)
+        return file_id
+
+    def _link_file_result(
+        self,
+        file_id: str,
+        result: Dict[str, Any],
+        db_session: Session,
+        links: Dict[Table, set]
+    ) -> Tuple[int, int, int, int]:
+        """
+        Link a migrated file to its categories, company, people and location.
+
+        Args:
+            file_id: File ID
+            result: File result dictionary
+            db_session: Database session
+            links: Pending association rows, keyed by association table
+
+        Returns:
+            Number of (category, company, person, location) links queued
+        """
+        categories = companies = people = locations = 0
+
+        # Add category relationship
+        if _has_category(result):
+            self._add_category_to_file(
+                file_id, result['category'], result.get('subcategory'), db_session, links
             )
-            self.stats['categories'] += 1
+            categories = 1
 
         # Add company relationship
         company_name = result.get('company_name')
         if company_name:
-            self.graph_store.add_file_to_company(
-                file_id, company_name, session=db_session
-            )
-            self.stats['companies'] += 1
+            self._add_company_to_file(file_id, company_name, db_session, links)
+            companies = 1
 
         # Add people relationships
         people_names = result.get('people_names', [])
         for person_name in people_names:
             if person_name:
-                self._add_person_to_file(file_id, person_name, db_session)
-                self.stats['people'] += 1
+                self._add_person_to_file(file_id, person_name, db_session, links)
+                people += 1
 
         # Add location if GPS data available
         image_meta = result.get('image_metadata', {})
@@ -300,49 +748,97 @@ class JSONMigrator:
 
         if location_name or coords:
             self._add_location_to_file(
-                file_id, location_name, coords, db_session
+                file_id, location_name, coords, db_session, links
             )
-            self.stats['locations'] += 1
+            locations = 1
+
+        # Schema metadata is stored in the File table's schema_data field
+        # rather than SchemaMetadata, avoiding FK ordering issues during migration
+        return categories, companies, people, locations
 
-        # Store schema metadata - skip if file doesn't exist yet to avoid FK errors
-        # Schema metadata will be stored directly in the File table's schema_data field instead
-        # This avoids the complex FK relationship during migration
+    def _add_category_to_file(
+        self,
+        file_id: str,
+        category_name: str,
+        subcategory_name: Optional[str],
+        db_session: Session,
+        links: Dict[Table, set]
+    ):
+        """Queue a file-category link, creating the category (and parent) if needed."""
+        full_path = f"{category_name}/{subcategory_name}" if subcategory_name else category_name
+        category_id = self._category_ids.get(full_path)
+
+        if category_id is None:
+            if subcategory_name:
+                # Create parent first
+                self.graph_store.get_or_create_category(category_name, session=db_session)
+                category = self.graph_store.get_or_create_category(
+                    subcategory_name, category_name, session=db_session
+                )
+            else:
+                category = self.graph_store.get_or_create_category(
+                    category_name, session=db_session
+                )
+
+            if category is None:
+                return
+            category_id = self._category_ids[full_path] = category.id
+
+        links[file_categories].add((file_id, category_id))
+
+    def _add_company_to_file(
+        self,
+        file_id: str,
+        company_name: str,
+        db_session: Session,
+        links: Dict[Table, set]
+    ):
+        """Queue a file-company link, creating the company if needed."""
+        normalized = Company.normalize_name(company_name)
+        company_id = self._company_ids.get(normalized)
+
+        if company_id is None:
+            company = self.graph_store.get_or_create_company(company_name, session=db_session)
+            if company is None:
+                return
+            company_id = self._company_ids[normalized] = company.id
+
+        links[file_companies].add((file_id, company_id))
 
     def _add_person_to_file(
         self,
         file_id: str,
         person_name: str,
-        db_session: Session
+        db_session: Session,
+        links: Dict[Table, set]
     ):
-        """Add a person to a file."""
+        """Queue a file-person link, creating the person if needed."""
         if not person_name:
             return
 
         normalized = Person.normalize_name(person_name)
-        person = db_session.query(Person)\
-            .filter(Person.normalized_name == normalized).first()
+        person_id = self._person_ids.get(normalized)
 
-        if not person:
+        if person_id is None:
             person = Person(
                 name=person_name,
                 normalized_name=normalized
             )
             db_session.add(person)
             db_session.flush()
+            person_id = self._person_ids[normalized] = person.id
 
-        file = db_session.query(File).filter(File.id == file_id).first()
-        if file and person and person not in file.people:
-            file.people.append(person)
-            person.file_count += 1
+        links[file_people].add((file_id, person_id))
 
     def _add_location_to_file(
         self,
         file_id: str,
         location_name: Optional[str],
         coords: Optional[List[float]],
-        db_session: Session
+        db_session: Session,
+        links: Dict[Table, set]
     ):
-        """Add a location to a file."""
+        """Queue a file-location link, creating the location if needed."""
         lat = coords[0] if coords and len(coords) >= 2 else None
         lon = coords[1] if coords and len(coords) >= 2 else None
 
@@ -354,20 +850,66 @@ class JSONMigrator:
         else:
             name = "Unknown"
 
-        location = self.graph_store.get_or_create_location(
-            name=name,
-            latitude=lat,
-            longitude=lon,
-            session=db_session
-        )
+        cache_key = (name, lat, lon)
+        location_id = self._location_ids.get(cache_key)
 
-        if location is None:
-            return
+        if location_id is None:
+            location = self.graph_store.get_or_create_location(
+                name=name,
+                latitude=lat,
+                longitude=lon,
+                session=db_session
+            )
+
+            if location is None:
+                return
+            location_id = self._location_ids[cache_key] = location.id
 
-        file = db_session.query(File).filter(File.id == file_id).first()
-        if file and location not in file.locations:
-            file.locations.append(location)
-            location.file_count += 1
+        links[file_locations].add((file_id, location_id))
+
+    def _flush_links(self, links: Dict[Table, set], db_session: Session):
+        """
+        Write queued association rows with one executemany per table.
+
+        Pairs already present in the database are skipped so that
+        re-running a migration does not inflate entity file counts.
+
+        Args:
+            links: Pending (file_id, entity_id) pairs keyed by association table
+            db_session: Database session
+        """
+        db_session.flush()
+        now = datetime.utcnow()
+
+        for table, pairs in links.items():
+            if not pairs:
+                continue
+
+            entity_column, entity_model = _LINK_TABLES[table]
+            file_ids = {file_id for file_id, _ in pairs}
+            existing = set(map(tuple, db_session.execute(
+                select(table.c.file_id, table.c[entity_column])
+                .where(table.c.file_id.in_(file_ids))
+            )))
+            new_pairs = pairs - existing
+            pairs.clear()
+
+            if not new_pairs:
+                continue
+
+            db_session.execute(
+                self._link_inserts[table],
+                [{'file_id': file_id, entity_column: entity_id}
+                 for file_id, entity_id in new_pairs]
+            )
+
+            # One UPDATE per entity rather than one per edge
+            counts = Counter(entity_id for _, entity_id in new_pairs)
+            seen = {'b_seen': now} if 'last_seen' in entity_model.__table__.c else {}
+            db_session.execute(
+                self._file_count_updates[table],
+                [{'b_id': entity_id, 'b_count': n, **seen} for entity_id, n in counts.items()]
+            )
 
     def _migrate_cost_report(self, file_path: Path, verbose: bool = True):
         """
@@ -380,62 +922,35 @@ class JSONMigrator:
         if verbose:
             print(f"\n  Processing: {file_path.name}")
 
-        with open(file_path, 'r') as f:
-            data = json.load(f)
+        data = _load_json(file_path)
 
         # Store cost summary in key-value store
         metadata = data.get('metadata', {})
         report_id = metadata.get('generated_at', file_path.stem)
 
-        # Store cost summary
+        report_key = f"cost_report:{report_id}"
         cost_summary = data.get('cost_summary', {})
-        if cost_summary:
-            self.kv_store.hset(
-                f"cost_report:{report_id}",
-                'summary',
-                cost_summary,
-                namespace='stats'
-            )
-
-        # Store ROI summary
-        roi_summary = data.get('roi_summary', {})
-        if roi_summary:
-            self.kv_store.hset(
-                f"cost_report:{report_id}",
-                'roi',
-                roi_summary,
-                namespace='stats'
-            )
-
-        # Store feature breakdown
         feature_breakdown = cost_summary.get('feature_breakdown', {})
-        for feature_name, feature_data in feature_breakdown.items():
-            self.kv_store.hset(
-                f"feature_stats:{feature_name}",
-                report_id,
-                feature_data,
-                namespace='stats'
-            )
 
-        # Store projections
-        projections = data.get('projections', {})
-        if projections:
-            self.kv_store.hset(
-                f"cost_report:{report_id}",
-                'projections',
-                projections,
-                namespace='stats'
+        # Summary, ROI, projections and recommendations are report fields;
+        # each feature's stats are keyed by report under the feature
+        entries = [
+            (report_key, field, value, 'stats')
+            for field, value in (
+                ('summary', cost_summary),
+                ('roi', data.get('roi_summary', {})),
+                ('projections', data.get('projections', {})),
+                ('recommendations', data.get('recommendations', [])),
             )
+            if value
+        ]
+        entries.extend(
+            (f"feature_stats:{feature_name}", report_id, feature_data, 'stats')
+            for feature_name, feature_data in feature_breakdown.items()
+        )
 
-        # Store recommendations
-        recommendations = data.get('recommendations', [])
-        if recommendations:
-            self.kv_store.hset(
-                f"cost_report:{report_id}",
-                'recommendations',
-                recommendations,
-                namespace='stats'
-            )
+        # One transaction for every field of the report
+        self.kv_store.hmset_many(entries)
 
         self.stats['cost_reports'] += 1
 
@@ -453,8 +968,7 @@ class JSONMigrator:
         if verbose:
             print(f"\n  Processing: {file_path.name}")
 
-        with open(file_path, 'r') as f:
-            data = json.load(f)
+        data = _load_json(file_path)
 
         # Store the entire JSON as a single key
         key = f"json_file:{file_path.stem}"
@@ -487,6 +1001,9 @@ class JSONMigrator:
         """
         Verify the migration by comparing counts.
 
+        Reports already migrated are counted from the totals recorded in
+        the key-value store; only reports without totals are re-read.
+
         Returns:
             Verification results
         """
@@ -496,15 +1013,19 @@ class JSONMigrator:
         results = {}
 
         # Count JSON files
-        json_files = list(self.results_dir.glob('content_organization_report_*.json'))
+        json_files = list(self.results_dir.glob(f'{_ORG_REPORT_PREFIX}*.json'))
         total_json_files = 0
         total_json_records = 0
 
+        recorded = self.kv_store.hgetall(_VERIFY_TOTALS, namespace='audit')
         for f in json_files:
-            with open(f, 'r') as fp:
-                data = json.load(fp)
-                total_json_files += data.get('total_files', 0)
-                total_json_records += len(data.get('results', []))
+            totals = recorded.get(f.stem)
+            if totals is None:
+                counts = _count_report(f)
+            else:
+                counts = (totals['total_files'], totals['records'])
+            total_json_files += counts[0]
+            total_json_records += counts[1]
 
         # Count database records
         db_stats = self.graph_store.get_statistics()
@@ -531,6 +1052,21 @@ class JSONMigrator:
         return results
 
 
+# (dimension table, files column, value width) for interned file attributes
+_DIMENSIONS = (
+    ('extensions', 'extension_id', 20),
+    ('mime_types', 'mime_type_id', 100),
+)
+
+_BULK_PRAGMAS = (
+    'journal_mode=WAL',
+    'synchronous=OFF',
+    'cache_size=-200000',
+    'temp_store=MEMORY',
+    'mmap_size=268435456',
+)
+
+
 def run_migration(db_path: str = 'results/file_organization.db', dry_run: bool = False) -> Dict[str, Any]:
     """
     Run ID generation migration to add canonical_id to all entities.
@@ -548,28 +1084,10 @@ def run_migration(db_path: str = 'results/file_organization.db', dry_run: bool =
         Migration statistics
     """
     import sqlite3
-    import uuid
-    from pathlib import Path
-
-    # Namespace UUIDs for deterministic ID generation (must match models.py)
-    NAMESPACES = {
-        'file': uuid.UUID('f4e8a9c0-1234-5678-9abc-def012345678'),
-        'category': uuid.UUID('c4e8a9c0-2345-6789-abcd-ef0123456789'),
-        'company': uuid.UUID('c0e1a2b3-4567-89ab-cdef-012345678901'),
-        'person': uuid.UUID('d1e2a3b4-5678-9abc-def0-123456789012'),
-        'location': uuid.UUID('e2e3a4b5-6789-abcd-ef01-234567890123'),
-    }
-
-    def generate_canonical_id(namespace: str, name: str) -> str:
-        """Generate deterministic UUID v5 from name."""
-        ns_uuid = NAMESPACES.get(namespace)
-        if not ns_uuid:
-            raise ValueError(f"Unknown namespace: {namespace}")
-        return str(uuid.uuid5(ns_uuid, name.lower().strip()))
 
     def column_exists(conn: sqlite3.Connection, table: str, column: str) -> bool:
-        """Check if a column exists in a table."""
-        cursor = conn.execute(f"PRAGMA table_info({table})")
+        """Check if a column exists in a table, generated columns included."""
+        cursor = conn.execute(f"PRAGMA table_xinfo({table})")
         columns = [row[1] for row in cursor.fetchall()]
         return column in columns
 
@@ -588,6 +1106,11 @@ def run_migration(db_path: str = 'results/file_organization.db', dry_run: bool =
 
     stats = defaultdict(int)
     conn = sqlite3.connect(str(db_path))
+    if not dry_run:
+        # Bulk-import settings: the migration runs offline against a
+        # database nothing else has open, so durability is traded for speed
+        for pragma in _BULK_PRAGMAS:
+            conn.execute(f"PRAGMA {pragma}")
 
     try:
         # Phase 1: Schema Migration
@@ -658,6 +1181,130 @@ def run_migration(db_path: str = 'results/file_organization.db', dry_run: bool =
                 """)
                 print("  Created merge_events table")
 
+        # file_relationships is keyed by the edge itself (WITHOUT ROWID)
+        # instead of a surrogate id; rebuild tables still carrying one
+        if (table_exists(conn, 'file_relationships')
+                and column_exists(conn, 'file_relationships', 'id')):
+            if dry_run:
+                print("  [DRY RUN] Would rebuild file_relationships with a composite key")
+            else:
+                rel_table = FileRelationship.__table__
+                dialect = sqlite_dialect.dialect()
+                columns = ', '.join(column.name for column in rel_table.columns)
+                conn.execute("ALTER TABLE file_relationships RENAME TO file_relationships_old")
+                conn.execute(str(CreateTable(rel_table).compile(dialect=dialect)))
+                cursor = conn.execute(
+                    f"INSERT OR IGNORE INTO file_relationships ({columns}) "
+                    f"SELECT {columns} FROM file_relationships_old"
+                )
+                stats['relationships_rebuilt'] += cursor.rowcount
+                conn.execute("DROP TABLE file_relationships_old")
+                for index in rel_table.indexes:
+                    conn.execute(str(CreateIndex(index).compile(dialect=dialect)))
+                print("  Rebuilt file_relationships with a composite key")
+
+        # Timestamp defaults now live in the schema (server_default); tables
+        # created before that get a trigger filling the column instead
+        for table in Base.metadata.sorted_tables:
+            if not table_exists(conn, table.name):
+                continue
+            defaults = {
+                row[1]: row[4] for row in conn.execute(f"PRAGMA table_info({table.name})")
+            }
+            for column in table.columns:
+                # Only plain defaults; generated columns (Computed) are not timestamps
+                if not isinstance(column.server_default, DefaultClause) or column.computed is not None:
+                    continue
+                if defaults.get(column.name, '') is not None:
+                    continue
+                trigger = f"trg_{table.name}_{column.name}_default"
+                if conn.execute(
+                    "SELECT 1 FROM sqlite_master WHERE type='trigger' AND name=?", (trigger,)
+                ).fetchone():
+                    continue
+                if dry_run:
+                    print(f"  [DRY RUN] Would create trigger {trigger}")
+                else:
+                    conn.execute(f"""
+                        CREATE TRIGGER {trigger}
+                        AFTER INSERT ON {table.name} FOR EACH ROW
+                        WHEN NEW.{column.name} IS NULL
+                        BEGIN
+                            UPDATE {table.name} SET {column.name} = CURRENT_TIMESTAMP
+                            WHERE rowid = NEW.rowid;
+                        END
+                    """)
+                stats['default_triggers'] += 1
+
+        # A stored files.canonical_id (pre-generated-column databases) is no
+        # longer written by inserts; fill it from a trigger instead. Drop the
+        # timestamp trigger an earlier migration mistakenly put on it.
+        if table_exists(conn, 'files') and canonical_id_is_stored(
+                conn.execute("PRAGMA table_xinfo(files)").fetchall()):
+            if dry_run:
+                print(f"  [DRY RUN] Would create trigger {CANONICAL_ID_TRIGGER}")
+            else:
+                conn.execute("DROP TRIGGER IF EXISTS trg_files_canonical_id_default")
+                conn.execute(CANONICAL_ID_TRIGGER_SQL)
+
+        # File extension and MIME type moved to dimension tables
+        legacy_dims = table_exists(conn, 'files') and column_exists(conn, 'files', 'file_extension')
+        if legacy_dims:
+            for dim_table, column, width in _DIMENSIONS:
+                if not table_exists(conn, dim_table):
+                    if dry_run:
+                        print(f"  [DRY RUN] Would create {dim_table} table")
+                    else:
+                        conn.execute(
+                            f"CREATE TABLE {dim_table} (id INTEGER NOT NULL PRIMARY KEY, "
+                            f"value VARCHAR({width}) NOT NULL UNIQUE)"
+                        )
+                        print(f"  Created {dim_table} table")
+                if not column_exists(conn, 'files', column):
+                    if dry_run:
+                        print(f"  [DRY RUN] Would add {column} to files")
+                    else:
+                        conn.execute(
+                            f"ALTER TABLE files ADD COLUMN {column} INTEGER REFERENCES {dim_table}(id)"
+                        )
+                        print(f"  Added {column} to files")
+
+        # Extracted text moved out of the files row into its own table
+        legacy_text = table_exists(conn, 'files') and column_exists(conn, 'files', 'extracted_text')
+        if legacy_text and not table_exists(conn, 'file_extracted_text'):
+            if dry_run:
+                print("  [DRY RUN] Would create file_extracted_text table")
+            else:
+                conn.execute("""
+                    CREATE TABLE file_extracted_text (
+                        file_id VARCHAR(64) NOT NULL PRIMARY KEY REFERENCES files(id),
+                        data BLOB NOT NULL,
+                        length INTEGER
+                    )
+                """)
+                print("  Created file_extracted_text table")
+
+        # Duplicate clusters are tracked by DuplicateGroup rather than
+        # pairwise DUPLICATE edges
+        legacy_groups = (table_exists(conn, 'files')
+                         and not column_exists(conn, 'files', 'duplicate_group_id'))
+        if legacy_groups:
+            if dry_run:
+                print("  [DRY RUN] Would add duplicate_groups and files.duplicate_group_id")
+            else:
+                if not table_exists(conn, 'duplicate_groups'):
+                    dialect = sqlite_dialect.dialect()
+                    group_table = DuplicateGroup.__table__
+                    conn.execute(str(CreateTable(group_table).compile(dialect=dialect)))
+                    for index in group_table.indexes:
+                        conn.execute(str(CreateIndex(index).compile(dialect=dialect)))
+                    print("  Created duplicate_groups table")
+                conn.execute(
+                    "ALTER TABLE files ADD COLUMN duplicate_group_id INTEGER "
+                    "REFERENCES duplicate_groups(id)"
+                )
+                print("  Added duplicate_group_id to files")
+
         if not dry_run:
             conn.commit()
 
@@ -665,85 +1312,127 @@ def run_migration(db_path: str = 'results/file_organization.db', dry_run: bool =
         print("\nPhase 2: Data Backfill")
         print("-" * 40)
 
-        # Backfill files (use urn:sha256:{id} format)
-        if table_exists(conn, 'files'):
-            cursor = conn.execute("SELECT id, original_path FROM files WHERE canonical_id IS NULL")
-            rows = cursor.fetchall()
-            if rows:
-                print(f"  Backfilling {len(rows)} files...")
-                for file_id, _ in rows:
-                    canonical_id = f"urn:sha256:{file_id}"
-                    if not dry_run:
-                        conn.execute("UPDATE files SET canonical_id = ? WHERE id = ?", (canonical_id, file_id))
-                    stats['files_backfilled'] += 1
-                if not dry_run:
-                    conn.commit()
-            else:
-                print("  No files need backfilling")
+        category_id = _canonical_id_builder('category')
+        company_id = _canonical_id_builder('company')
+        person_id = _canonical_id_builder('person')
+        location_id = _canonical_id_builder('location')
+
+        # table -> (columns selected after id, canonical_id builder)
+        backfills = [
+            # Files use urn:sha256:{id} format; only databases created before
+            # it became a generated column store it (and may hold timestamps
+            # from the trigger an earlier migration put there)
+            ('files', 'original_path', lambda file_id, _: f"urn:sha256:{file_id}"),
+            # Categories use full_path for a deterministic ID
+            ('categories', 'full_path, name',
+             lambda _, full_path, name: category_id(full_path or name)),
+            ('companies', 'name', lambda _, name: company_id(name)),
+            ('people', 'name', lambda _, name: person_id(name)),
+            ('locations', 'name', lambda _, name: location_id(name)),
+        ]
 
-        # Backfill categories (use full_path for deterministic ID)
-        if table_exists(conn, 'categories'):
-            cursor = conn.execute("SELECT id, full_path, name FROM categories WHERE canonical_id IS NULL")
-            rows = cursor.fetchall()
-            if rows:
-                print(f"  Backfilling {len(rows)} categories...")
-                for cat_id, full_path, name in rows:
-                    canonical_id = generate_canonical_id('category', full_path or name)
-                    if not dry_run:
-                        conn.execute("UPDATE categories SET canonical_id = ? WHERE id = ?", (canonical_id, cat_id))
-                    stats['categories_backfilled'] += 1
-                if not dry_run:
-                    conn.commit()
-            else:
-                print("  No categories need backfilling")
+        for table, columns, build_id in backfills:
+            if not table_exists(conn, table):
+                continue
 
-        # Backfill companies
-        if table_exists(conn, 'companies'):
-            cursor = conn.execute("SELECT id, name FROM companies WHERE canonical_id IS NULL")
+            pending = "canonical_id IS NULL"
+            if table == 'files':
+                pending += " OR canonical_id <> 'urn:sha256:' || id"
+            cursor = conn.execute(f"SELECT id, {columns} FROM {table} WHERE {pending}")
             rows = cursor.fetchall()
-            if rows:
-                print(f"  Backfilling {len(rows)} companies...")
-                for comp_id, name in rows:
-                    canonical_id = generate_canonical_id('company', name)
-                    if not dry_run:
-                        conn.execute("UPDATE companies SET canonical_id = ? WHERE id = ?", (canonical_id, comp_id))
-                    stats['companies_backfilled'] += 1
-                if not dry_run:
-                    conn.commit()
-            else:
-                print("  No companies need backfilling")
+            if not rows:
+                print(f"  No {table} need backfilling")
+                continue
 
-        # Backfill people
-        if table_exists(conn, 'people'):
-            cursor = conn.execute("SELECT id, name FROM people WHERE canonical_id IS NULL")
-            rows = cursor.fetchall()
-            if rows:
-                print(f"  Backfilling {len(rows)} people...")
-                for person_id, name in rows:
-                    canonical_id = generate_canonical_id('person', name)
-                    if not dry_run:
-                        conn.execute("UPDATE people SET canonical_id = ? WHERE id = ?", (canonical_id, person_id))
-                    stats['people_backfilled'] += 1
+            print(f"  Backfilling {len(rows)} {table}...")
+            if not dry_run:
+                conn.executemany(
+                    f"UPDATE {table} SET canonical_id = ? WHERE id = ?",
+                    [(build_id(*row), row[0]) for row in rows]
+                )
+            stats[f'{table}_backfilled'] += len(rows)
+
+        if legacy_dims:
+            for (dim_table, column, _), legacy in zip(_DIMENSIONS, ('file_extension', 'mime_type')):
+                pending = f"{legacy} IS NOT NULL"
+                if column_exists(conn, 'files', column):
+                    pending += f" AND {column} IS NULL"
+                count = conn.execute(f"SELECT COUNT(*) FROM files WHERE {pending}").fetchone()[0]
+                if not count:
+                    continue
+                print(f"  Interning {legacy} of {count} files...")
                 if not dry_run:
-                    conn.commit()
-            else:
-                print("  No people need backfilling")
+                    conn.execute(
+                        f"INSERT OR IGNORE INTO {dim_table} (value) "
+                        f"SELECT DISTINCT {legacy} FROM files WHERE {legacy} IS NOT NULL"
+                    )
+                    conn.execute(
+                        f"UPDATE files SET {column} = "
+                        f"(SELECT id FROM {dim_table} WHERE value = files.{legacy}) WHERE {pending}"
+                    )
+                stats[f'{column}_interned'] += count
 
-        # Backfill locations
-        if table_exists(conn, 'locations'):
-            cursor = conn.execute("SELECT id, name FROM locations WHERE canonical_id IS NULL")
-            rows = cursor.fetchall()
+        if legacy_text:
+            rows = conn.execute(
+                "SELECT id, extracted_text FROM files WHERE extracted_text IS NOT NULL"
+            ).fetchall()
             if rows:
-                print(f"  Backfilling {len(rows)} locations...")
-                for loc_id, name in rows:
-                    canonical_id = generate_canonical_id('location', name)
-                    if not dry_run:
-                        conn.execute("UPDATE locations SET canonical_id = ? WHERE id = ?", (canonical_id, loc_id))
-                    stats['locations_backfilled'] += 1
+                print(f"  Moving extracted text of {len(rows)} files...")
                 if not dry_run:
-                    conn.commit()
-            else:
-                print("  No locations need backfilling")
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO file_extracted_text (file_id, data, length) "
+                        "VALUES (?, ?, ?)",
+                        [(file_id, compress_text(text), len(text)) for file_id, text in rows]
+                    )
+                    if table_exists(conn, SEARCH_TABLE):
+                        conn.executemany(
+                            f"UPDATE {SEARCH_TABLE} SET extracted_text = ? WHERE rowid = ?",
+                            [(text, _search_rowid(file_id)) for file_id, text in rows]
+                        )
+                    conn.execute("UPDATE files SET extracted_text = NULL")
+                stats['extracted_text_moved'] += len(rows)
+
+        if legacy_groups:
+            groups = conn.execute("""
+                SELECT content_hash, MIN(id), COUNT(*) FROM files
+                WHERE content_hash IS NOT NULL
+                GROUP BY content_hash HAVING COUNT(*) > 1
+            """).fetchall()
+            if groups:
+                print(f"  Grouping {len(groups)} duplicated content hashes...")
+                if not dry_run:
+                    conn.executemany(
+                        "INSERT OR IGNORE INTO duplicate_groups "
+                        "(content_hash, canonical_file_id, member_count) VALUES (?, ?, ?)",
+                        groups
+                    )
+                    conn.execute("""
+                        UPDATE files SET duplicate_group_id = (
+                            SELECT id FROM duplicate_groups g WHERE g.content_hash = files.content_hash
+                        )
+                        WHERE content_hash IN (SELECT content_hash FROM duplicate_groups)
+                    """)
+                stats['duplicate_groups_created'] += len(groups)
+
+        if table_exists(conn, 'file_relationships') and table_exists(conn, 'files'):
+            # Edges between files with the same content are now implied by the group
+            redundant = """
+                FROM file_relationships WHERE relationship_type = 'DUPLICATE' AND EXISTS (
+                    SELECT 1 FROM files s JOIN files t ON s.content_hash = t.content_hash
+                    WHERE s.id = file_relationships.source_file_id
+                    AND t.id = file_relationships.target_file_id
+                )
+            """
+            count = conn.execute(f"SELECT COUNT(*) {redundant}").fetchone()[0]
+            if count:
+                print(f"  Removing {count} DUPLICATE edges covered by duplicate groups...")
+                if not dry_run:
+                    conn.execute(f"DELETE {redundant}")
+                stats['duplicate_edges_removed'] += count
+
+        # One transaction for the whole backfill
+        if not dry_run:
+            conn.commit()
 
         # Phase 3: Create Indexes
         print("\nPhase 3: Create Indexes")
@@ -755,9 +1444,16 @@ def run_migration(db_path: str = 'results/file_organization.db', dry_run: bool =
             ("ix_companies_canonical_id", "companies", "canonical_id"),
             ("ix_people_canonical_id", "people", "canonical_id"),
             ("ix_locations_canonical_id", "locations", "canonical_id"),
+            # Composite query indexes, for databases created before they were declared
+            ("ix_files_session_status_time", "files", "session_id, status, organized_at"),
+            ("ix_files_content_hash_status", "files", "content_hash, status"),
+            ("ix_files_ext_mime", "files", "extension_id, mime_type_id"),
+            ("ix_files_duplicate_group_id", "files", "duplicate_group_id"),
+            ("ix_filerel_tgt_type", "file_relationships", "target_file_id, relationship_type"),
+            ("ix_cost_session_feature", "cost_records", "session_id, feature_name"),
         ]
 
-        for index_name, table, column in indexes:
+        for index_name, table, columns in indexes:
             if not table_exists(conn, table):
                 continue
             # Check if index exists
@@ -773,7 +1469,7 @@ def run_migration(db_path: str = 'results/file_organization.db', dry_run: bool =
                 print(f"  [DRY RUN] Would create index {index_name}")
             else:
                 try:
-                    conn.execute(f"CREATE INDEX IF NOT EXISTS {index_name} ON {table}({column})")
+                    conn.execute(f"CREATE INDEX IF NOT EXISTS {index_name} ON {table}({columns})")
                     print(f"  Created index {index_name}")
                     stats['indexes_created'] += 1
                 except sqlite3.OperationalError as e:
@@ -781,6 +1477,9 @@ def run_migration(db_path: str = 'results/file_organization.db', dry_run: bool =
 
         if not dry_run:
             conn.commit()
+            # Refresh planner statistics for the new columns and indexes
+            conn.execute("ANALYZE")
+            conn.commit()
 
         # Summary
         print("\n" + "=" * 40)
@@ -798,6 +1497,56 @@ def run_migration(db_path: str = 'results/file_organization.db', dry_run: bool =
     return dict(stats)
 
 
+def repack_json_columns(db_path: str = 'results/file_organization.db') -> Dict[str, int]:
+    """
+    Rewrite JSON text left in MessagePack columns as MessagePack BLOBs.
+
+    Reads already accept both formats; this only reclaims the space and
+    decode time of rows written before the switch.
+
+    Args:
+        db_path: Path to the SQLite database
+
+    Returns:
+        Number of rows rewritten per ``table.column``
+    """
+    import sqlite3
+
+    if not MSGPACK_AVAILABLE:
+        print("msgpack is not installed; nothing to repack")
+        return {}
+
+    # Match rows by primary key; WITHOUT ROWID tables have no rowid
+    columns = [
+        (table.name, column.name, [key.name for key in table.primary_key.columns])
+        for table in Base.metadata.sorted_tables
+        for column in table.columns
+        if isinstance(column.type, MsgPackType)
+    ]
+    packer = MsgPackType()
+
+    stats = {}
+    conn = sqlite3.connect(str(db_path))
+    try:
+        for table, column, keys in columns:
+            rows = conn.execute(
+                f"SELECT {column}, {', '.join(keys)} FROM {table} "
+                f"WHERE typeof({column}) = 'text'"
+            ).fetchall()
+            match = ' AND '.join(f"{key} = ?" for key in keys)
+            conn.executemany(
+                f"UPDATE {table} SET {column} = ? WHERE {match}",
+                [(packer.process_bind_param(json.loads(value), None), *key_values)
+                 for value, *key_values in rows]
+            )
+            stats[f"{table}.{column}"] = len(rows)
+        conn.commit()
+    finally:
+        conn.close()
+
+    return stats
+
+
 def main():
     """Run the migration."""
     import argparse
@@ -823,13 +1572,29 @@ def main():
         action='store_true',
         help='Suppress progress output'
     )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=1,
+        help='Processes used to parse organization reports'
+    )
+    parser.add_argument(
+        '--repack-json',
+        action='store_true',
+        help='Rewrite legacy JSON text in MessagePack columns and exit'
+    )
 
     args = parser.parse_args()
 
+    if args.repack_json:
+        stats = repack_json_columns(args.db_path)
+        print(f"Repacked rows: {sum(stats.values())}")
+        return
+
     migrator = JSONMigrator(args.db_path, args.results_dir)
 
     # Run migration
-    stats = migrator.migrate_all(verbose=not args.quiet)
+    stats = migrator.migrate_all(verbose=not args.quiet, workers=args.workers)
 
     # Verify if requested
     if args.verify:
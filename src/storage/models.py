@@ -17,21 +17,46 @@ Key-Value Storage:
 """
 
 from datetime import datetime
-from typing import Optional, List, Dict, Any
+from itertools import chain, islice
+from typing import Optional, List, Dict, Any, Callable, Iterable
 from sqlalchemy import (
-    Column, Integer, String, Float, Boolean, DateTime, Text, JSON,
+    Column, Computed, Integer, String, Float, Boolean, DateTime, Text, JSON, LargeBinary,
     ForeignKey, Index, UniqueConstraint, Table, Enum as SQLEnum,
-    create_engine, event
+    case, create_engine, delete, event, exists, func, insert, inspect, or_, select, text,
+    update
 )
+from sqlalchemy.sql import column, table
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import (
-    declarative_base, relationship, Session, sessionmaker
+    DeclarativeBase, Mapped, mapped_column, relationship, Session, sessionmaker,
+    defer, joinedload, object_session, raiseload, selectinload
 )
 from sqlalchemy.ext.hybrid import hybrid_property
+from sqlalchemy.types import TypeDecorator
 import enum
-import hashlib
+import functools
 import json
+import os
 import uuid
 
+try:
+    from ..uri_utils import _HASH_FACTORY, _SHA1_FACTORY
+except ImportError:
+    from uri_utils import _HASH_FACTORY, _SHA1_FACTORY
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
 
 # Namespace UUIDs for deterministic ID generation (UUID v5)
 # These match the namespaces in src/uri_utils.py for consistency
@@ -45,8 +70,70 @@ NAMESPACES = {
     'merge_event': uuid.UUID('a1b2c3d4-89ab-cdef-0123-456789abcdef'),
 }
 
+# Make unexpected lazy loads raise in list_with_relations (for tests)
+STRICT_LOADING = bool(os.environ.get('STRICT_LOADING'))
+
+
+class MsgPackType(TypeDecorator):
+    """
+    Opaque structured value stored as a MessagePack BLOB.
+
+    For metadata that is never queried with JSON path functions. Without
+    msgpack installed, values are written as JSON text instead. JSON text
+    rows, whether legacy or fallback, always read back, so the column can
+    move between formats without a rewrite.
+    """
+    impl = LargeBinary
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        return dialect.type_descriptor(LargeBinary() if MSGPACK_AVAILABLE else Text())
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        if MSGPACK_AVAILABLE:
+            return msgpack.packb(value)
+        return json.dumps(value)
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        if isinstance(value, str):
+            return json.loads(value)
+        if not MSGPACK_AVAILABLE:
+            raise RuntimeError("msgpack is required to read MessagePack-encoded values")
+        return msgpack.unpackb(value, raw=False, strict_map_key=False)
+
+
+# Zstandard frame header; UTF-8 text can never start with these bytes
+_ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+
+
+def compress_text(text: str) -> bytes:
+    """Encode text for FileExtractedText, zstd-compressed when available."""
+    data = text.encode('utf-8')
+    if ZSTD_AVAILABLE:
+        return zstandard.ZstdCompressor(level=3).compress(data)
+    return data
 
-Base = declarative_base()
+
+def decompress_text(data: bytes) -> str:
+    """Decode text written by ``compress_text``."""
+    if data[:4] == _ZSTD_MAGIC:
+        if not ZSTD_AVAILABLE:
+            raise RuntimeError("zstandard is required to read compressed extracted text")
+        data = zstandard.ZstdDecompressor().decompress(data)
+    return data.decode('utf-8')
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+# Deferred group for bulky JSON columns that list queries never need;
+# load them with ``options(undefer_group(HEAVY_COLUMNS))``
+HEAVY_COLUMNS = 'heavy'
 
 
 class FileStatus(enum.Enum):
@@ -60,7 +147,7 @@ class FileStatus(enum.Enum):
 
 class RelationshipType(enum.Enum):
     """Types of relationships between files."""
-    DUPLICATE = "duplicate"           # Same content hash
+    DUPLICATE = "duplicate"           # Legacy; duplicates are tracked by DuplicateGroup
     SIMILAR = "similar"               # Similar content
     VERSION = "version"               # Different version of same file
     DERIVED = "derived"               # One file derived from another
@@ -76,7 +163,7 @@ file_categories = Table(
     Column('file_id', String(64), ForeignKey('files.id'), primary_key=True),
     Column('category_id', Integer, ForeignKey('categories.id'), primary_key=True),
     Column('confidence', Float, default=1.0),
-    Column('created_at', DateTime, default=datetime.utcnow)
+    Column('created_at', DateTime, server_default=func.now())
 )
 
 file_companies = Table(
@@ -86,7 +173,7 @@ file_companies = Table(
     Column('company_id', Integer, ForeignKey('companies.id'), primary_key=True),
     Column('confidence', Float, default=1.0),
     Column('context', String(255)),  # How the company was detected
-    Column('created_at', DateTime, default=datetime.utcnow)
+    Column('created_at', DateTime, server_default=func.now())
 )
 
 file_people = Table(
@@ -96,7 +183,7 @@ file_people = Table(
     Column('person_id', Integer, ForeignKey('people.id'), primary_key=True),
     Column('role', String(50)),  # author, subject, mentioned, etc.
     Column('confidence', Float, default=1.0),
-    Column('created_at', DateTime, default=datetime.utcnow)
+    Column('created_at', DateTime, server_default=func.now())
 )
 
 file_locations = Table(
@@ -106,7 +193,7 @@ file_locations = Table(
     Column('location_id', Integer, ForeignKey('locations.id'), primary_key=True),
     Column('location_type', String(50)),  # captured_at, mentioned, subject
     Column('confidence', Float, default=1.0),
-    Column('created_at', DateTime, default=datetime.utcnow)
+    Column('created_at', DateTime, server_default=func.now())
 )
 
 
@@ -126,8 +213,11 @@ class File(Base):
     # Primary key is hash of original path
     id = Column(String(64), primary_key=True)
 
-    # Public canonical ID for JSON-LD @id (urn:sha256:{hash} format)
-    canonical_id = Column(String(100), unique=True, index=True)
+    # Public canonical ID for JSON-LD @id (urn:sha256:{hash} format),
+    # derived by SQLite from id rather than sent with every insert
+    canonical_id = Column(
+        String(100), Computed("'urn:sha256:' || id", persisted=False), unique=True, index=True
+    )
 
     # Historical IDs for deduplication (previous paths, external IDs)
     source_ids = Column(JSON, default=list)
@@ -136,12 +226,14 @@ class File(Base):
     filename = Column(String(255), nullable=False, index=True)
     original_path = Column(Text, nullable=False)
     current_path = Column(Text)  # Where it is now (after organization)
-    file_extension = Column(String(20), index=True)
-    mime_type = Column(String(100))
+    # Interned via dimension tables; read and set through file_extension/mime_type
+    extension_id = Column(Integer, ForeignKey('extensions.id'), index=True)
+    mime_type_id = Column(Integer, ForeignKey('mime_types.id'))
 
     # File properties
     file_size = Column(Integer)
     content_hash = Column(String(64), index=True)  # SHA-256 of content
+    duplicate_group_id = Column(Integer, ForeignKey('duplicate_groups.id'), index=True)
     created_at = Column(DateTime)
     modified_at = Column(DateTime)
     organized_at = Column(DateTime)
@@ -150,20 +242,22 @@ class File(Base):
     status = Column(SQLEnum(FileStatus), default=FileStatus.PENDING, index=True)
     organization_reason = Column(Text)
 
-    # Extracted content
-    extracted_text = Column(Text)
+    # Extracted content (text itself lives in FileExtractedText)
     extracted_text_length = Column(Integer, default=0)
 
     # Schema.org metadata (stored as JSON)
     schema_type = Column(String(50))  # ImageObject, Document, etc.
-    schema_data = Column(JSON)
+    schema_data: Mapped[Optional[Any]] = mapped_column(MsgPackType, deferred=True,
+                                                       deferred_group=HEAVY_COLUMNS)
 
     # Image-specific metadata
     image_width = Column(Integer)
     image_height = Column(Integer)
     has_faces = Column(Boolean)
     face_count = Column(Integer)
-    image_classification = Column(JSON)  # CLIP classification scores
+    # CLIP classification scores
+    image_classification: Mapped[Optional[Any]] = mapped_column(
+        MsgPackType, deferred=True, deferred_group=HEAVY_COLUMNS)
 
     # EXIF metadata
     exif_datetime = Column(DateTime)
@@ -175,17 +269,30 @@ class File(Base):
     session_id = Column(String(64), ForeignKey('organization_sessions.id'))
 
     # Timestamps
-    db_created_at = Column(DateTime, default=datetime.utcnow)
-    db_updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
-
-    # Relationships
-    categories = relationship('Category', secondary=file_categories, back_populates='files')
-    companies = relationship('Company', secondary=file_companies, back_populates='files')
-    people = relationship('Person', secondary=file_people, back_populates='files')
-    locations = relationship('Location', secondary=file_locations, back_populates='files')
-    session = relationship('OrganizationSession', back_populates='files')
+    db_created_at = Column(DateTime, server_default=func.now())
+    db_updated_at = Column(DateTime, server_default=func.now(), onupdate=datetime.utcnow)
+
+    # Relationships (entity lists load with one IN query per relationship
+    # for all files in a result, rather than one query per file)
+    categories = relationship('Category', secondary=file_categories, back_populates='files',
+                              lazy='selectin')
+    companies = relationship('Company', secondary=file_companies, back_populates='files',
+                             lazy='selectin')
+    people = relationship('Person', secondary=file_people, back_populates='files',
+                          lazy='selectin')
+    locations = relationship('Location', secondary=file_locations, back_populates='files',
+                             lazy='selectin')
+    session = relationship('OrganizationSession', back_populates='files', lazy='joined')
     cost_records = relationship('CostRecord', back_populates='file')
-    schema_metadata = relationship('SchemaMetadata', back_populates='file', uselist=False)
+    schema_metadata = relationship('SchemaMetadata', back_populates='file', uselist=False,
+                                   lazy='joined')
+    duplicate_group = relationship('DuplicateGroup', foreign_keys=[duplicate_group_id],
+                                   back_populates='members')
+    extension_row = relationship('Extension', lazy='joined')
+    mime_type_row = relationship('MimeType', lazy='joined')
+    # Only loaded when extracted_text is read
+    extracted_text_blob = relationship('FileExtractedText', back_populates='file', uselist=False,
+                                       cascade='all, delete-orphan')
 
     # Self-referential relationships (graph edges)
     related_to = relationship(
@@ -202,19 +309,32 @@ class File(Base):
     # Additional composite indexes (single-column indexes handled by index=True on columns)
     __table_args__ = (
         Index('ix_files_organized_at', 'organized_at'),
+        # Session listings filtered by status, ordered by time
+        Index('ix_files_session_status_time', 'session_id', 'status', 'organized_at'),
+        # Duplicate detection by content hash
+        Index('ix_files_content_hash_status', 'content_hash', 'status'),
+        Index('ix_files_ext_mime', 'extension_id', 'mime_type_id'),
     )
 
     @staticmethod
+    @functools.lru_cache(maxsize=65536)
     def generate_id(path: str) -> str:
-        """Generate a deterministic ID from the file path."""
-        return hashlib.sha256(path.encode()).hexdigest()
+        """
+        Generate a deterministic ID from the file path.
+
+        Results are memoized, since the same paths recur across reports
+        and repeated migration runs.
+        """
+        return _HASH_FACTORY(path.encode()).hexdigest()
 
     @staticmethod
+    @functools.lru_cache(maxsize=65536)
     def generate_canonical_id(path: str) -> str:
         """
         Generate canonical IRI for JSON-LD @id from file path.
 
-        Uses SHA-256 hash of the path in URN format.
+        Uses SHA-256 hash of the path in URN format, memoized like
+        ``generate_id``.
 
         Args:
             path: File path (absolute recommended)
@@ -222,8 +342,7 @@ class File(Base):
         Returns:
             URN string (urn:sha256:{hash})
         """
-        file_hash = hashlib.sha256(path.encode()).hexdigest()
-        return f"urn:sha256:{file_hash}"
+        return f"urn:sha256:{File.generate_id(path)}"
 
     def get_iri(self) -> str:
         """Get the JSON-LD @id IRI for this file."""
@@ -231,29 +350,451 @@ class File(Base):
             return self.canonical_id
         return f"urn:sha256:{self.id}"
 
+    @hybrid_property
+    def file_extension(self) -> Optional[str]:
+        return _dimension_value(self, 'extension_row', '_pending_extension')
+
+    @file_extension.setter
+    def file_extension(self, value: Optional[str]) -> None:
+        _set_dimension(self, 'extension_row', '_pending_extension', Extension, value)
+
+    @file_extension.expression
+    def file_extension(cls):
+        return select(Extension.value).where(Extension.id == cls.extension_id).scalar_subquery()
+
+    @hybrid_property
+    def mime_type(self) -> Optional[str]:
+        return _dimension_value(self, 'mime_type_row', '_pending_mime_type')
+
+    @mime_type.setter
+    def mime_type(self, value: Optional[str]) -> None:
+        _set_dimension(self, 'mime_type_row', '_pending_mime_type', MimeType, value)
+
+    @mime_type.expression
+    def mime_type(cls):
+        return select(MimeType.value).where(MimeType.id == cls.mime_type_id).scalar_subquery()
+
+    @property
+    def extracted_text(self) -> Optional[str]:
+        """Full extracted text, decompressed from FileExtractedText."""
+        blob = self.extracted_text_blob
+        return decompress_text(blob.data) if blob else None
+
+    @extracted_text.setter
+    def extracted_text(self, text: Optional[str]) -> None:
+        if text is None:
+            self.extracted_text_blob = None
+            return
+        data = compress_text(text)
+        if self.extracted_text_blob:
+            self.extracted_text_blob.data = data
+            self.extracted_text_blob.length = len(text)
+        else:
+            self.extracted_text_blob = FileExtractedText(data=data, length=len(text))
+
     @hybrid_property
     def is_organized(self) -> bool:
         return self.status == FileStatus.ORGANIZED
 
+    @staticmethod
+    def list_with_relations(session: Session, ids: Iterable[str]) -> List['File']:
+        """
+        Load files with everything ``to_dict`` touches in a fixed number of queries.
+
+        With ``STRICT_LOADING`` set in the environment, any other lazy load
+        (including the deferred heavy columns) raises instead of silently
+        issuing a query per file.
+
+        Args:
+            session: Database session
+            ids: File IDs to load
+
+        Returns:
+            List of File objects
+        """
+        options = [
+            selectinload(File.categories),
+            selectinload(File.companies),
+            selectinload(File.people),
+            selectinload(File.locations),
+            joinedload(File.schema_metadata),
+            joinedload(File.extension_row),
+            joinedload(File.mime_type_row),
+        ]
+        if STRICT_LOADING:
+            options.append(raiseload('*'))
+            options.extend(defer(column, raiseload=True)
+                           for column in (File.schema_data, File.image_classification))
+        stmt = select(File).where(File.id.in_(list(ids))).options(*options)
+        return list(session.scalars(stmt).unique())
+
+    # Columns of the generated to_dict_slim (see _compile_to_dict); an
+    # expression string replaces reading the same-named attribute
+    _dict_fields = {
+        'id': None,
+        '@id': "self.canonical_id or 'urn:sha256:' + self.id",
+        'canonical_id': None,
+        'filename': None,
+        'original_path': None,
+        'current_path': None,
+        'file_extension': None,
+        'mime_type': None,
+        'file_size': None,
+        'status': None,
+        'schema_type': None,
+        'organized_at': None,
+    }
+
+    def to_dict_full(self, categories: List[str], companies: List[str],
+                     people: List[str]) -> Dict[str, Any]:
+        """
+        Convert to dictionary with caller-supplied relationship names.
+
+        Args:
+            categories: Category names, already loaded by the caller
+            companies: Company names, already loaded by the caller
+            people: Person names, already loaded by the caller
+        """
+        data = self.to_dict_slim()
+        data['categories'] = categories
+        data['companies'] = companies
+        data['people'] = people
+        return data
+
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for JSON serialization."""
-        return {
-            'id': self.id,
-            '@id': self.get_iri(),
-            'canonical_id': self.canonical_id,
-            'filename': self.filename,
-            'original_path': self.original_path,
-            'current_path': self.current_path,
-            'file_extension': self.file_extension,
-            'mime_type': self.mime_type,
-            'file_size': self.file_size,
-            'status': self.status.value if self.status else None,
-            'categories': [c.name for c in self.categories],
-            'companies': [c.name for c in self.companies],
-            'people': [p.name for p in self.people],
-            'schema_type': self.schema_type,
-            'organized_at': self.organized_at.isoformat() if self.organized_at else None,
+        return self.to_dict_full(
+            [c.name for c in self.categories],
+            [c.name for c in self.companies],
+            [p.name for p in self.people],
+        )
+
+
+class FileExtractedText(Base):
+    """
+    Extracted text for a file, kept out of the files row.
+
+    OCR output can run to megabytes; storing it here keeps file scans
+    reading small rows. Text is zstd-compressed when zstandard is installed.
+    """
+    __tablename__ = 'file_extracted_text'
+
+    file_id = Column(String(64), ForeignKey('files.id'), primary_key=True)
+    data = Column(LargeBinary, nullable=False)
+    length = Column(Integer)
+
+    file = relationship('File', back_populates='extracted_text_blob')
+
+
+class DuplicateGroup(Base):
+    """
+    Files sharing one content hash.
+
+    Each member points at its group, so a cluster of K copies costs K
+    foreign keys instead of K² DUPLICATE edges in file_relationships.
+    """
+    __tablename__ = 'duplicate_groups'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    content_hash = Column(String(64), unique=True, index=True, nullable=False)
+    canonical_file_id = Column(String(64), ForeignKey('files.id', use_alter=True,
+                                                      name='fk_duplicate_groups_canonical_file'))
+    member_count = Column(Integer, default=0)
+
+    members = relationship('File', foreign_keys='File.duplicate_group_id',
+                           back_populates='duplicate_group', lazy='selectin')
+    canonical_file = relationship('File', foreign_keys=[canonical_file_id])
+
+
+class Extension(Base):
+    """Dimension table of distinct file extensions (e.g. '.pdf')."""
+    __tablename__ = 'extensions'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    value = Column(String(20), unique=True, nullable=False)
+
+
+class MimeType(Base):
+    """Dimension table of distinct MIME types."""
+    __tablename__ = 'mime_types'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    value = Column(String(100), unique=True, nullable=False)
+
+
+def intern_dimension(session: Session, model, value: str):
+    """
+    Get or create the dimension row for a value.
+
+    Rows are cached in ``session.info`` so each distinct value costs at
+    most one lookup per session.
+
+    Args:
+        session: Database session
+        model: Extension or MimeType
+        value: Value to intern
+
+    Returns:
+        The dimension row (pending if newly created)
+    """
+    cache = session.info.setdefault(model.__tablename__, {})
+    row = cache.get(value)
+    if row is None:
+        with session.no_autoflush:
+            row = session.query(model).filter(model.value == value).one_or_none()
+        if row is None:
+            row = model(value=value)
+            session.add(row)
+        cache[value] = row
+    return row
+
+
+def _dimension_value(file: 'File', relation: str, pending: str) -> Optional[str]:
+    """Read an interned value, falling back to one not yet flushed."""
+    if pending in file.__dict__:
+        return file.__dict__[pending]
+    row = getattr(file, relation)
+    return row.value if row is not None else None
+
+
+def _set_dimension(file: 'File', relation: str, pending: str, model, value: Optional[str]) -> None:
+    """Point a file at the dimension row for value, deferring until it has a session."""
+    session = object_session(file)
+    if value is None:
+        file.__dict__.pop(pending, None)
+        setattr(file, relation, None)
+    elif session is not None:
+        file.__dict__.pop(pending, None)
+        setattr(file, relation, intern_dimension(session, model, value))
+    else:
+        file.__dict__[pending] = value
+
+
+@event.listens_for(Session, 'before_flush')
+def _intern_pending_dimensions(session, flush_context, instances):
+    """Resolve extension/MIME strings set on files created outside a session."""
+    for obj in list(session.new):
+        if not isinstance(obj, File):
+            continue
+        for relation, pending, model in (
+            ('extension_row', '_pending_extension', Extension),
+            ('mime_type_row', '_pending_mime_type', MimeType),
+        ):
+            value = obj.__dict__.pop(pending, None)
+            if value is not None:
+                setattr(obj, relation, intern_dimension(session, model, value))
+
+
+# Databases created before File.canonical_id became a generated column keep
+# a stored one, which inserts (that no longer name it) would leave NULL; this
+# trigger fills it with the value the generated column computes
+CANONICAL_ID_TRIGGER = 'trg_files_canonical_id'
+CANONICAL_ID_TRIGGER_SQL = f"""
+    CREATE TRIGGER IF NOT EXISTS {CANONICAL_ID_TRIGGER}
+    AFTER INSERT ON files FOR EACH ROW
+    WHEN NEW.canonical_id IS NULL
+    BEGIN
+        UPDATE files SET canonical_id = 'urn:sha256:' || NEW.id WHERE rowid = NEW.rowid;
+    END
+"""
+
+
+def canonical_id_is_stored(columns: Iterable[tuple]) -> bool:
+    """
+    Whether files.canonical_id is a legacy stored column.
+
+    Args:
+        columns: ``PRAGMA table_xinfo(files)`` rows
+
+    Returns:
+        True if the column exists and is not generated
+    """
+    # table_xinfo's hidden flag is 2 or 3 for generated columns
+    return any(row[1] == 'canonical_id' and row[6] == 0 for row in columns)
+
+
+def create_canonical_id_trigger(connection) -> bool:
+    """
+    Install the canonical ID trigger on a database with a stored column.
+
+    Args:
+        connection: SQLAlchemy connection
+
+    Returns:
+        True if files.canonical_id is stored (the trigger now exists)
+    """
+    if not canonical_id_is_stored(connection.exec_driver_sql("PRAGMA table_xinfo(files)")):
+        return False
+    connection.exec_driver_sql(CANONICAL_ID_TRIGGER_SQL)
+    return True
+
+
+# Full-text index over file names and extracted text. A regular (not
+# external-content) FTS5 table, since extracted text is stored compressed.
+# The trigram tokenizer matches any case-insensitive substring of three or
+# more characters, the same semantics as the LIKE scan it replaces.
+SEARCH_TABLE = 'file_search'
+SEARCH_MIN_QUERY = 3
+_SEARCH_CHUNK = 500
+
+# connection.info key caching which virtual tables exist on a connection
+_VIRTUAL_TABLES_KEY = 'virtual_tables'
+
+
+def _search_rowid(file_id: str) -> int:
+    """Stable FTS rowid for a file; files.rowid may be renumbered by VACUUM."""
+    if len(file_id) == 64:
+        try:
+            return int(file_id[:15], 16)
+        except ValueError:
+            pass  # Not a hex digest; hash it like any other ID
+    return int(_HASH_FACTORY(file_id.encode()).hexdigest()[:15], 16)
+
+
+def _virtual_table_available(connection, name: str) -> bool:
+    """Whether a virtual table exists, cached per DBAPI connection."""
+    tables = connection.info.setdefault(_VIRTUAL_TABLES_KEY, {})
+    available = tables.get(name)
+    if available is None:
+        available = connection.exec_driver_sql(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)
+        ).first() is not None
+        tables[name] = available
+    return available
+
+
+def _create_virtual_table(connection, name: str, module: str) -> Optional[bool]:
+    """
+    Create a virtual table if it does not exist.
+
+    Args:
+        connection: SQLAlchemy connection
+        name: Table name
+        module: Module and arguments, e.g. ``fts5(a, b)``
+
+    Returns:
+        True if the table was created, False if it already existed,
+        None if this SQLite build lacks the module
+    """
+    if _virtual_table_available(connection, name):
+        return False
+    try:
+        connection.exec_driver_sql(f"CREATE VIRTUAL TABLE {name} USING {module}")
+    except OperationalError:
+        return None
+    connection.info[_VIRTUAL_TABLES_KEY][name] = True
+    return True
+
+
+def create_search_index(connection) -> Optional[bool]:
+    """
+    Create the full-text search table if it does not exist.
+
+    Args:
+        connection: SQLAlchemy connection
+
+    Returns:
+        True if the table was created, False if it already existed,
+        None if this SQLite build lacks FTS5 or the trigram tokenizer
+    """
+    return _create_virtual_table(
+        connection, SEARCH_TABLE,
+        "fts5(file_id UNINDEXED, filename, extracted_text, tokenize='trigram')"
+    )
+
+
+def search_index_available(connection) -> bool:
+    """Whether the full-text search table exists."""
+    return _virtual_table_available(connection, SEARCH_TABLE)
+
+
+def index_files_for_search(connection, file_ids: Iterable[str]) -> None:
+    """
+    Refresh the search rows of the given files.
+
+    Files that no longer exist are dropped from the index.
+
+    Args:
+        connection: SQLAlchemy connection
+        file_ids: IDs of files whose name or extracted text changed
+    """
+    file_ids = iter(file_ids)
+    while True:
+        chunk = list(islice(file_ids, _SEARCH_CHUNK))
+        if not chunk:
+            return
+        connection.execute(
+            text(f"DELETE FROM {SEARCH_TABLE} WHERE rowid = :rowid"),
+            [{'rowid': _search_rowid(file_id)} for file_id in chunk]
+        )
+        rows = connection.execute(
+            select(File.id, File.filename, FileExtractedText.data)
+            .outerjoin(FileExtractedText, FileExtractedText.file_id == File.id)
+            .where(File.id.in_(chunk))
+        )
+        _insert_search_rows(connection, rows)
+
+
+def rebuild_search_index(connection) -> None:
+    """
+    Re-index every file, creating the search table if needed.
+
+    Args:
+        connection: SQLAlchemy connection
+    """
+    if create_search_index(connection) is None:
+        return
+    connection.exec_driver_sql(f"DELETE FROM {SEARCH_TABLE}")
+    rows = connection.execution_options(yield_per=_SEARCH_CHUNK).execute(
+        select(File.id, File.filename, FileExtractedText.data)
+        .outerjoin(FileExtractedText, FileExtractedText.file_id == File.id)
+    )
+    for chunk in rows.partitions():
+        _insert_search_rows(connection, chunk)
+
+
+def _insert_search_rows(connection, rows) -> None:
+    params = [
+        {
+            'rowid': _search_rowid(file_id),
+            'file_id': file_id,
+            'filename': filename,
+            'extracted_text': decompress_text(data) if data is not None else None,
         }
+        for file_id, filename, data in rows
+    ]
+    if params:
+        connection.execute(
+            text(f"INSERT INTO {SEARCH_TABLE} (rowid, file_id, filename, extracted_text) "
+                 "VALUES (:rowid, :file_id, :filename, :extracted_text)"),
+            params
+        )
+
+
+def _search_fields_changed(obj) -> bool:
+    if isinstance(obj, File):
+        attrs = inspect(obj).attrs
+        return attrs.filename.history.has_changes() or attrs.id.history.has_changes()
+    return isinstance(obj, FileExtractedText)
+
+
+@event.listens_for(Session, 'after_flush')
+def _index_flushed_files(session, flush_context):
+    """Keep the search index in step with flushed file names and text."""
+    file_ids = set()
+    for obj in session.new | session.deleted:
+        if isinstance(obj, File):
+            file_ids.add(obj.id)
+        elif isinstance(obj, FileExtractedText):
+            file_ids.add(obj.file_id)
+    for obj in session.dirty:
+        if _search_fields_changed(obj):
+            file_ids.add(obj.id if isinstance(obj, File) else obj.file_id)
+    file_ids.discard(None)
+    if file_ids:
+        connection = session.connection()
+        if search_index_available(connection):
+            index_files_for_search(connection, file_ids)
 
 
 class Category(Base):
@@ -294,17 +835,22 @@ class Category(Base):
     file_count = Column(Integer, default=0)
 
     # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, server_default=func.now())
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=datetime.utcnow)
 
     # Relationships
     files = relationship('File', secondary=file_categories, back_populates='categories')
-    parent = relationship('Category', remote_side=[id], backref='subcategories',
-                         foreign_keys=[parent_id])
+    parent = relationship('Category', remote_side=[id], back_populates='subcategories',
+                          foreign_keys=[parent_id])
+    # One IN query per tree level when walking the hierarchy; self-referential
+    # eager loads stop at join_depth, which covers category/subcategory trees
+    subcategories = relationship('Category', back_populates='parent',
+                                 foreign_keys=[parent_id], lazy='selectin', join_depth=4)
     merged_into = relationship('Category', remote_side=[id],
                               foreign_keys=[merged_into_id])
 
     @staticmethod
+    @functools.lru_cache(maxsize=65536)
     def generate_canonical_id(name: str) -> str:
         """
         Generate deterministic UUID v5 from category name.
@@ -324,16 +870,16 @@ class Category(Base):
         """Get the JSON-LD @id IRI for this category."""
         return f"urn:uuid:{self.canonical_id}"
 
-    def to_dict(self) -> Dict[str, Any]:
-        return {
-            'id': self.id,
-            '@id': self.get_iri() if self.canonical_id else None,
-            'canonical_id': self.canonical_id,
-            'name': self.name,
-            'full_path': self.full_path,
-            'level': self.level,
-            'file_count': self.file_count,
-        }
+    # Fields of the generated to_dict
+    _dict_fields = {
+        'id': None,
+        '@id': "'urn:uuid:' + self.canonical_id if self.canonical_id else None",
+        'canonical_id': None,
+        'name': None,
+        'full_path': None,
+        'level': None,
+        'file_count': None,
+    }
 
 
 class Company(Base):
@@ -367,8 +913,8 @@ class Company(Base):
 
     # Statistics
     file_count = Column(Integer, default=0)
-    first_seen = Column(DateTime, default=datetime.utcnow)
-    last_seen = Column(DateTime, default=datetime.utcnow)
+    first_seen = Column(DateTime, server_default=func.now())
+    last_seen = Column(DateTime, server_default=func.now())
 
     # Relationships
     files = relationship('File', secondary=file_companies, back_populates='companies')
@@ -379,11 +925,13 @@ class Company(Base):
     )
 
     @staticmethod
+    @functools.lru_cache(maxsize=65536)
     def normalize_name(name: str) -> str:
-        """Normalize company name for deduplication."""
+        """Normalize company name for deduplication (memoized; names recur across files)."""
         return name.lower().strip()
 
     @staticmethod
+    @functools.lru_cache(maxsize=65536)
     def generate_canonical_id(name: str) -> str:
         """
         Generate deterministic UUID v5 from company name.
@@ -400,15 +948,15 @@ class Company(Base):
         """Get the JSON-LD @id IRI for this company."""
         return f"urn:uuid:{self.canonical_id}"
 
-    def to_dict(self) -> Dict[str, Any]:
-        return {
-            'id': self.id,
-            '@id': self.get_iri() if self.canonical_id else None,
-            'canonical_id': self.canonical_id,
-            'name': self.name,
-            'domain': self.domain,
-            'file_count': self.file_count,
-        }
+    # Fields of the generated to_dict
+    _dict_fields = {
+        'id': None,
+        '@id': "'urn:uuid:' + self.canonical_id if self.canonical_id else None",
+        'canonical_id': None,
+        'name': None,
+        'domain': None,
+        'file_count': None,
+    }
 
 
 class Person(Base):
@@ -442,19 +990,21 @@ class Person(Base):
 
     # Statistics
     file_count = Column(Integer, default=0)
-    first_seen = Column(DateTime, default=datetime.utcnow)
-    last_seen = Column(DateTime, default=datetime.utcnow)
+    first_seen = Column(DateTime, server_default=func.now())
+    last_seen = Column(DateTime, server_default=func.now())
 
     # Relationships
     files = relationship('File', secondary=file_people, back_populates='people')
     merged_into = relationship('Person', remote_side=[id])
 
     @staticmethod
+    @functools.lru_cache(maxsize=65536)
     def normalize_name(name: str) -> str:
-        """Normalize person name for deduplication."""
+        """Normalize person name for deduplication (memoized; names recur across files)."""
         return name.lower().strip()
 
     @staticmethod
+    @functools.lru_cache(maxsize=65536)
     def generate_canonical_id(name: str) -> str:
         """
         Generate deterministic UUID v5 from person name.
@@ -471,15 +1021,15 @@ class Person(Base):
         """Get the JSON-LD @id IRI for this person."""
         return f"urn:uuid:{self.canonical_id}"
 
-    def to_dict(self) -> Dict[str, Any]:
-        return {
-            'id': self.id,
-            '@id': self.get_iri() if self.canonical_id else None,
-            'canonical_id': self.canonical_id,
-            'name': self.name,
-            'email': self.email,
-            'file_count': self.file_count,
-        }
+    # Fields of the generated to_dict
+    _dict_fields = {
+        'id': None,
+        '@id': "'urn:uuid:' + self.canonical_id if self.canonical_id else None",
+        'canonical_id': None,
+        'name': None,
+        'email': None,
+        'file_count': None,
+    }
 
 
 class Location(Base):
@@ -520,7 +1070,7 @@ class Location(Base):
     file_count = Column(Integer, default=0)
 
     # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, server_default=func.now())
 
     # Relationships
     files = relationship('File', secondary=file_locations, back_populates='locations')
@@ -532,6 +1082,7 @@ class Location(Base):
     )
 
     @staticmethod
+    @functools.lru_cache(maxsize=65536)
     def generate_canonical_id(name: str) -> str:
         """
         Generate deterministic UUID v5 from location name.
@@ -548,19 +1099,108 @@ class Location(Base):
         """Get the JSON-LD @id IRI for this location."""
         return f"urn:uuid:{self.canonical_id}"
 
-    def to_dict(self) -> Dict[str, Any]:
-        return {
-            'id': self.id,
-            '@id': self.get_iri() if self.canonical_id else None,
-            'canonical_id': self.canonical_id,
-            'name': self.name,
-            'city': self.city,
-            'state': self.state,
-            'country': self.country,
-            'latitude': self.latitude,
-            'longitude': self.longitude,
-            'file_count': self.file_count,
-        }
+    # Fields of the generated to_dict
+    _dict_fields = {
+        'id': None,
+        '@id': "'urn:uuid:' + self.canonical_id if self.canonical_id else None",
+        'canonical_id': None,
+        'name': None,
+        'city': None,
+        'state': None,
+        'country': None,
+        'latitude': None,
+        'longitude': None,
+        'file_count': None,
+    }
+
+
+# R*Tree over location coordinates, so proximity lookups probe an index
+# instead of scanning. Each location is a one-point box keyed by its id.
+LOCATION_RTREE = 'locations_rtree'
+locations_rtree = table(
+    LOCATION_RTREE,
+    column('id'), column('min_lat'), column('max_lat'), column('min_lon'), column('max_lon'),
+)
+
+
+def create_location_index(connection) -> Optional[bool]:
+    """
+    Create the location R*Tree if it does not exist.
+
+    Args:
+        connection: SQLAlchemy connection
+
+    Returns:
+        True if the table was created, False if it already existed,
+        None if this SQLite build lacks the R*Tree module
+    """
+    return _create_virtual_table(
+        connection, LOCATION_RTREE, 'rtree(id, min_lat, max_lat, min_lon, max_lon)'
+    )
+
+
+def location_index_available(connection) -> bool:
+    """Whether the location R*Tree exists."""
+    return _virtual_table_available(connection, LOCATION_RTREE)
+
+
+def index_locations(connection, location_ids: Iterable[int]) -> None:
+    """
+    Refresh the R*Tree boxes of the given locations.
+
+    Locations without coordinates, or that no longer exist, are dropped.
+
+    Args:
+        connection: SQLAlchemy connection
+        location_ids: IDs of locations whose coordinates changed
+    """
+    location_ids = list(location_ids)
+    connection.execute(
+        locations_rtree.delete().where(locations_rtree.c.id.in_(location_ids))
+    )
+    _insert_location_boxes(connection, Location.id.in_(location_ids))
+
+
+def rebuild_location_index(connection) -> None:
+    """
+    Re-index every location, creating the R*Tree if needed.
+
+    Args:
+        connection: SQLAlchemy connection
+    """
+    if create_location_index(connection) is None:
+        return
+    connection.execute(locations_rtree.delete())
+    _insert_location_boxes(connection)
+
+
+def _insert_location_boxes(connection, *criteria) -> None:
+    connection.execute(
+        locations_rtree.insert().from_select(
+            ['id', 'min_lat', 'max_lat', 'min_lon', 'max_lon'],
+            select(Location.id, Location.latitude, Location.latitude,
+                   Location.longitude, Location.longitude)
+            .where(Location.latitude.is_not(None), Location.longitude.is_not(None), *criteria)
+        )
+    )
+
+
+@event.listens_for(Session, 'after_flush')
+def _index_flushed_locations(session, flush_context):
+    """Keep the location R*Tree in step with flushed coordinates."""
+    location_ids = {
+        obj.id for obj in session.new | session.deleted if isinstance(obj, Location)
+    }
+    for obj in session.dirty:
+        if isinstance(obj, Location):
+            attrs = inspect(obj).attrs
+            if attrs.latitude.history.has_changes() or attrs.longitude.history.has_changes():
+                location_ids.add(obj.id)
+    location_ids.discard(None)
+    if location_ids:
+        connection = session.connection()
+        if location_index_available(connection):
+            index_locations(connection, location_ids)
 
 
 class FileRelationship(Base):
@@ -571,26 +1211,29 @@ class FileRelationship(Base):
     """
     __tablename__ = 'file_relationships'
 
-    id = Column(Integer, primary_key=True, autoincrement=True)
-    source_file_id = Column(String(64), ForeignKey('files.id'), nullable=False, index=True)
-    target_file_id = Column(String(64), ForeignKey('files.id'), nullable=False, index=True)
-    relationship_type = Column(SQLEnum(RelationshipType), nullable=False, index=True)
+    # Keyed by the edge itself; column order doubles as the
+    # neighbors-by-type index for forward traversal
+    source_file_id = Column(String(64), ForeignKey('files.id'), primary_key=True)
+    relationship_type = Column(SQLEnum(RelationshipType), primary_key=True)
+    target_file_id = Column(String(64), ForeignKey('files.id'), primary_key=True)
 
     # Relationship metadata
     confidence = Column(Float, default=1.0)
-    extra_data = Column(JSON)  # Additional relationship-specific data
+    # Additional relationship-specific data
+    extra_data: Mapped[Optional[Any]] = mapped_column(MsgPackType, deferred=True,
+                                                      deferred_group=HEAVY_COLUMNS)
 
     # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, server_default=func.now())
 
     # Relationships
     source_file = relationship('File', foreign_keys=[source_file_id], back_populates='related_to')
     target_file = relationship('File', foreign_keys=[target_file_id], back_populates='related_from')
 
     __table_args__ = (
-        UniqueConstraint('source_file_id', 'target_file_id', 'relationship_type',
-                        name='uq_file_relationship'),
-        Index('ix_file_rel_type', 'relationship_type'),
+        # Reverse traversal (edges pointing at a file)
+        Index('ix_filerel_tgt_type', 'target_file_id', 'relationship_type'),
+        {'sqlite_with_rowid': False},
     )
 
 
@@ -608,7 +1251,9 @@ class OrganizationSession(Base):
     dry_run = Column(Boolean, default=False)
 
     # Session parameters
-    source_directories = Column(JSON)  # List of source paths
+    # List of source paths
+    source_directories: Mapped[Optional[Any]] = mapped_column(JSON, deferred=True,
+                                                              deferred_group=HEAVY_COLUMNS)
     base_path = Column(String(500))
     file_limit = Column(Integer)
 
@@ -626,16 +1271,16 @@ class OrganizationSession(Base):
     files = relationship('File', back_populates='session')
     cost_records = relationship('CostRecord', back_populates='session')
 
-    def to_dict(self) -> Dict[str, Any]:
-        return {
-            'id': self.id,
-            'started_at': self.started_at.isoformat() if self.started_at else None,
-            'completed_at': self.completed_at.isoformat() if self.completed_at else None,
-            'dry_run': self.dry_run,
-            'total_files': self.total_files,
-            'organized_count': self.organized_count,
-            'total_cost': self.total_cost,
-        }
+    # Fields of the generated to_dict
+    _dict_fields = {
+        'id': None,
+        'started_at': None,
+        'completed_at': None,
+        'dry_run': None,
+        'total_files': None,
+        'organized_count': None,
+        'total_cost': None,
+    }
 
 
 class CostRecord(Base):
@@ -657,7 +1302,7 @@ class CostRecord(Base):
     error_message = Column(Text)
 
     # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+    created_at = Column(DateTime, server_default=func.now(), index=True)
 
     # Relationships
     session = relationship('OrganizationSession', back_populates='cost_records')
@@ -665,6 +1310,7 @@ class CostRecord(Base):
 
     __table_args__ = (
         Index('ix_cost_feature_date', 'feature_name', 'created_at'),
+        Index('ix_cost_session_feature', 'session_id', 'feature_name'),
     )
 
 
@@ -682,15 +1328,18 @@ class SchemaMetadata(Base):
     # Schema.org properties
     schema_type = Column(String(50), index=True)  # @type
     schema_context = Column(String(255), default='https://schema.org')
-    schema_json = Column(JSON, nullable=False)  # Full JSON-LD
+    # Full JSON-LD
+    schema_json: Mapped[Any] = mapped_column(JSON, nullable=False, deferred=True,
+                                             deferred_group=HEAVY_COLUMNS)
 
     # Validation
     is_valid = Column(Boolean, default=True)
-    validation_errors = Column(JSON)
+    validation_errors: Mapped[Optional[Any]] = mapped_column(JSON, deferred=True,
+                                                             deferred_group=HEAVY_COLUMNS)
 
     # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, server_default=func.now())
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=datetime.utcnow)
 
     # Relationships
     file = relationship('File', back_populates='schema_metadata')
@@ -708,7 +1357,7 @@ class KeyValueStore(Base):
     id = Column(Integer, primary_key=True, autoincrement=True)
     namespace = Column(String(50), nullable=False, index=True)  # e.g., 'config', 'cache', 'temp'
     key = Column(String(255), nullable=False)
-    value = Column(JSON)
+    value = Column(MsgPackType)
     value_type = Column(String(20))  # 'string', 'int', 'float', 'json', 'binary'
 
     # Optional association with a file
@@ -718,13 +1367,16 @@ class KeyValueStore(Base):
     expires_at = Column(DateTime)
 
     # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, server_default=func.now())
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=datetime.utcnow)
 
     __table_args__ = (
         UniqueConstraint('namespace', 'key', name='uq_namespace_key'),
         Index('ix_kv_namespace_key', 'namespace', 'key'),
         Index('ix_kv_expires', 'expires_at'),
+        # Per-namespace TTL sweeps; permanent rows are left out of the index
+        Index('ix_kv_namespace_expires', 'namespace', 'expires_at',
+              sqlite_where=expires_at.isnot(None)),
     )
 
 
@@ -814,51 +1466,325 @@ class MergeEvent(Base):
             "startTime": self.performed_at.isoformat() if self.performed_at else None
         }
 
-    def to_dict(self) -> Dict[str, Any]:
-        return {
-            'id': self.id,
-            'target_entity_type': self.target_entity_type.value if self.target_entity_type else None,
-            'target_entity_id': self.target_entity_id,
-            'target_canonical_id': self.target_canonical_id,
-            'source_entity_ids': self.source_entity_ids,
-            'source_canonical_ids': self.source_canonical_ids,
-            'merge_reason': self.merge_reason,
-            'confidence': self.confidence,
-            'performed_by': self.performed_by,
-            'performed_at': self.performed_at.isoformat() if self.performed_at else None,
-            'is_rolled_back': self.is_rolled_back,
-        }
+    # Fields of the generated to_dict
+    _dict_fields = {
+        'id': None,
+        'target_entity_type': None,
+        'target_entity_id': None,
+        'target_canonical_id': None,
+        'source_entity_ids': None,
+        'source_canonical_ids': None,
+        'merge_reason': None,
+        'confidence': None,
+        'performed_by': None,
+        'performed_at': None,
+        'is_rolled_back': None,
+    }
+
+
+# Rows per executemany; matches SQLAlchemy's insertmanyvalues page size
+BULK_BATCH_SIZE = 10_000
+
+
+def _bulk_execute(session: Session, stmt, rows: Iterable[Dict[str, Any]],
+                  batch_size: int,
+                  after_chunk: Optional[Callable[[Session, List[Dict[str, Any]]], None]] = None) -> int:
+    """
+    Execute a statement over rows in chunks.
+
+    Nothing is committed: the chunks run in the caller's transaction, so
+    the caller decides when (and whether) the whole write lands.
 
+    Args:
+        session: Database session
+        stmt: Core statement to execute once per chunk
+        rows: Parameter dicts; every row must have the same keys
+        batch_size: Rows per chunk
+        after_chunk: Optional callback run after each chunk
 
-def init_db(db_path: str = 'file_organization.db') -> Session:
+    Returns:
+        Number of rows executed
+    """
+    rows = iter(rows)
+    total = 0
+    while True:
+        chunk = list(islice(rows, batch_size))
+        if not chunk:
+            return total
+        session.execute(stmt, chunk)
+        if after_chunk is not None:
+            after_chunk(session, chunk)
+        total += len(chunk)
+
+
+def bulk_upsert_files(session: Session, rows: Iterable[Dict[str, Any]],
+                      batch_size: int = BULK_BATCH_SIZE) -> int:
+    """
+    Insert files, updating the given columns of files that already exist.
+
+    Rows are plain dicts keyed by column name and must include ``id``.
+    ``db_created_at`` is kept from the original insert on conflict.
+
+    Args:
+        session: Database session
+        rows: File column dicts sharing the same keys
+        batch_size: Rows per executemany
+
+    Returns:
+        Number of rows written
+    """
+    rows = iter(rows)
+    first = next(rows, None)
+    if first is None:
+        return 0
+
+    stmt = sqlite_insert(File)
+    keep = {'id', 'db_created_at'}
+    set_ = {key: stmt.excluded[key] for key in first if key not in keep}
+    set_['db_updated_at'] = stmt.excluded.db_updated_at
+    stmt = stmt.on_conflict_do_update(index_elements=['id'], set_=set_)
+
+    return _bulk_execute(session, stmt, chain([first], rows), batch_size,
+                         after_chunk=_after_file_upsert)
+
+
+def _after_file_upsert(session: Session, chunk: List[Dict[str, Any]]) -> None:
+    # Core upserts skip add_file's group join and the ORM flush hook
+    file_ids = [row['id'] for row in chunk]
+    if 'content_hash' in chunk[0]:
+        regroup_duplicates(session, file_ids)
+    if 'filename' in chunk[0]:
+        connection = session.connection()
+        if search_index_available(connection):
+            index_files_for_search(connection, file_ids)
+
+
+# Content hashes per regroup statement, under SQLite's bound parameter limit
+_REGROUP_CHUNK = 500
+
+
+def regroup_duplicates(session: Session, file_ids: Iterable[str]) -> None:
+    """
+    Bring the duplicate groups of the given files in line with their hashes.
+
+    Covers each file's current content hash and the group it pointed at
+    before, so files whose hash changed leave their old group. Groups
+    left with one member are removed.
+
+    Args:
+        session: Database session
+        file_ids: IDs of files whose content hash may have changed
+    """
+    files, groups = File.__table__, DuplicateGroup.__table__
+    file_ids = list(file_ids)
+    hashes = set()
+    for start in range(0, len(file_ids), _REGROUP_CHUNK):
+        ids = file_ids[start:start + _REGROUP_CHUNK]
+        hashes.update(session.execute(
+            select(files.c.content_hash)
+            .where(files.c.id.in_(ids), files.c.content_hash.isnot(None))
+        ).scalars())
+        hashes.update(session.execute(
+            select(groups.c.content_hash)
+            .join(files, files.c.duplicate_group_id == groups.c.id)
+            .where(files.c.id.in_(ids))
+        ).scalars())
+
+    hashes = sorted(hashes)
+    for start in range(0, len(hashes), _REGROUP_CHUNK):
+        batch = hashes[start:start + _REGROUP_CHUNK]
+        session.execute(
+            sqlite_insert(groups).from_select(
+                ['content_hash', 'canonical_file_id', 'member_count'],
+                select(files.c.content_hash, func.min(files.c.id), func.count())
+                .where(files.c.content_hash.in_(batch))
+                .group_by(files.c.content_hash)
+                .having(func.count() > 1)
+            ).on_conflict_do_nothing(index_elements=['content_hash'])
+        )
+
+        members = select(func.count()).where(files.c.content_hash == groups.c.content_hash)
+        first_member = select(func.min(files.c.id))\
+            .where(files.c.content_hash == groups.c.content_hash)
+        canonical_kept = exists().where(files.c.id == groups.c.canonical_file_id,
+                                        files.c.content_hash == groups.c.content_hash)
+        session.execute(
+            update(groups)
+            .where(groups.c.content_hash.in_(batch))
+            .values(
+                member_count=members.scalar_subquery(),
+                canonical_file_id=case(
+                    (canonical_kept, groups.c.canonical_file_id),
+                    else_=first_member.scalar_subquery()
+                ),
+            )
+        )
+
+        stale = select(groups.c.id).where(groups.c.content_hash.in_(batch))
+        session.execute(
+            update(files)
+            .where(or_(files.c.content_hash.in_(batch),
+                       files.c.duplicate_group_id.in_(stale)))
+            .values(duplicate_group_id=select(groups.c.id).where(
+                groups.c.content_hash == files.c.content_hash,
+                groups.c.member_count > 1
+            ).scalar_subquery())
+        )
+        session.execute(
+            delete(groups)
+            .where(groups.c.content_hash.in_(batch), groups.c.member_count < 2)
+        )
+
+
+def bulk_insert_file_relationships(session: Session, rows: Iterable[Dict[str, Any]],
+                                   batch_size: int = BULK_BATCH_SIZE) -> int:
+    """
+    Insert file relationships, skipping edges that already exist.
+
+    Args:
+        session: Database session
+        rows: FileRelationship column dicts sharing the same keys
+        batch_size: Rows per executemany
+
+    Returns:
+        Number of rows executed
+    """
+    stmt = sqlite_insert(FileRelationship).on_conflict_do_nothing(
+        index_elements=['source_file_id', 'relationship_type', 'target_file_id']
+    )
+    return _bulk_execute(session, stmt, rows, batch_size)
+
+
+def bulk_link_categories(session: Session, rows: Iterable[Dict[str, Any]],
+                         batch_size: int = BULK_BATCH_SIZE) -> int:
+    """
+    Insert file_categories links, skipping pairs that already exist.
+
+    Args:
+        session: Database session
+        rows: Dicts with ``file_id``, ``category_id`` and optional columns
+        batch_size: Rows per executemany
+
+    Returns:
+        Number of rows executed
+    """
+    stmt = insert(file_categories).prefix_with('OR IGNORE')
+    return _bulk_execute(session, stmt, rows, batch_size)
+
+
+def bulk_insert_cost_records(session: Session, rows: Iterable[Dict[str, Any]],
+                             batch_size: int = BULK_BATCH_SIZE) -> int:
+    """
+    Insert cost records.
+
+    Args:
+        session: Database session
+        rows: CostRecord column dicts sharing the same keys
+        batch_size: Rows per executemany
+
+    Returns:
+        Number of rows executed
+    """
+    return _bulk_execute(session, insert(CostRecord), rows, batch_size)
+
+
+def init_db(db_path: str = 'file_organization.db', read_only: bool = False,
+            cache_size_mb: int = 64) -> Session:
     """
     Initialize the database and return a session.
 
     Args:
         db_path: Path to SQLite database file
+        read_only: Reject writes on this session's connections
+        cache_size_mb: Page cache per connection, in megabytes; raise it
+            for large bulk loads
 
     Returns:
         SQLAlchemy Session
     """
     engine = create_engine(f'sqlite:///{db_path}', echo=False)
 
-    # Enable foreign keys for SQLite
+    # Enable foreign keys and bulk-friendly settings for SQLite
     @event.listens_for(engine, "connect")
     def set_sqlite_pragma(dbapi_connection, connection_record):
         cursor = dbapi_connection.cursor()
         cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.execute("PRAGMA page_size=8192")  # Only takes effect on a new database
         cursor.execute("PRAGMA journal_mode=WAL")  # Better concurrency
+        cursor.execute("PRAGMA synchronous=NORMAL")  # WAL keeps this crash-safe
+        cursor.execute(f"PRAGMA cache_size={-cache_size_mb * 1024}")  # Negative = KiB
+        cursor.execute("PRAGMA mmap_size=268435456")  # 256MB memory-mapped reads
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.execute("PRAGMA wal_autocheckpoint=10000")
         cursor.close()
 
     # Create all tables
     Base.metadata.create_all(engine)
 
+    if read_only:
+        # Set after create_all, which needs to write on a new database
+        @event.listens_for(engine, "connect")
+        def set_query_only(dbapi_connection, connection_record):
+            dbapi_connection.execute("PRAGMA query_only=1")
+
+        engine.dispose()
+
     # Create session factory
     SessionLocal = sessionmaker(bind=engine)
 
     return SessionLocal()
 
 
-def get_session(db_path: str = 'file_organization.db') -> Session:
+def get_session(db_path: str = 'file_organization.db', read_only: bool = False,
+                cache_size_mb: int = 64) -> Session:
     """Get a database session."""
-    return init_db(db_path)
+    return init_db(db_path, read_only=read_only, cache_size_mb=cache_size_mb)
+
+
+def _compile_to_dict(cls) -> Callable[[Any], Dict[str, Any]]:
+    """
+    Generate a straight-line serializer from a model's ``_dict_fields``.
+
+    Each field becomes one dict entry with no per-call dispatch: DateTime
+    columns are inlined as an isoformat branch and Enum columns as a
+    lookup in a precomputed member-to-value table.
+
+    Args:
+        cls: Mapped class defining ``_dict_fields``
+
+    Returns:
+        Function taking an instance and returning its dictionary
+    """
+    columns = cls.__table__.columns
+    namespace: Dict[str, Any] = {}
+    body = []
+    entries = []
+    for key, expr in cls._dict_fields.items():
+        if expr is None:
+            column = columns.get(key)
+            column_type = column.type if column is not None else None
+            if isinstance(column_type, DateTime):
+                body.append(f"    {key} = self.{key}")
+                expr = f"{key}.isoformat() if {key} is not None else None"
+            elif isinstance(column_type, SQLEnum) and column_type.enum_class:
+                table = f"_{key}_values"
+                namespace[table] = {None: None, **{m: m.value for m in column_type.enum_class}}
+                expr = f"{table}[self.{key}]"
+            else:
+                expr = f"self.{key}"
+        entries.append(f"        {key!r}: {expr},")
+
+    source = "\n".join(["def to_dict(self):", *body, "    return {", *entries, "    }"])
+    exec(compile(source, f"<{cls.__name__}.to_dict>", "exec"), namespace)
+    to_dict = namespace['to_dict']
+    to_dict.__qualname__ = f"{cls.__name__}.to_dict"
+    to_dict.__doc__ = "Convert to dictionary for JSON serialization."
+    return to_dict
+
+
+for _model in (Category, Company, Person, Location, OrganizationSession, MergeEvent):
+    _model.to_dict = _compile_to_dict(_model)
+# File.to_dict adds relationship names on top of the generated columns
+File.to_dict_slim = _compile_to_dict(File)
+File.to_dict_slim.__qualname__ = "File.to_dict_slim"
+File.to_dict_slim.__doc__ = "Convert to dictionary without touching any relationship."
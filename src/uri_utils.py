@@ -20,12 +20,23 @@ Usage:
     # Returns: urn:uuid:c0e1a2b3-... (always same for "Acme Corporation")
 """
 
+import functools
+import os
+import re
+import sys
 import uuid
 import hashlib
-from typing import Optional
+from typing import Iterable, List, Optional
 from urllib.parse import quote
 from pathlib import Path
 
+try:
+    import numba
+    import numpy as np
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
 
 # Namespace UUIDs for deterministic ID generation (UUID v5)
 # These are fixed UUIDs that serve as namespaces for generating
@@ -40,11 +51,70 @@ NAMESPACES = {
     'merge_event': uuid.UUID('a1b2c3d4-89ab-cdef-0123-456789abcdef'),
 }
 
+# Namespace bytes for the inlined UUID v5 in _uuid5_hex
+_NS_BYTES = {name: ns.bytes for name, ns in NAMESPACES.items()}
+
+# Path hash for urn:sha256 IRIs and File.id in storage, which imports these;
+# stored IDs depend on it, so it must stay SHA-256. SHA-1 is likewise fixed
+# by UUID v5 for canonical IDs. Both are flagged as non-security uses where
+# Python supports it so FIPS-mode OpenSSL builds do not reject them.
+if sys.version_info >= (3, 9):
+    _HASH_FACTORY = functools.partial(hashlib.sha256, usedforsecurity=False)
+    _SHA1_FACTORY = functools.partial(hashlib.sha1, usedforsecurity=False)
+else:
+    _HASH_FACTORY = hashlib.sha256
+    _SHA1_FACTORY = hashlib.sha1
+
 # Base URI for public HTTPS URLs (configure for your domain)
 BASE_URI = "https://schema.example.com"
 
+# Matches any IRI prefix accepted for JSON-LD @id
+_IRI_MATCH = re.compile(r'(?:https?://|urn:(?:uuid|sha256|isbn|issn|doi):)').match
+
+# Matches a bare SHA-256 hex digest
+_HEX64 = re.compile(r'[0-9a-fA-F]{64}').fullmatch
+
+if NUMBA_AVAILABLE:
+    _HEX_TABLE = np.zeros(256, dtype=np.bool_)
+    _HEX_TABLE[np.frombuffer(b'0123456789abcdefABCDEF', dtype=np.uint8)] = True
+
+    @numba.njit(cache=True)
+    def _hex64_mask(buf, table):
+        """Flag each 64-byte slice of ``buf`` that is entirely hex digits."""
+        count = buf.shape[0] // 64
+        mask = np.ones(count, dtype=np.bool_)
+        for i in range(count):
+            base = i * 64
+            for j in range(64):
+                if not table[buf[base + j]]:
+                    mask[i] = False
+                    break
+        return mask
+
+
+@functools.lru_cache(maxsize=4096)
+def _resolve_dir(directory: str) -> str:
+    """Resolve an absolute directory path, memoized per directory."""
+    return str(Path(directory).resolve())
+
 
-def generate_file_iri(file_path: str, use_hash: bool = True) -> str:
+def _resolve_path(file_path: str) -> str:
+    """
+    Resolve a file path like ``Path.resolve`` with cached parent directories.
+
+    Only the file's own component is checked on each call; symlinked files
+    and paths ending in ``.``/``..`` take the full resolve.
+    """
+    path_str = os.fspath(file_path)
+    directory, base = os.path.split(path_str)
+    if base in ('', '.', '..') or os.path.islink(path_str):
+        return str(Path(path_str).resolve())
+    if not os.path.isabs(directory):
+        directory = os.path.join(os.getcwd(), directory)
+    return os.path.join(_resolve_dir(directory), base)
+
+
+def generate_file_iri(file_path: str, use_hash: bool = True, assume_absolute: bool = False) -> str:
     """
     Generate IRI for a file.
 
@@ -55,6 +125,7 @@ def generate_file_iri(file_path: str, use_hash: bool = True) -> str:
     Args:
         file_path: Path to file (relative or absolute)
         use_hash: If True, use content-addressed URN. Otherwise use HTTPS URI.
+        assume_absolute: Caller already canonicalized the path; skip resolving
 
     Returns:
         IRI string (e.g., "urn:sha256:abc123..." or "https://...")
@@ -67,11 +138,10 @@ def generate_file_iri(file_path: str, use_hash: bool = True) -> str:
         'https://schema.example.com/files/%2FUsers%2Fjohn%2Fdoc.pdf'
     """
     # Normalize to absolute path
-    path = Path(file_path).resolve()
-    path_str = str(path)
+    path_str = os.fspath(file_path) if assume_absolute else _resolve_path(file_path)
 
     if use_hash:
-        file_hash = hashlib.sha256(path_str.encode()).hexdigest()
+        file_hash = _HASH_FACTORY(path_str.encode()).hexdigest()
         return f"urn:sha256:{file_hash}"
     else:
         # URL-safe path encoding
@@ -79,6 +149,44 @@ def generate_file_iri(file_path: str, use_hash: bool = True) -> str:
         return f"{BASE_URI}/files/{safe_path}"
 
 
+def generate_file_iris(file_paths: Iterable[str], assume_absolute: bool = False) -> List[str]:
+    """
+    Generate content-addressed IRIs for many files.
+
+    Equivalent to ``generate_file_iri(path)`` per path, with the lookups
+    bound once for the whole batch.
+
+    Args:
+        file_paths: Paths to files (relative or absolute)
+        assume_absolute: Caller already canonicalized the paths; skip resolving
+
+    Returns:
+        ``urn:sha256:`` IRIs, in input order
+    """
+    sha256 = _HASH_FACTORY
+    resolve = os.fspath if assume_absolute else _resolve_path
+    return [f"urn:sha256:{sha256(resolve(p).encode()).hexdigest()}" for p in file_paths]
+
+
+def generate_canonical_iris(entity_type: str, natural_keys: Iterable[str]) -> List[str]:
+    """
+    Generate deterministic canonical IRIs for many keys of one entity type.
+
+    Args:
+        entity_type: Type of entity ('company', 'person', 'category', 'location')
+        natural_keys: Natural keys (e.g., names)
+
+    Returns:
+        ``urn:uuid:`` IRIs, in input order
+
+    Raises:
+        ValueError: If entity_type is not recognized
+    """
+    entity_type_lower = _namespace_key(entity_type)
+    canonical_iri = _canonical_iri
+    return [canonical_iri(entity_type_lower, key.lower().strip()) for key in natural_keys]
+
+
 def generate_canonical_iri(entity_type: str, natural_key: str) -> str:
     """
     Generate deterministic canonical IRI using UUID v5.
@@ -114,23 +222,45 @@ def generate_canonical_iri(entity_type: str, natural_key: str) -> str:
         >>> id1 == id2
         True
     """
+    # Normalize the natural key (lowercase, trimmed)
+    return _canonical_iri(_namespace_key(entity_type), natural_key.lower().strip())
+
+
+def _namespace_key(entity_type: str) -> str:
+    """Lowercase an entity type, rejecting types without a namespace."""
     entity_type_lower = entity_type.lower()
-    namespace = NAMESPACES.get(entity_type_lower)
 
-    if not namespace:
+    if entity_type_lower not in _NS_BYTES:
         valid_types = ', '.join(NAMESPACES.keys())
         raise ValueError(
             f"Unknown entity type: '{entity_type}'. "
             f"Valid types: {valid_types}"
         )
+    return entity_type_lower
+
+
+@functools.lru_cache(maxsize=65536)
+def _canonical_iri(entity_type: str, normalized_key: str) -> str:
+    """Memoized UUID v5 IRI for a known entity type and normalized key."""
+    return f"urn:uuid:{_uuid5_hex(_NS_BYTES[entity_type], normalized_key)}"
 
-    # Normalize the natural key (lowercase, trimmed)
-    normalized_key = natural_key.lower().strip()
 
-    # Generate deterministic UUID v5
-    canonical_uuid = uuid.uuid5(namespace, normalized_key)
+def _uuid5_hex(ns_bytes: bytes, name: str) -> str:
+    """
+    Format ``str(uuid.uuid5(namespace, name))`` without building UUID objects.
+
+    Args:
+        ns_bytes: Namespace UUID as 16 bytes
+        name: Name to hash
 
-    return f"urn:uuid:{canonical_uuid}"
+    Returns:
+        Hyphenated UUID string
+    """
+    digest = bytearray(_SHA1_FACTORY(ns_bytes + name.encode()).digest()[:16])
+    digest[6] = (digest[6] & 0x0F) | 0x50  # version 5
+    digest[8] = (digest[8] & 0x3F) | 0x80  # RFC 4122 variant
+    h = digest.hex()
+    return f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
 
 
 def generate_random_iri(entity_type: Optional[str] = None) -> str:
@@ -224,17 +354,22 @@ def is_valid_iri(iri: str) -> bool:
     if not iri or not isinstance(iri, str):
         return False
 
-    valid_prefixes = (
-        'http://',
-        'https://',
-        'urn:uuid:',
-        'urn:sha256:',
-        'urn:isbn:',
-        'urn:issn:',
-        'urn:doi:',
-    )
+    # http(s):// and urn:uuid|sha256|isbn|issn|doi: prefixes
+    return _IRI_MATCH(iri) is not None
+
+
+def is_valid_iri_batch(iris: Iterable[str]) -> List[bool]:
+    """
+    Check many strings with ``is_valid_iri``.
+
+    Args:
+        iris: Strings to validate
 
-    return iri.startswith(valid_prefixes)
+    Returns:
+        One flag per input, in order
+    """
+    match = _IRI_MATCH
+    return [bool(iri) and isinstance(iri, str) and match(iri) is not None for iri in iris]
 
 
 def normalize_to_iri(value: str) -> str:
@@ -262,7 +397,45 @@ def normalize_to_iri(value: str) -> str:
     """
     if is_valid_iri(value):
         return value
+    return _normalize_non_iri(value, len(value) == 64 and _HEX64(value) is not None)
+
+
+def normalize_to_iri_batch(values: Iterable[str]) -> List[str]:
+    """
+    Normalize many values to IRIs, as ``normalize_to_iri`` does for one.
+
+    The SHA-256 hex check runs over all 64-character candidates at once,
+    in a compiled loop when numba is installed.
+
+    Args:
+        values: Strings that might be IRIs, UUIDs or SHA-256 hashes
+
+    Returns:
+        Valid IRI strings, in input order
+    """
+    values = list(values)
+    is_iri = is_valid_iri_batch(values)
+    candidates = [
+        i for i, value in enumerate(values)
+        if not is_iri[i] and len(value) == 64 and value.isascii()
+    ]
+
+    if NUMBA_AVAILABLE and candidates:
+        buf = np.frombuffer(''.join(values[i] for i in candidates).encode('ascii'),
+                            dtype=np.uint8)
+        hex_flags = _hex64_mask(buf, _HEX_TABLE).tolist()
+    else:
+        hex_flags = [_HEX64(values[i]) is not None for i in candidates]
+    is_hex = dict(zip(candidates, hex_flags))
+
+    return [
+        value if is_iri[i] else _normalize_non_iri(value, is_hex.get(i, False))
+        for i, value in enumerate(values)
+    ]
+
 
+def _normalize_non_iri(value: str, is_hex64: bool) -> str:
+    """Wrap a value that is not already an IRI in a URN."""
     # Check if it looks like a UUID
     try:
         uuid.UUID(value)
@@ -271,12 +444,11 @@ def normalize_to_iri(value: str) -> str:
         pass
 
     # Treat as SHA-256 hash if 64 hex characters
-    if len(value) == 64 and all(c in '0123456789abcdef' for c in value.lower()):
+    if is_hex64:
         return f"urn:sha256:{value}"
 
     # Fallback: wrap in urn:uuid: with generated UUID from value
-    deterministic_uuid = uuid.uuid5(NAMESPACES['file'], value)
-    return f"urn:uuid:{deterministic_uuid}"
+    return f"urn:uuid:{_uuid5_hex(_NS_BYTES['file'], value)}"
 
 
 def extract_uuid_from_iri(iri: str) -> Optional[str]:
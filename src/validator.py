@@ -6,11 +6,125 @@ checks required properties, verifies data types, and generates
 comprehensive validation reports.
 """
 
-from typing import Any, Dict, List, Optional, Set, Tuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
 from enum import Enum
-from datetime import datetime
+from datetime import datetime, timedelta
+import functools
 import re
 import json
+import sys
+import time
+
+try:
+    import re2
+    RE2_AVAILABLE = True
+except ImportError:
+    RE2_AVAILABLE = False
+
+# orjson serializes reports in C; stdlib json is the fallback
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# URL, date, datetime and duration formats as one alternation, matched
+# with fullmatch; the named group that matched tells which format it is.
+# With google-re2 installed the match runs on a linear-time DFA, so
+# crafted input cannot trigger catastrophic backtracking.
+FORMAT_PATTERN = (
+    r'(?P<url>(?i:https?://'
+    r'(?:(?:[A-Z0-9](?:[A-Z0-9-]{0,61}[A-Z0-9])?\.)+[A-Z]{2,6}\.?|'  # domain
+    r'localhost|'  # localhost
+    r'\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})'  # IP
+    r'(?::\d+)?'  # optional port
+    r'(?:/?|[/?]\S+)))'
+    r'|(?P<date>\d{4}-\d{2}-\d{2})'
+    r'|(?P<datetime>\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(?s:.*))'
+    r'|(?P<duration>P(?:\d+Y)?(?:\d+M)?(?:\d+D)?(?:T(?:\d+H)?(?:\d+M)?(?:\d+(?:\.\d+)?S)?)?)'
+)
+
+
+_FORMAT_MATCH = (re2 if RE2_AVAILABLE else re).compile(FORMAT_PATTERN).fullmatch
+_FORMAT_NAMES = ("url", "date", "datetime", "duration")
+
+# Formats a date property may use
+DATE_FORMATS = frozenset({"date", "datetime"})
+
+# JSON-LD keywords, interned: unlike identifier-like literals these are not
+# interned by the compiler, so lookups against interned keys would otherwise
+# fall back to comparing characters
+_K_CONTEXT = sys.intern("@context")
+_K_TYPE = sys.intern("@type")
+
+
+@functools.lru_cache(maxsize=4096)
+def _format_of(value: str) -> Optional[str]:
+    """
+    Name the FORMAT_PATTERN alternative a string matches.
+
+    Memoized because the same URLs and dates (a shared logo, a publish
+    date) recur across the schemas of a batch.
+
+    Args:
+        value: String to classify, ideally interned
+
+    Returns:
+        'url', 'date', 'datetime', 'duration', or None
+    """
+    match = _FORMAT_MATCH(value)
+    if match is not None:
+        for name in _FORMAT_NAMES:
+            if match.group(name) is not None:
+                return name
+    return None
+
+
+def _nested_key(data: Dict[str, Any]) -> Optional[tuple]:
+    """
+    Hashable key covering everything ``_has_errors_fast`` reads from a schema.
+
+    The error passes look at a schema's own keys, the values of strings,
+    and only the type and truthiness of anything else, so two schemas with
+    equal keys have the same answer.
+
+    Args:
+        data: Schema.org data dictionary
+
+    Returns:
+        Key tuple, or None when @type is not a string and no key is safe
+    """
+    if type(data.get(_K_TYPE)) is not str:
+        return None
+    return tuple(
+        (key, value) if type(value) is str else (key, type(value), not value)
+        for key, value in data.items()
+    )
+
+
+class _FirstError(Exception):
+    """Raised by _FirstErrorSink to stop validation at the first error."""
+
+
+class _FirstErrorSink:
+    """Stand-in for ValidationReport that only cares whether an error occurs."""
+
+    def add_error(self, *args: Any, **kwargs: Any) -> None:
+        raise _FirstError
+
+    def add_warning(self, *args: Any, **kwargs: Any) -> None:
+        pass
+
+    add_info = add_success = add_warning
+
+    def add_message(self, level: "ValidationLevel", *args: Any, **kwargs: Any) -> None:
+        if level is ValidationLevel.ERROR:
+            raise _FirstError
+
+
+def _skip_nested(data: Dict[str, Any], report: Any) -> None:
+    """Nested-schema pass used when only a schema's own errors matter."""
 
 
 class ValidationLevel(Enum):
@@ -24,6 +138,8 @@ class ValidationLevel(Enum):
 class ValidationMessage:
     """Represents a validation message."""
 
+    __slots__ = ("level", "message", "property_name", "suggestion", "timestamp", "_iso")
+
     def __init__(self, level: ValidationLevel, message: str,
                  property_name: Optional[str] = None,
                  suggestion: Optional[str] = None):
@@ -40,14 +156,22 @@ class ValidationMessage:
         self.message = message
         self.property_name = property_name
         self.suggestion = suggestion
-        self.timestamp = datetime.now()
+        # Filled on first serialization; most messages are never serialized
+        self.timestamp: Optional[datetime] = None
+        # timestamp.isoformat(), kept so re-serializing skips the formatting
+        self._iso: Optional[str] = None
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary."""
+        iso = self._iso
+        if iso is None:
+            if self.timestamp is None:
+                self.timestamp = datetime.now()
+            iso = self._iso = self.timestamp.isoformat()
         result = {
             "level": self.level.value,
             "message": self.message,
-            "timestamp": self.timestamp.isoformat()
+            "timestamp": iso
         }
         if self.property_name:
             result["property"] = self.property_name
@@ -70,17 +194,27 @@ class ValidationReport:
     detailed reporting capabilities.
     """
 
-    def __init__(self, schema_type: str):
+    __slots__ = ("schema_type", "messages", "_counts", "start_time", "_t0", "_t1", "_fail_fast")
+
+    def __init__(self, schema_type: str, fail_fast: bool = False):
         """
         Initialize validation report.
 
         Args:
             schema_type: Schema.org type being validated
+            fail_fast: Raise _FirstError once the first error is recorded,
+                so the validator can stop early
         """
         self.schema_type = schema_type
+        self._fail_fast = fail_fast
         self.messages: List[ValidationMessage] = []
+        # Messages per level, kept in step by add_message
+        self._counts: Dict[ValidationLevel, int] = dict.fromkeys(ValidationLevel, 0)
+        # Wall-clock start for the report's timestamp; durations come from
+        # the monotonic nanosecond counter
         self.start_time = datetime.now()
-        self.end_time: Optional[datetime] = None
+        self._t0 = time.perf_counter_ns()
+        self._t1: Optional[int] = None
 
     def add_message(self, level: ValidationLevel, message: str,
                    property_name: Optional[str] = None,
@@ -94,9 +228,12 @@ class ValidationReport:
             property_name: Property name
             suggestion: Suggested fix
         """
+        self._counts[level] += 1
         self.messages.append(
             ValidationMessage(level, message, property_name, suggestion)
         )
+        if self._fail_fast and level is ValidationLevel.ERROR:
+            raise _FirstError
 
     def add_error(self, message: str, property_name: Optional[str] = None,
                  suggestion: Optional[str] = None) -> None:
@@ -119,15 +256,29 @@ class ValidationReport:
 
     def finalize(self) -> None:
         """Finalize the report."""
-        self.end_time = datetime.now()
+        self._t1 = time.perf_counter_ns()
+
+    @property
+    def end_time(self) -> Optional[datetime]:
+        """Wall-clock end of validation, or None until ``finalize``."""
+        if self._t1 is None:
+            return None
+        return self.start_time + timedelta(microseconds=(self._t1 - self._t0) / 1e3)
+
+    @end_time.setter
+    def end_time(self, value: Optional[datetime]) -> None:
+        if value is None:
+            self._t1 = None
+        else:
+            self._t1 = self._t0 + int((value - self.start_time).total_seconds() * 1e9)
 
     def has_errors(self) -> bool:
         """Check if report has errors."""
-        return any(msg.level == ValidationLevel.ERROR for msg in self.messages)
+        return self._counts[ValidationLevel.ERROR] > 0
 
     def has_warnings(self) -> bool:
         """Check if report has warnings."""
-        return any(msg.level == ValidationLevel.WARNING for msg in self.messages)
+        return self._counts[ValidationLevel.WARNING] > 0
 
     def is_valid(self) -> bool:
         """Check if validation passed (no errors)."""
@@ -135,23 +286,24 @@ class ValidationReport:
 
     def get_messages_by_level(self, level: ValidationLevel) -> List[ValidationMessage]:
         """Get messages by level."""
+        if not self._counts[level]:
+            return []
         return [msg for msg in self.messages if msg.level == level]
 
     def get_statistics(self) -> Dict[str, int]:
         """Get validation statistics."""
+        counts = self._counts
         return {
             "total": len(self.messages),
-            "errors": len(self.get_messages_by_level(ValidationLevel.ERROR)),
-            "warnings": len(self.get_messages_by_level(ValidationLevel.WARNING)),
-            "info": len(self.get_messages_by_level(ValidationLevel.INFO)),
-            "success": len(self.get_messages_by_level(ValidationLevel.SUCCESS))
+            "errors": counts[ValidationLevel.ERROR],
+            "warnings": counts[ValidationLevel.WARNING],
+            "info": counts[ValidationLevel.INFO],
+            "success": counts[ValidationLevel.SUCCESS]
         }
 
     def get_duration(self) -> float:
         """Get validation duration in seconds."""
-        if self.end_time:
-            return (self.end_time - self.start_time).total_seconds()
-        return (datetime.now() - self.start_time).total_seconds()
+        return ((self._t1 or time.perf_counter_ns()) - self._t0) / 1e9
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary."""
@@ -166,29 +318,43 @@ class ValidationReport:
 
     def to_json(self, indent: int = 2) -> str:
         """Convert to JSON string."""
-        return json.dumps(self.to_dict(), indent=indent)
+        data = self.to_dict()
+        if ORJSON_AVAILABLE and indent == 2:
+            # Byte-identical to json.dumps only when nothing needs ASCII
+            # escaping and the duration is written without an exponent
+            text = orjson.dumps(data, option=orjson.OPT_INDENT_2).decode()
+            if text.isascii() and 'e' not in repr(data["duration"]):
+                return text
+        return json.dumps(data, indent=indent)
 
     def print_summary(self) -> None:
         """Print validation summary."""
         stats = self.get_statistics()
-        print(f"\n{'='*60}")
-        print(f"Schema.org Validation Report: {self.schema_type}")
-        print(f"{'='*60}")
-        print(f"Status: {'VALID' if self.is_valid() else 'INVALID'}")
-        print(f"Duration: {self.get_duration():.3f}s")
-        print(f"\nStatistics:")
-        print(f"  Total messages: {stats['total']}")
-        print(f"  Errors: {stats['errors']}")
-        print(f"  Warnings: {stats['warnings']}")
-        print(f"  Info: {stats['info']}")
-        print(f"  Success: {stats['success']}")
+        rule = "=" * 60
+        lines = [
+            "",
+            rule,
+            f"Schema.org Validation Report: {self.schema_type}",
+            rule,
+            f"Status: {'VALID' if self.is_valid() else 'INVALID'}",
+            f"Duration: {self.get_duration():.3f}s",
+            "",
+            "Statistics:",
+            f"  Total messages: {stats['total']}",
+            f"  Errors: {stats['errors']}",
+            f"  Warnings: {stats['warnings']}",
+            f"  Info: {stats['info']}",
+            f"  Success: {stats['success']}",
+        ]
 
         if self.messages:
-            print(f"\nMessages:")
-            for msg in self.messages:
-                print(f"  {msg}")
+            lines.append("\nMessages:")
+            lines.extend(f"  {msg}" for msg in self.messages)
 
-        print(f"{'='*60}\n")
+        lines.append(rule)
+        lines.append("\n")
+        # One write instead of a print (and stdout lock) per line
+        sys.stdout.write("\n".join(lines))
 
     def __str__(self) -> str:
         """String representation."""
@@ -207,17 +373,25 @@ class SchemaValidator:
     - Google Rich Results compatibility
     """
 
-    # Known Schema.org types and their requirements
+    # Known Schema.org types and their requirements, as frozensets so
+    # missing properties are one set difference against the data's keys,
+    # with the declared order kept alongside for messages
     SCHEMA_TYPES = {
-        "Thing": {"required": [], "recommended": ["name", "description"]},
-        "CreativeWork": {"required": ["name"], "recommended": ["author", "datePublished"]},
-        "DigitalDocument": {"required": ["name"], "recommended": ["author", "encodingFormat"]},
-        "Article": {"required": ["headline"], "recommended": ["author", "datePublished", "image"]},
-        "ImageObject": {"required": ["contentUrl"], "recommended": ["name", "description"]},
-        "VideoObject": {"required": ["name", "uploadDate"], "recommended": ["description", "thumbnailUrl"]},
-        "AudioObject": {"required": ["name"], "recommended": ["contentUrl", "duration"]},
-        "SoftwareSourceCode": {"required": ["name"], "recommended": ["programmingLanguage", "codeRepository"]},
-        "Dataset": {"required": ["name", "description"], "recommended": ["creator", "distribution"]},
+        schema_type: {
+            **{key: frozenset(props) for key, props in rules.items()},
+            **{f"{key}_order": tuple(props) for key, props in rules.items()},
+        }
+        for schema_type, rules in {
+            "Thing": {"required": [], "recommended": ["name", "description"]},
+            "CreativeWork": {"required": ["name"], "recommended": ["author", "datePublished"]},
+            "DigitalDocument": {"required": ["name"], "recommended": ["author", "encodingFormat"]},
+            "Article": {"required": ["headline"], "recommended": ["author", "datePublished", "image"]},
+            "ImageObject": {"required": ["contentUrl"], "recommended": ["name", "description"]},
+            "VideoObject": {"required": ["name", "uploadDate"], "recommended": ["description", "thumbnailUrl"]},
+            "AudioObject": {"required": ["name"], "recommended": ["contentUrl", "duration"]},
+            "SoftwareSourceCode": {"required": ["name"], "recommended": ["programmingLanguage", "codeRepository"]},
+            "Dataset": {"required": ["name", "description"], "recommended": ["creator", "distribution"]},
+        }.items()
     }
 
     # Expected property types
@@ -238,76 +412,276 @@ class SchemaValidator:
         "keywords": str,
     }
 
+    # Google Rich Results checks by @type, as (property, level, message)
+    _ARTICLE_RICH_RULES = (
+        ("headline", ValidationLevel.ERROR, "Articles require 'headline' for Rich Results"),
+        ("image", ValidationLevel.WARNING, "Articles should include 'image' for Rich Results"),
+        ("author", ValidationLevel.WARNING, "Articles should include 'author' for Rich Results"),
+        ("datePublished", ValidationLevel.WARNING,
+         "Articles should include 'datePublished' for Rich Results"),
+    )
+    RICH_RULES: Dict[str, Tuple[Tuple[str, ValidationLevel, str], ...]] = {
+        "Article": _ARTICLE_RICH_RULES,
+        "NewsArticle": _ARTICLE_RICH_RULES,
+        "BlogPosting": _ARTICLE_RICH_RULES,
+        "VideoObject": tuple(
+            (prop, ValidationLevel.ERROR, f"Videos require '{prop}' for Rich Results")
+            for prop in ("name", "description", "thumbnailUrl", "uploadDate")
+        ),
+        "ImageObject": (
+            ("contentUrl", ValidationLevel.ERROR, "Images require 'contentUrl' for Rich Results"),
+        ),
+    }
+
+    # Properties checked for URL and ISO 8601 date formats
+    URL_PROPERTIES = ("url", "contentUrl", "thumbnailUrl", "codeRepository", "sameAs")
+    DATE_PROPERTIES = ("dateCreated", "dateModified", "datePublished", "uploadDate")
+
+    # Distinct @type values that get a compiled validator; others use the
+    # generic passes so arbitrary input cannot grow the cache without bound
+    COMPILED_TYPE_LIMIT = 256
+
+    # Nested schemas whose error check is remembered; the same author or
+    # publisher object tends to recur across a batch
+    NESTED_CACHE_SIZE = 4096
+
     def __init__(self):
         """Initialize validator."""
-        self.url_pattern = re.compile(
-            r'^https?://'  # http:// or https://
-            r'(?:(?:[A-Z0-9](?:[A-Z0-9-]{0,61}[A-Z0-9])?\.)+[A-Z]{2,6}\.?|'  # domain
-            r'localhost|'  # localhost
-            r'\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})'  # IP
-            r'(?::\d+)?'  # optional port
-            r'(?:/?|[/?]\S+)$', re.IGNORECASE
+        intern = sys.intern
+
+        # Per-property rules keyed by interned name, so the type and format
+        # passes walk the data's keys once instead of probing every rule
+        self._type_of: Dict[str, Tuple[Tuple[type, ...], str]] = {
+            intern(prop): ((expected_type, dict, list), expected_type.__name__)
+            for prop, expected_type in self.PROPERTY_TYPES.items()
+        }
+        self._format_rules: Dict[str, Tuple[frozenset, ValidationLevel, str, str]] = {}
+        for prop in self.URL_PROPERTIES:
+            self._format_rules[intern(prop)] = (
+                frozenset({"url"}), ValidationLevel.ERROR, f"Invalid URL format: {prop}",
+                "Use absolute URLs starting with http:// or https://"
+            )
+        for prop in self.DATE_PROPERTIES:
+            self._format_rules[intern(prop)] = (
+                DATE_FORMATS, ValidationLevel.WARNING, f"Date format may be invalid: {prop}",
+                "Use ISO 8601 format (YYYY-MM-DD or YYYY-MM-DDTHH:MM:SS)"
+            )
+        self._format_rules[intern("duration")] = (
+            frozenset({"duration"}), ValidationLevel.WARNING, "Duration format may be invalid",
+            "Use ISO 8601 duration format (e.g., PT1H30M for 1 hour 30 minutes)"
         )
 
-        self.date_pattern = re.compile(r'^\d{4}-\d{2}-\d{2}$')
-        self.datetime_pattern = re.compile(r'^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}')
-        self.duration_pattern = re.compile(r'^P(?:\d+Y)?(?:\d+M)?(?:\d+D)?(?:T(?:\d+H)?(?:\d+M)?(?:\d+(?:\.\d+)?S)?)?$')
+        # Per-@type validators generated by _compile_for_type
+        self._compiled: Dict[str, Callable] = {}
+
+        # _has_errors_fast results by _nested_key, oldest first
+        self._nested_cache: Dict[tuple, bool] = {}
 
-    def validate(self, schema_data: Dict[str, Any]) -> ValidationReport:
+    def validate(self, schema_data: Dict[str, Any], fail_fast: bool = False) -> ValidationReport:
         """
         Validate Schema.org structured data.
 
         Args:
             schema_data: Schema.org data dictionary
+            fail_fast: Stop at the first error. The report's validity is
+                the same, but it holds only the messages up to that error.
 
         Returns:
             Validation report
         """
-        schema_type = schema_data.get("@type", "Unknown")
-        report = ValidationReport(schema_type)
+        # Intern the top-level keys once so every membership test and
+        # lookup in the passes below hits on pointer equality
+        intern = sys.intern
+        schema_data = {
+            intern(key) if type(key) is str else key: value
+            for key, value in schema_data.items()
+        }
 
-        # Validate basic structure
-        self._validate_structure(schema_data, report)
+        schema_type = schema_data.get(_K_TYPE)
+        report = ValidationReport(schema_type if _K_TYPE in schema_data else "Unknown", fail_fast)
 
-        # Validate required properties
-        self._validate_required_properties(schema_data, report)
+        try:
+            self._run_passes(schema_data, report, schema_type)
+        except _FirstError:
+            pass
 
-        # Validate property types
-        self._validate_property_types(schema_data, report)
+        report.finalize()
+        return report
 
-        # Validate formats
-        self._validate_formats(schema_data, report)
+    def _run_passes(self, schema_data: Dict[str, Any], report: ValidationReport,
+                    schema_type: Any) -> None:
+        """Run every validation pass, compiled for the type when possible."""
+        compiled = self._compiled_for(schema_data)
+        if compiled is not None:
+            compiled(schema_data, report, self._validate_nested_schemas)
+        else:
+            # Look the type's rules up once for all passes
+            rules = self.SCHEMA_TYPES.get(schema_type)
 
-        # Validate nested schemas
-        self._validate_nested_schemas(schema_data, report)
+            # Validate basic structure
+            self._validate_structure(schema_data, report, rules)
 
-        # Check recommended properties
-        self._check_recommended_properties(schema_data, report)
+            # Validate required properties
+            self._validate_required_properties(schema_data, report, rules)
 
-        # Google Rich Results checks
-        self._validate_rich_results_compatibility(schema_data, report)
+            # Validate property types
+            self._validate_property_types(schema_data, report)
 
-        report.finalize()
-        return report
+            # Validate formats
+            self._validate_formats(schema_data, report)
+
+            # Validate nested schemas
+            self._validate_nested_schemas(schema_data, report)
+
+            # Check recommended properties
+            self._check_recommended_properties(schema_data, report, rules)
+
+            # Google Rich Results checks
+            self._validate_rich_results_compatibility(schema_data, report, schema_type)
+
+    def _compiled_for(self, data: Dict[str, Any]) -> Optional[Callable]:
+        """Get the compiled validator for the data's @type, if it can have one."""
+        schema_type = data.get(_K_TYPE)
+        if not isinstance(schema_type, str):
+            return None
+        return self._compiled.get(schema_type) or self._compile_for_type(schema_type)
+
+    def _has_errors_fast(self, data: Dict[str, Any]) -> bool:
+        """
+        Check whether ``validate`` would report an error, without building a report.
+
+        Runs only the passes that can produce errors and stops at the
+        first one. Nested schemas are skipped: they only ever add warnings.
+
+        Args:
+            data: Schema.org data dictionary
 
-    def _validate_structure(self, data: Dict[str, Any], report: ValidationReport) -> None:
+        Returns:
+            True if the data has at least one validation error
+        """
+        sink = _FirstErrorSink()
+        try:
+            compiled = self._compiled_for(data)
+            if compiled is not None:
+                compiled(data, sink, _skip_nested)
+            else:
+                schema_type = data.get(_K_TYPE)
+                rules = self.SCHEMA_TYPES.get(schema_type)
+                self._validate_structure(data, sink, rules)
+                self._validate_required_properties(data, sink, rules)
+                self._validate_property_types(data, sink)
+                self._validate_formats(data, sink)
+                self._validate_rich_results_compatibility(data, sink, schema_type)
+        except _FirstError:
+            return True
+        return False
+
+    def _nested_has_errors(self, data: Dict[str, Any]) -> bool:
+        """``_has_errors_fast`` for a nested schema, memoized across the batch."""
+        key = _nested_key(data)
+        if key is None:
+            return self._has_errors_fast(data)
+        cache = self._nested_cache
+        result = cache.get(key)
+        if result is None:
+            result = cache[key] = self._has_errors_fast(data)
+            if len(cache) > self.NESTED_CACHE_SIZE:
+                # Evict the oldest entry; pop tolerates a racing thread
+                cache.pop(next(iter(cache)), None)
+        return result
+
+    def _compile_for_type(self, schema_type: str) -> Optional[Callable]:
+        """
+        Generate a validator specialized for one @type.
+
+        The generated function runs the same checks, with the same messages
+        and order, as the generic passes in ``validate``, but with the
+        type's rules inlined as straight-line code.
+
+        Args:
+            schema_type: Schema.org type name
+
+        Returns:
+            Function taking (data, report, nested), or None once the cache is full
+        """
+        if len(self._compiled) >= self.COMPILED_TYPE_LIMIT:
+            return None
+
+        rules = self.SCHEMA_TYPES.get(schema_type)
+        lines = ["def validate(d, r, nested):"]
+
+        def emit(line: str, *constants: Any) -> None:
+            lines.append("    " + line.format(*map(repr, constants)))
+
+        # Structure
+        emit('if _K_CONTEXT not in d:')
+        emit('    r.add_error({}, {}, {})', "Missing @context property", "@context",
+             "Add '@context': 'https://schema.org'")
+        if rules is not None:
+            emit('r.add_success({})', f"Valid Schema.org type: {schema_type}")
+        else:
+            emit('r.add_warning({}, {}, {})', f"Unknown Schema.org type: {schema_type}", "@type",
+                 "Verify the type exists in Schema.org vocabulary")
+
+        # Required properties, in declared order
+        for prop in (rules["required_order"] if rules else ()):
+            emit('if {} not in d:', prop)
+            emit('    r.add_error({}, {}, {})', f"Missing required property: {prop}", prop,
+                 f"Add the '{prop}' property with an appropriate value")
+            emit('elif not d[{}]:', prop)
+            emit('    r.add_error({}, {}, {})', f"Required property is empty: {prop}", prop,
+                 f"Provide a value for '{prop}'")
+
+        # Property types and formats, one walk over the data's keys each
+        emit('types(d, r)')
+        emit('formats(d, r)')
+
+        emit('nested(d, r)')
+
+        # Recommended properties
+        if rules and rules["recommended"]:
+            emit('missing = _recommended - d.keys()')
+            emit('if missing:')
+            emit('    r.add_info({} + ", ".join([p for p in {} if p in missing]), suggestion={})',
+                 "Missing recommended properties: ", rules["recommended_order"],
+                 "Adding these properties improves search visibility")
+
+        # Google Rich Results
+        for prop, level, message in self.RICH_RULES.get(schema_type, ()):
+            method = "add_error" if level is ValidationLevel.ERROR else "add_warning"
+            emit('if {} not in d:', prop)
+            emit('    r.' + method + '({}, {})', message, prop)
+
+        emit('return None')
+        namespace = {
+            "types": self._validate_property_types,
+            "formats": self._validate_formats,
+            "_recommended": rules["recommended"] if rules else frozenset(),
+            "_K_CONTEXT": _K_CONTEXT,
+        }
+        exec(compile("\n".join(lines), f"<validate {schema_type}>", "exec"), namespace)
+        compiled = self._compiled[schema_type] = namespace["validate"]
+        return compiled
+
+    def _validate_structure(self, data: Dict[str, Any], report: ValidationReport,
+                            rules: Optional[Dict[str, Any]]) -> None:
         """Validate basic structure."""
-        if "@context" not in data:
+        if _K_CONTEXT not in data:
             report.add_error(
                 "Missing @context property",
                 "@context",
                 "Add '@context': 'https://schema.org'"
             )
 
-        if "@type" not in data:
+        if _K_TYPE not in data:
             report.add_error(
                 "Missing @type property",
                 "@type",
                 "Specify the Schema.org type (e.g., 'DigitalDocument')"
             )
         else:
-            schema_type = data["@type"]
-            if schema_type not in self.SCHEMA_TYPES:
+            schema_type = data[_K_TYPE]
+            if rules is None:
                 report.add_warning(
                     f"Unknown Schema.org type: {schema_type}",
                     "@type",
@@ -316,12 +690,11 @@ class SchemaValidator:
             else:
                 report.add_success(f"Valid Schema.org type: {schema_type}")
 
-    def _validate_required_properties(self, data: Dict[str, Any], report: ValidationReport) -> None:
+    def _validate_required_properties(self, data: Dict[str, Any], report: ValidationReport,
+                                      rules: Optional[Dict[str, Any]]) -> None:
         """Validate required properties."""
-        schema_type = data.get("@type")
-        if schema_type in self.SCHEMA_TYPES:
-            required = self.SCHEMA_TYPES[schema_type]["required"]
-            for prop in required:
+        if rules is not None:
+            for prop in rules["required_order"]:
                 if prop not in data:
                     report.add_error(
                         f"Missing required property: {prop}",
@@ -337,57 +710,39 @@ class SchemaValidator:
 
     def _validate_property_types(self, data: Dict[str, Any], report: ValidationReport) -> None:
         """Validate property types."""
-        for prop, expected_type in self.PROPERTY_TYPES.items():
-            if prop in data:
-                value = data[prop]
-                if not isinstance(value, (expected_type, dict, list)):
-                    report.add_error(
-                        f"Invalid type for {prop}: expected {expected_type.__name__}, got {type(value).__name__}",
-                        prop,
-                        f"Convert {prop} to {expected_type.__name__}"
-                    )
+        type_of = self._type_of
+        for prop, value in data.items():
+            expected = type_of.get(prop)
+            if expected is not None and not isinstance(value, expected[0]):
+                name = expected[1]
+                report.add_error(
+                    f"Invalid type for {prop}: expected {name}, got {type(value).__name__}",
+                    prop,
+                    f"Convert {prop} to {name}"
+                )
 
     def _validate_formats(self, data: Dict[str, Any], report: ValidationReport) -> None:
-        """Validate format of specific properties."""
-        # Validate URLs
-        url_properties = ["url", "contentUrl", "thumbnailUrl", "codeRepository", "sameAs"]
-        for prop in url_properties:
-            if prop in data and isinstance(data[prop], str):
-                if not self.url_pattern.match(data[prop]):
-                    report.add_error(
-                        f"Invalid URL format: {prop}",
-                        prop,
-                        "Use absolute URLs starting with http:// or https://"
-                    )
-
-        # Validate dates
-        date_properties = ["dateCreated", "dateModified", "datePublished", "uploadDate"]
-        for prop in date_properties:
-            if prop in data and isinstance(data[prop], str):
-                value = data[prop]
-                if not (self.date_pattern.match(value) or self.datetime_pattern.match(value)):
-                    report.add_warning(
-                        f"Date format may be invalid: {prop}",
-                        prop,
-                        "Use ISO 8601 format (YYYY-MM-DD or YYYY-MM-DDTHH:MM:SS)"
-                    )
-
-        # Validate duration
-        if "duration" in data and isinstance(data["duration"], str):
-            if not self.duration_pattern.match(data["duration"]):
-                report.add_warning(
-                    "Duration format may be invalid",
-                    "duration",
-                    "Use ISO 8601 duration format (e.g., PT1H30M for 1 hour 30 minutes)"
-                )
+        """Validate format of URL, date and duration properties."""
+        format_rules = self._format_rules
+        for prop, value in data.items():
+            rule = format_rules.get(prop)
+            if rule is not None and isinstance(value, str):
+                formats, level, message, suggestion = rule
+                if _format_of(sys.intern(value)) not in formats:
+                    report.add_message(level, message, prop, suggestion)
 
     def _validate_nested_schemas(self, data: Dict[str, Any], report: ValidationReport) -> None:
-        """Validate nested schemas."""
+        """
+        Validate nested schemas.
+
+        A nested schema's own nested schemas only add warnings to it, so
+        whether it has errors depends on its own properties alone; direct
+        children are checked with ``_has_errors_fast``, memoized by
+        ``_nested_key``, and nothing deeper is visited.
+        """
         for key, value in data.items():
-            if isinstance(value, dict) and "@type" in value:
-                # Recursively validate nested schema
-                nested_report = self.validate(value)
-                if nested_report.has_errors():
+            if isinstance(value, dict):
+                if _K_TYPE in value and self._nested_has_errors(value):
                     report.add_warning(
                         f"Nested schema '{key}' has validation errors",
                         key,
@@ -395,72 +750,63 @@ class SchemaValidator:
                     )
             elif isinstance(value, list):
                 for i, item in enumerate(value):
-                    if isinstance(item, dict) and "@type" in item:
-                        nested_report = self.validate(item)
-                        if nested_report.has_errors():
-                            report.add_warning(
-                                f"Nested schema in '{key}[{i}]' has validation errors",
-                                key,
-                                "Review nested schema validation"
-                            )
-
-    def _check_recommended_properties(self, data: Dict[str, Any], report: ValidationReport) -> None:
+                    if isinstance(item, dict) and _K_TYPE in item and self._nested_has_errors(item):
+                        report.add_warning(
+                            f"Nested schema in '{key}[{i}]' has validation errors",
+                            key,
+                            "Review nested schema validation"
+                        )
+
+    def _check_recommended_properties(self, data: Dict[str, Any], report: ValidationReport,
+                                      rules: Optional[Dict[str, Any]]) -> None:
         """Check recommended properties."""
-        schema_type = data.get("@type")
-        if schema_type in self.SCHEMA_TYPES:
-            recommended = self.SCHEMA_TYPES[schema_type]["recommended"]
-            missing_recommended = []
-            for prop in recommended:
-                if prop not in data:
-                    missing_recommended.append(prop)
-
-            if missing_recommended:
+        if rules is not None:
+            missing = rules["recommended"] - data.keys()
+            if missing:
+                names = [prop for prop in rules["recommended_order"] if prop in missing]
                 report.add_info(
-                    f"Missing recommended properties: {', '.join(missing_recommended)}",
+                    f"Missing recommended properties: {', '.join(names)}",
                     suggestion="Adding these properties improves search visibility"
                 )
 
-    def _validate_rich_results_compatibility(self, data: Dict[str, Any], report: ValidationReport) -> None:
+    def _validate_rich_results_compatibility(self, data: Dict[str, Any], report: ValidationReport,
+                                             schema_type: Any) -> None:
         """Validate Google Rich Results compatibility."""
-        schema_type = data.get("@type")
-
-        # Article requirements for Google
-        if schema_type in ["Article", "NewsArticle", "BlogPosting"]:
-            if "headline" not in data:
-                report.add_error("Articles require 'headline' for Rich Results", "headline")
-            if "image" not in data:
-                report.add_warning("Articles should include 'image' for Rich Results", "image")
-            if "author" not in data:
-                report.add_warning("Articles should include 'author' for Rich Results", "author")
-            if "datePublished" not in data:
-                report.add_warning("Articles should include 'datePublished' for Rich Results", "datePublished")
-
-        # Video requirements for Google
-        if schema_type == "VideoObject":
-            required_video = ["name", "description", "thumbnailUrl", "uploadDate"]
-            for prop in required_video:
-                if prop not in data:
-                    report.add_error(
-                        f"Videos require '{prop}' for Rich Results",
-                        prop
-                    )
-
-        # Image requirements
-        if schema_type == "ImageObject":
-            if "contentUrl" not in data:
-                report.add_error("Images require 'contentUrl' for Rich Results", "contentUrl")
+        for prop, level, message in self.RICH_RULES.get(schema_type, ()):
+            if prop not in data:
+                report.add_message(level, message, prop)
 
-    def validate_batch(self, schemas: List[Dict[str, Any]]) -> List[ValidationReport]:
+    def validate_batch(self, schemas: List[Dict[str, Any]], workers: int = 1,
+                       threads: bool = False, fail_fast: bool = False) -> List[ValidationReport]:
         """
         Validate multiple schemas.
 
         Args:
             schemas: List of schema dictionaries
+            workers: Processes to validate in. With more than one, schemas
+                are split into chunks and validated in parallel.
+            threads: Use threads instead of processes; only pays off when
+                the regex engine releases the GIL (google-re2)
+            fail_fast: Stop each schema at its first error (see ``validate``)
 
         Returns:
-            List of validation reports
+            List of validation reports, in input order
         """
-        return [self.validate(schema) for schema in schemas]
+        if workers <= 1 or len(schemas) <= 1:
+            return [self.validate(schema, fail_fast) for schema in schemas]
+
+        validate = functools.partial(self.validate, fail_fast=fail_fast) if fail_fast else self.validate
+        executor_class = ThreadPoolExecutor if threads else ProcessPoolExecutor
+        chunksize = max(1, len(schemas) // (workers * 4))
+        with executor_class(max_workers=workers) as executor:
+            return list(executor.map(validate, schemas, chunksize=chunksize))
+
+    def __getstate__(self) -> Dict[str, Any]:
+        """Pickle without compiled validators; worker processes build their own."""
+        state = self.__dict__.copy()
+        state["_compiled"] = {}
+        state["_nested_cache"] = {}
+        return state
 
     def generate_summary_report(self, reports: List[ValidationReport]) -> Dict[str, Any]:
         """
@@ -472,17 +818,52 @@ class SchemaValidator:
         Returns:
             Summary dictionary
         """
-        total_schemas = len(reports)
-        valid_schemas = sum(1 for r in reports if r.is_valid())
-        total_errors = sum(len(r.get_messages_by_level(ValidationLevel.ERROR)) for r in reports)
-        total_warnings = sum(len(r.get_messages_by_level(ValidationLevel.WARNING)) for r in reports)
+        summary, report_dicts = self.generate_summary_report_streaming(reports)
+        summary_reports = list(report_dicts)
+        summary["reports"] = summary_reports
+        return summary
+
+    def generate_summary_report_streaming(
+        self, reports: Iterable[ValidationReport]
+    ) -> Tuple[Dict[str, Any], Iterator[Dict[str, Any]]]:
+        """
+        Summarize reports in one pass while streaming their dictionaries.
 
-        return {
-            "total_schemas": total_schemas,
-            "valid_schemas": valid_schemas,
-            "invalid_schemas": total_schemas - valid_schemas,
-            "success_rate": (valid_schemas / total_schemas * 100) if total_schemas > 0 else 0,
-            "total_errors": total_errors,
-            "total_warnings": total_warnings,
-            "reports": [r.to_dict() for r in reports]
+        The summary's counters fill in as the iterator is consumed and are
+        final once it is exhausted, so a caller can write report dicts out
+        one at a time and the summary last, in constant memory.
+
+        Args:
+            reports: Validation reports, e.g. a generator
+
+        Returns:
+            (summary dictionary without "reports", iterator of report dicts)
+        """
+        summary = {
+            "total_schemas": 0,
+            "valid_schemas": 0,
+            "invalid_schemas": 0,
+            "success_rate": 0,
+            "total_errors": 0,
+            "total_warnings": 0,
         }
+
+        def report_dicts() -> Iterator[Dict[str, Any]]:
+            total = valid = errors = warnings = 0
+            for report in reports:
+                counts = report._counts
+                total += 1
+                valid += not counts[ValidationLevel.ERROR]
+                errors += counts[ValidationLevel.ERROR]
+                warnings += counts[ValidationLevel.WARNING]
+                yield report.to_dict()
+            summary.update(
+                total_schemas=total,
+                valid_schemas=valid,
+                invalid_schemas=total - valid,
+                success_rate=(valid / total * 100) if total > 0 else 0,
+                total_errors=errors,
+                total_warnings=warnings,
+            )
+
+        return summary, report_dicts()
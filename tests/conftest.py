@@ -8,6 +8,7 @@ Provides common fixtures for testing the schema-org-file-system:
 - Sample data generators
 """
 
+import hashlib
 import json
 import pytest
 from pathlib import Path
@@ -16,6 +17,27 @@ from datetime import datetime
 from typing import Generator
 
 
+# File contents written by the sample file fixtures, built once at import
+_SAMPLE_JSON = json.dumps({
+    "@context": "https://schema.org",
+    "@type": "DigitalDocument",
+    "name": "Test Document"
+}, indent=2)
+
+# Minimal 1x1 transparent PNG
+_PNG_BYTES = bytes.fromhex(
+    "89504e470d0a1a0a"  # PNG signature
+    "0000000d49484452"  # IHDR chunk
+    "0000000100000001"  # 1x1
+    "08060000001f15c4"
+    "890000000a494441"  # IDAT chunk
+    "54789c6300010000"
+    "0500010d0a2db400"
+    "00000049454e44ae"  # IEND chunk
+    "426082"
+)
+
+
 # ===========================================================================
 # Directory Fixtures
 # ===========================================================================
@@ -55,12 +77,7 @@ def sample_text_file(temp_dir: Path) -> Path:
 def sample_json_file(temp_dir: Path) -> Path:
     """Create sample JSON file."""
     file_path = temp_dir / "sample.json"
-    data = {
-        "@context": "https://schema.org",
-        "@type": "DigitalDocument",
-        "name": "Test Document"
-    }
-    file_path.write_text(json.dumps(data, indent=2))
+    file_path.write_text(_SAMPLE_JSON)
     return file_path
 
 
@@ -68,19 +85,7 @@ def sample_json_file(temp_dir: Path) -> Path:
 def sample_image_file(temp_dir: Path) -> Path:
     """Create a minimal valid PNG file for testing."""
     file_path = temp_dir / "sample.png"
-    # Minimal 1x1 transparent PNG
-    png_data = bytes([
-        0x89, 0x50, 0x4e, 0x47, 0x0d, 0x0a, 0x1a, 0x0a,  # PNG signature
-        0x00, 0x00, 0x00, 0x0d, 0x49, 0x48, 0x44, 0x52,  # IHDR chunk
-        0x00, 0x00, 0x00, 0x01, 0x00, 0x00, 0x00, 0x01,  # 1x1
-        0x08, 0x06, 0x00, 0x00, 0x00, 0x1f, 0x15, 0xc4,
-        0x89, 0x00, 0x00, 0x00, 0x0a, 0x49, 0x44, 0x41,  # IDAT chunk
-        0x54, 0x78, 0x9c, 0x63, 0x00, 0x01, 0x00, 0x00,
-        0x05, 0x00, 0x01, 0x0d, 0x0a, 0x2d, 0xb4, 0x00,
-        0x00, 0x00, 0x00, 0x49, 0x45, 0x4e, 0x44, 0xae,  # IEND chunk
-        0x42, 0x60, 0x82,
-    ])
-    file_path.write_bytes(png_data)
+    file_path.write_bytes(_PNG_BYTES)
     return file_path
 
 
@@ -94,11 +99,115 @@ def temp_db_path(temp_dir: Path) -> str:
     return str(temp_dir / "test.db")
 
 
+@pytest.fixture(scope="session")
+def _memory_graph_store():
+    """GraphStore on an in-memory database, created once per test run."""
+    from src.storage.graph_store import GraphStore
+    store = GraphStore(db_path=':memory:')
+    yield store
+    store.close()
+
+
+def _clear_graph_store(store) -> None:
+    """
+    Delete every row so the next test starts from an empty schema.
+
+    Foreign keys are switched off only while deleting, so files and
+    duplicate groups, which reference each other, delete in any order;
+    tests themselves run with them enforced.
+    """
+    from src.storage.models import Base, LOCATION_RTREE, SEARCH_TABLE, _virtual_table_available
+
+    with store.engine.connect() as conn:
+        # The pragma is a no-op inside a transaction, so end any open one first
+        conn.rollback()
+        conn.exec_driver_sql("PRAGMA foreign_keys=OFF")
+        try:
+            for table in reversed(Base.metadata.sorted_tables):
+                conn.execute(table.delete())
+            for name in (SEARCH_TABLE, LOCATION_RTREE):
+                if _virtual_table_available(conn, name):
+                    conn.exec_driver_sql(f"DELETE FROM {name}")
+            conn.commit()
+        finally:
+            conn.exec_driver_sql("PRAGMA foreign_keys=ON")
+    store.reset_hash_filter()
+
+
 @pytest.fixture
-def graph_store(temp_db_path: str):
-    """Create GraphStore instance with temp database."""
+def graph_store(request, temp_db_path: str):
+    """
+    Create GraphStore instance with an in-memory database.
+
+    The store and its schema are shared by the whole run and emptied
+    after each test. Tests marked ``persistent`` get their own store on a
+    temp database file instead, for behavior that needs one (journal
+    mode, other connections).
+    """
     from src.storage.graph_store import GraphStore
-    return GraphStore(db_path=temp_db_path)
+    if request.node.get_closest_marker('persistent'):
+        store = GraphStore(db_path=temp_db_path)
+        yield store
+        store.close()
+        return
+
+    store = request.getfixturevalue('_memory_graph_store')
+    try:
+        yield store
+    finally:
+        _clear_graph_store(store)
+
+
+@pytest.fixture(scope="class")
+def _class_db_session(_memory_graph_store):
+    """One session for all the tests of a class."""
+    session = _memory_graph_store.get_session()
+    yield session
+    session.rollback()
+    session.close()
+
+
+@pytest.fixture
+def db_session(request, graph_store):
+    """
+    Session on ``graph_store``, shared by the tests of a class.
+
+    Reset after each test: uncommitted work is rolled back, and the
+    identity map and per-session caches (``session.info``) are emptied,
+    since the tables are cleared underneath them.
+    """
+    if request.node.get_closest_marker('persistent'):
+        session = graph_store.get_session()
+        yield session
+        session.close()
+        return
+
+    session = request.getfixturevalue('_class_db_session')
+    try:
+        yield session
+    finally:
+        session.rollback()
+        session.expunge_all()
+        session.info.clear()
+
+
+@pytest.fixture
+def query_counter(graph_store):
+    """
+    Record SQL statements run on the graph store's engine.
+
+    Tests assert on ``len(query_counter)`` to catch N+1 lazy loads.
+    """
+    from sqlalchemy import event
+
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(graph_store.engine, 'before_cursor_execute', record)
+    yield statements
+    event.remove(graph_store.engine, 'before_cursor_execute', record)
 
 
 @pytest.fixture
@@ -136,6 +245,16 @@ def mock_sentry():
 # Sample Data Fixtures
 # ===========================================================================
 
+_SAMPLE_FILE_DATA = {
+    'original_path': '/tmp/test/sample.jpg',
+    'filename': 'sample.jpg',
+    'mime_type': 'image/jpeg',
+    'file_size': 1024,
+    # Hashed once here rather than by every add_file
+    'file_id': hashlib.sha256(b'/tmp/test/sample.jpg').hexdigest(),
+}
+
+
 @pytest.fixture
 def sample_file_data():
     """Sample file data for testing.
@@ -143,12 +262,7 @@ def sample_file_data():
     Note: file_extension is auto-calculated from filename in add_file,
     so we don't include it here to avoid conflicts.
     """
-    return {
-        'original_path': '/tmp/test/sample.jpg',
-        'filename': 'sample.jpg',
-        'mime_type': 'image/jpeg',
-        'file_size': 1024,
-    }
+    return dict(_SAMPLE_FILE_DATA)
 
 
 @pytest.fixture
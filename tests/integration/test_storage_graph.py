@@ -4,12 +4,31 @@ Integration tests for GraphStore.
 Tests database operations with real SQLite database.
 """
 
+import time
+
 import pytest
 from datetime import datetime
 from pathlib import Path
 
 from src.storage.graph_store import GraphStore
-from src.storage.models import FileStatus, RelationshipType
+from src.storage.models import CostRecord, File, FileStatus, RelationshipType
+
+
+FROZEN_NOW = datetime(2024, 1, 15, 12, 0, 0)
+
+
+class _FrozenDateTime(datetime):
+    """datetime whose utcnow() is fixed, so stamping a row reads no clock."""
+
+    @classmethod
+    def utcnow(cls):
+        return FROZEN_NOW
+
+
+@pytest.fixture(autouse=True)
+def _frozen_utcnow(monkeypatch):
+    """Freeze the time GraphStore stamps rows with (organized_at, last_seen, ...)."""
+    monkeypatch.setattr('src.storage.graph_store.datetime', _FrozenDateTime)
 
 
 class TestGraphStoreInit:
@@ -22,19 +41,79 @@ class TestGraphStoreInit:
 
     def test_creates_tables(self, graph_store):
         """Test that all tables are created."""
-        from sqlalchemy import inspect
-        inspector = inspect(graph_store.engine)
-        tables = inspector.get_table_names()
+        from sqlalchemy import text
 
-        expected_tables = [
+        with graph_store.engine.connect() as conn:
+            names = {name for name, in conn.execute(text(
+                "SELECT name FROM sqlite_master WHERE type IN ('table', 'index')"
+            ))}
+
+        expected_tables = {
             'files', 'categories', 'companies', 'people', 'locations',
             'file_relationships', 'organization_sessions', 'cost_records',
             'schema_metadata', 'key_value_store', 'file_categories',
             'file_companies', 'file_people', 'file_locations', 'merge_events'
-        ]
+        }
+        assert expected_tables - names == set()
+
+        # Lookup indexes behind find_duplicates and get_files(extension=...)
+        assert {'ix_files_content_hash', 'ix_files_extension_id'} <= names
+
+    def test_hash_and_extension_lookups_use_indexes(self, graph_store):
+        """Test content-hash and extension filters probe an index, not scan files."""
+        from sqlalchemy import text
+
+        def plan(sql):
+            with graph_store.engine.connect() as conn:
+                return ' '.join(row[-1] for row in conn.execute(text("EXPLAIN QUERY PLAN " + sql)))
+
+        assert 'SEARCH files USING INDEX' in plan(
+            "SELECT id FROM files WHERE content_hash = 'abc'"
+        )
+        assert 'SEARCH files USING INDEX' in plan(
+            "SELECT files.id FROM files JOIN extensions ON extensions.id = files.extension_id "
+            "WHERE extensions.value = '.jpg'"
+        )
+
+    @pytest.mark.persistent
+    def test_pragmas_applied(self, graph_store):
+        """Test connections use WAL with relaxed syncs and a busy timeout."""
+        with graph_store.engine.connect() as conn:
+            assert conn.exec_driver_sql("PRAGMA journal_mode").scalar() == 'wal'
+            assert conn.exec_driver_sql("PRAGMA synchronous").scalar() == 1  # NORMAL
+            assert conn.exec_driver_sql("PRAGMA busy_timeout").scalar() == 5000
+
+    def test_foreign_keys_enforced(self, graph_store):
+        """Test the shared in-memory store enforces foreign keys during tests."""
+        with graph_store.engine.connect() as conn:
+            assert conn.exec_driver_sql("PRAGMA foreign_keys").scalar() == 1
+
+    @pytest.mark.persistent
+    def test_sessions_reuse_pooled_connection(self, graph_store):
+        """Test back-to-back sessions on a file database share one pooled connection."""
+        from sqlalchemy.pool import QueuePool
 
-        for table in expected_tables:
-            assert table in tables, f"Table '{table}' not found"
+        def dbapi_connection():
+            session = graph_store.get_session()
+            try:
+                return session.connection().connection.dbapi_connection
+            finally:
+                session.close()
+
+        assert isinstance(graph_store.engine.pool, QueuePool)
+        assert dbapi_connection() is dbapi_connection()
+
+    def test_relationship_traversal_uses_primary_key(self, graph_store):
+        """Test neighbor lookups by edge type are answered from the primary key."""
+        from sqlalchemy import text
+
+        with graph_store.engine.connect() as conn:
+            plan = ' '.join(row[-1] for row in conn.execute(text(
+                "EXPLAIN QUERY PLAN SELECT target_file_id FROM file_relationships "
+                "WHERE source_file_id = 'a' AND relationship_type = 'DUPLICATE'"
+            )))
+
+        assert 'USING PRIMARY KEY' in plan
 
 
 class TestGraphStoreFileOperations:
@@ -45,68 +124,60 @@ class TestGraphStoreFileOperations:
     fresh objects within a session.
     """
 
-    def test_add_file(self, graph_store, sample_file_data):
-        """Test adding a file to the store."""
-        session = graph_store.get_session()
-        try:
-            file = graph_store.add_file(**sample_file_data, session=session)
+    def test_add_file_fields(self, graph_store, sample_file_data, db_session):
+        """Test adding a file sets its fields and derives its IDs from the path."""
+        session = db_session
+        file = graph_store.add_file(**sample_file_data, session=session)
 
-            assert file is not None
-            assert file.filename == sample_file_data['filename']
-            assert file.mime_type == sample_file_data['mime_type']
-            assert file.file_extension == '.jpg'
-        finally:
-            session.close()
+        assert file is not None
+        assert file.filename == sample_file_data['filename']
+        assert file.mime_type == sample_file_data['mime_type']
+        assert file.file_extension == '.jpg'
+        assert len(file.id) == 64  # SHA-256 hex
+        assert file.canonical_id.startswith('urn:sha256:')
 
-    def test_add_file_generates_id(self, graph_store, sample_file_data):
-        """Test that file ID is generated from path."""
-        session = graph_store.get_session()
-        try:
-            file = graph_store.add_file(**sample_file_data, session=session)
+    def test_get_file_by_id(self, graph_store, sample_file_data, db_session):
+        """Test retrieving file by ID."""
+        session = db_session
+        created = graph_store.add_file(**sample_file_data, session=session)
+        created_id = created.id
+        created_filename = created.filename
 
-            assert file.id is not None
-            assert len(file.id) == 64  # SHA-256 hex
-        finally:
-            session.close()
+        retrieved = graph_store.get_file(file_id=created_id, session=session)
 
-    def test_add_file_generates_canonical_id(self, graph_store, sample_file_data):
-        """Test that canonical ID is generated."""
-        session = graph_store.get_session()
-        try:
-            file = graph_store.add_file(**sample_file_data, session=session)
+        assert retrieved is not None
+        assert retrieved.id == created_id
+        assert retrieved.filename == created_filename
 
-            assert file.canonical_id is not None
-            assert file.canonical_id.startswith('urn:sha256:')
-        finally:
-            session.close()
+    def test_get_file_by_path(self, graph_store, sample_file_data, db_session):
+        """Test retrieving file by path."""
+        session = db_session
+        created = graph_store.add_file(**sample_file_data, session=session)
+        created_id = created.id
 
-    def test_get_file_by_id(self, graph_store, sample_file_data):
-        """Test retrieving file by ID."""
-        session = graph_store.get_session()
-        try:
-            created = graph_store.add_file(**sample_file_data, session=session)
-            created_id = created.id
-            created_filename = created.filename
+        retrieved = graph_store.get_file(path=sample_file_data['original_path'], session=session)
 
-            retrieved = graph_store.get_file(file_id=created_id, session=session)
+        assert retrieved is not None
+        assert retrieved.id == created_id
 
-            assert retrieved is not None
-            assert retrieved.id == created_id
-            assert retrieved.filename == created_filename
-        finally:
-            session.close()
+    def test_get_file_load_relations(self, graph_store, sample_file_data, query_counter):
+        """Test only the requested collections are loaded with the file."""
+        graph_store.add_file(**sample_file_data)
+        graph_store.add_file_to_category(sample_file_data['file_id'], "Documents")
 
-    def test_get_file_by_path(self, graph_store, sample_file_data):
-        """Test retrieving file by path."""
         session = graph_store.get_session()
         try:
-            created = graph_store.add_file(**sample_file_data, session=session)
-            created_id = created.id
-
-            retrieved = graph_store.get_file(path=sample_file_data['original_path'], session=session)
+            query_counter.clear()
+            file = graph_store.get_file(
+                path=sample_file_data['original_path'], session=session,
+                load_relations=('categories',)
+            )
+            loaded = len(query_counter)
 
-            assert retrieved is not None
-            assert retrieved.id == created_id
+            assert [c.name for c in file.categories] == ["Documents"]
+            assert len(query_counter) == loaded
+            assert not any('file_companies' in sql or 'file_people' in sql
+                           for sql in query_counter)
         finally:
             session.close()
 
@@ -115,171 +186,200 @@ class TestGraphStoreFileOperations:
         result = graph_store.get_file(file_id='nonexistent')
         assert result is None
 
-    def test_duplicate_file_updates_existing(self, graph_store, sample_file_data):
+    def test_duplicate_file_updates_existing(self, graph_store, sample_file_data, db_session):
         """Test adding duplicate file updates existing record."""
-        session = graph_store.get_session()
-        try:
-            file1 = graph_store.add_file(**sample_file_data, session=session)
-            file1_id = file1.id
+        session = db_session
+        file1 = graph_store.add_file(**sample_file_data, session=session)
+        file1_id = file1.id
 
-            # Add same file with different data
-            updated_data = sample_file_data.copy()
-            updated_data['file_size'] = 2048
-            file2 = graph_store.add_file(**updated_data, session=session)
+        # Add same file with different data
+        updated_data = sample_file_data.copy()
+        updated_data['file_size'] = 2048
+        file2 = graph_store.add_file(**updated_data, session=session)
 
-            # Should be same record
-            assert file1_id == file2.id
-            assert file2.file_size == 2048
-        finally:
-            session.close()
+        # Should be same record
+        assert file1_id == file2.id
+        assert file2.file_size == 2048
 
-    def test_update_file_status(self, graph_store, sample_file_data):
+    def test_update_file_status(self, graph_store, sample_file_data, db_session):
         """Test updating file status."""
-        session = graph_store.get_session()
-        try:
-            file = graph_store.add_file(**sample_file_data, session=session)
-            file_id = file.id
-
-            result = graph_store.update_file_status(
-                file_id,
-                FileStatus.ORGANIZED,
-                destination='/organized/path/sample.jpg',
-                session=session
-            )
+        session = db_session
+        file = graph_store.add_file(**sample_file_data, session=session)
+        file_id = file.id
+
+        result = graph_store.update_file_status(
+            file_id,
+            FileStatus.ORGANIZED,
+            destination='/organized/path/sample.jpg',
+            session=session
+        )
 
-            assert result is True
+        assert result is True
 
-            # Verify update
-            updated = graph_store.get_file(file_id=file_id, session=session)
-            assert updated.status == FileStatus.ORGANIZED
-            assert updated.current_path == '/organized/path/sample.jpg'
-        finally:
-            session.close()
+        # Verify update
+        updated = graph_store.get_file(file_id=file_id, session=session)
+        assert updated.status == FileStatus.ORGANIZED
+        assert updated.current_path == '/organized/path/sample.jpg'
 
-    def test_get_files_with_filters(self, graph_store, sample_file_data):
+    def test_get_files_with_filters(self, graph_store, sample_file_data, db_session):
         """Test querying files with filters."""
-        session = graph_store.get_session()
-        try:
-            # Add some files first
-            graph_store.add_file(**sample_file_data, session=session)
-            files = graph_store.get_files(limit=10, session=session)
-            assert len(files) >= 1
-        finally:
-            session.close()
+        session = db_session
+        # Add some files first
+        graph_store.add_file(**sample_file_data, session=session)
+        files = graph_store.get_files(limit=10, session=session)
+        assert len(files) >= 1
 
     def test_get_files_by_extension(self, graph_store):
         """Test filtering files by extension."""
-        session = graph_store.get_session()
-        try:
+        with graph_store.transaction() as session:
             # Add files with different extensions
-            graph_store.add_file(
-                original_path='/tmp/test.jpg',
-                filename='test.jpg',
-                session=session
-            )
-            graph_store.add_file(
-                original_path='/tmp/test.png',
-                filename='test.png',
-                session=session
-            )
+            graph_store.add_files([
+                {'original_path': '/tmp/test.jpg', 'filename': 'test.jpg'},
+                {'original_path': '/tmp/test.png', 'filename': 'test.png'},
+            ], session=session)
 
             jpg_files = graph_store.get_files(extension='.jpg', session=session)
             assert len(jpg_files) >= 1
             assert all(f.file_extension == '.jpg' for f in jpg_files)
-        finally:
-            session.close()
+
+    def test_add_files_batches_inserts(self, graph_store, query_counter):
+        """Test add_files inserts new files in one statement and updates existing ones."""
+        from src.storage.models import DuplicateGroup
+
+        graph_store.add_file('/tmp/old.pdf', 'old.pdf', content_hash='h1')
+        query_counter.clear()
+
+        with graph_store.transaction() as session:
+            files = graph_store.add_files([
+                {'original_path': f'/tmp/{i}.pdf', 'filename': f'{i}.pdf'} for i in range(5)
+            ] + [
+                {'original_path': '/tmp/old.pdf', 'filename': 'old.pdf', 'schema_type': 'Document'},
+                {'original_path': '/tmp/copy.pdf', 'filename': 'copy.pdf', 'content_hash': 'h1'},
+            ], session=session)
+            inserts = sum(s.lstrip().startswith('INSERT INTO files') for s in query_counter)
+
+            assert [f.filename for f in files][-2:] == ['old.pdf', 'copy.pdf']
+            assert files[-2].schema_type == 'Document'
+            assert files[3].file_extension == '.pdf'
+            group = session.query(DuplicateGroup).filter_by(content_hash='h1').one()
+            assert group.member_count == 2
+        assert inserts == 1
+
+    def test_transaction_commits_once(self, graph_store):
+        """Test writes in a transaction scope share one commit."""
+        from sqlalchemy import event
+
+        commits = []
+        with graph_store.transaction() as session:
+            event.listen(session, 'after_commit', commits.append)
+            for name in ('a.jpg', 'b.jpg', 'c.jpg'):
+                graph_store.add_file(original_path=f'/tmp/{name}', filename=name, session=session)
+            assert commits == []
+
+        assert len(commits) == 1
+        assert graph_store.get_file(path='/tmp/b.jpg') is not None
+
+    def test_transaction_rolls_back_on_error(self, graph_store):
+        """Test a failing transaction scope discards all of its writes."""
+        with pytest.raises(RuntimeError):
+            with graph_store.transaction() as session:
+                graph_store.add_file(original_path='/tmp/a.jpg', filename='a.jpg', session=session)
+                raise RuntimeError("abort")
+
+        assert graph_store.get_file(path='/tmp/a.jpg') is None
 
 
 class TestGraphStoreCategoryOperations:
     """Test category management."""
 
-    def test_get_or_create_category(self, graph_store):
+    def test_get_or_create_category(self, graph_store, db_session):
         """Test creating a category."""
-        session = graph_store.get_session()
-        try:
-            category = graph_store.get_or_create_category(name="Documents", session=session)
+        session = db_session
+        category = graph_store.get_or_create_category(name="Documents", session=session)
 
-            assert category is not None
-            assert category.name == "Documents"
-            assert category.canonical_id is not None
-        finally:
-            session.close()
+        assert category is not None
+        assert category.name == "Documents"
+        assert category.canonical_id is not None
 
-    def test_get_existing_category(self, graph_store):
+    def test_get_existing_category(self, graph_store, db_session):
         """Test getting an existing category."""
-        session = graph_store.get_session()
-        try:
-            created = graph_store.get_or_create_category(name="GameAssets", session=session)
-            created_id = created.id
-            retrieved = graph_store.get_or_create_category(name="GameAssets", session=session)
+        session = db_session
+        created = graph_store.get_or_create_category(name="GameAssets", session=session)
+        created_id = created.id
+        retrieved = graph_store.get_or_create_category(name="GameAssets", session=session)
 
-            assert created_id == retrieved.id
-        finally:
-            session.close()
+        assert created_id == retrieved.id
 
-    def test_create_subcategory(self, graph_store):
+    def test_create_subcategory(self, graph_store, db_session):
         """Test creating a subcategory."""
-        session = graph_store.get_session()
-        try:
-            parent = graph_store.get_or_create_category(name="Media", session=session)
-            parent_id = parent.id
-            child = graph_store.get_or_create_category(
-                name="Photos",
-                parent_name="Media",
-                session=session
-            )
+        session = db_session
+        parent = graph_store.get_or_create_category(name="Media", session=session)
+        parent_id = parent.id
+        child = graph_store.get_or_create_category(
+            name="Photos",
+            parent_name="Media",
+            session=session
+        )
 
-            assert child is not None
-            assert child.parent_id == parent_id
-            assert child.level == 1
-            assert child.full_path == "Media/Photos"
-        finally:
-            session.close()
+        assert child is not None
+        assert child.parent_id == parent_id
+        assert child.level == 1
+        assert child.full_path == "Media/Photos"
 
-    def test_add_file_to_category(self, graph_store, sample_file_data):
+    def test_add_file_to_category(self, graph_store, sample_file_data, db_session):
         """Test associating file with category."""
-        session = graph_store.get_session()
-        try:
-            file = graph_store.add_file(**sample_file_data, session=session)
-            file_id = file.id
-
-            result = graph_store.add_file_to_category(
-                file_id,
-                "Documents",
-                session=session
-            )
+        session = db_session
+        file = graph_store.add_file(**sample_file_data, session=session)
+        file_id = file.id
+
+        result = graph_store.add_file_to_category(
+            file_id,
+            "Documents",
+            session=session
+        )
 
-            assert result is True
+        assert result is True
 
-            # Verify association
-            updated = graph_store.get_file(file_id=file_id, session=session)
-            category_names = [c.name for c in updated.categories]
-            assert "Documents" in category_names
-        finally:
-            session.close()
+        # Verify association
+        updated = graph_store.get_file(
+            file_id=file_id, session=session, load_relations=('categories',)
+        )
+        category_names = [c.name for c in updated.categories]
+        assert "Documents" in category_names
 
-    def test_add_file_to_subcategory(self, graph_store, sample_file_data):
+    def test_add_file_to_subcategory(self, graph_store, sample_file_data, db_session):
         """Test associating file with subcategory."""
-        session = graph_store.get_session()
-        try:
-            file = graph_store.add_file(**sample_file_data, session=session)
-            file_id = file.id
+        session = db_session
+        file = graph_store.add_file(**sample_file_data, session=session)
+        file_id = file.id
+
+        result = graph_store.add_file_to_category(
+            file_id,
+            category_name="Financial",
+            subcategory_name="Invoices",
+            session=session
+        )
 
-            result = graph_store.add_file_to_category(
-                file_id,
-                category_name="Financial",
-                subcategory_name="Invoices",
-                session=session
-            )
+        assert result is True
 
-            assert result is True
-        finally:
-            session.close()
+    def test_add_file_to_category_with_loaded_file(self, graph_store, sample_file_data, db_session):
+        """Test passing an already-loaded file skips the ID lookup."""
+        session = db_session
+        file = graph_store.add_file(**sample_file_data, session=session)
+
+        result = graph_store.add_file_to_category(
+            "ignored-id",
+            "Documents",
+            session=session,
+            file=file
+        )
+
+        assert result is True
+        assert [c.name for c in file.categories] == ["Documents"]
 
     def test_get_category_tree(self, graph_store):
         """Test getting category hierarchy."""
-        session = graph_store.get_session()
-        try:
+        with graph_store.transaction() as session:
             # Create hierarchy
             graph_store.get_or_create_category("Root1", session=session)
             graph_store.get_or_create_category("Child1", parent_name="Root1", session=session)
@@ -291,177 +391,231 @@ class TestGraphStoreCategoryOperations:
             root_names = [c['name'] for c in tree]
             assert "Root1" in root_names
             assert "Root2" in root_names
+
+    def test_get_category_tree_query_count(self, graph_store, query_counter):
+        """Test tree depth, not breadth, drives the number of queries."""
+        for root in ('A', 'B', 'C'):
+            graph_store.get_or_create_category(root)
+            for child in ('x', 'y'):
+                graph_store.get_or_create_category(f"{root}{child}", parent_name=root)
+
+        query_counter.clear()
+        tree = graph_store.get_category_tree()
+
+        assert sorted(len(node['subcategories']) for node in tree) == [2, 2, 2]
+        assert len(query_counter) == 1
+
+    def test_subcategories_eager_load_by_level(self, graph_store, query_counter):
+        """Test walking subcategories issues one query per level."""
+        from src.storage.models import Category
+
+        for root in ('A', 'B', 'C'):
+            graph_store.get_or_create_category(root)
+            for child in ('x', 'y'):
+                graph_store.get_or_create_category(f"{root}{child}", parent_name=root)
+
+        query_counter.clear()
+        session = graph_store.get_session()
+        try:
+            roots = session.query(Category).filter(Category.parent_id.is_(None)).all()
+            names = sorted(sub.name for root in roots for sub in root.subcategories)
+            assert all(sub.subcategories == [] for root in roots for sub in root.subcategories)
         finally:
             session.close()
 
+        assert names == ['Ax', 'Ay', 'Bx', 'By', 'Cx', 'Cy']
+        # Roots, children, and the (empty) grandchildren level
+        assert len(query_counter) == 3
+
 
 class TestGraphStoreCompanyOperations:
     """Test company management."""
 
-    def test_get_or_create_company(self, graph_store):
+    def test_get_or_create_company(self, graph_store, db_session):
         """Test creating a company."""
-        session = graph_store.get_session()
-        try:
-            company = graph_store.get_or_create_company("Acme Corp", session=session)
+        session = db_session
+        company = graph_store.get_or_create_company("Acme Corp", session=session)
 
-            assert company is not None
-            assert company.name == "Acme Corp"
-            assert company.normalized_name == "acme corp"
-            assert company.canonical_id is not None
-        finally:
-            session.close()
+        assert company is not None
+        assert company.name == "Acme Corp"
+        assert company.normalized_name == "acme corp"
+        assert company.canonical_id is not None
 
-    def test_company_normalization(self, graph_store):
+    def test_company_normalization(self, graph_store, db_session):
         """Test company name normalization."""
-        session = graph_store.get_session()
-        try:
-            c1 = graph_store.get_or_create_company("Test Company", session=session)
-            c1_id = c1.id
-            c2 = graph_store.get_or_create_company("  test company  ", session=session)
+        session = db_session
+        c1 = graph_store.get_or_create_company("Test Company", session=session)
+        c1_id = c1.id
+        c2 = graph_store.get_or_create_company("  test company  ", session=session)
 
-            assert c1_id == c2.id
-        finally:
-            session.close()
+        assert c1_id == c2.id
 
-    def test_add_file_to_company(self, graph_store, sample_file_data):
-        """Test associating file with company."""
-        session = graph_store.get_session()
-        try:
-            file = graph_store.add_file(**sample_file_data, session=session)
-            file_id = file.id
+    @pytest.mark.parametrize('returning', [True, False])
+    def test_company_conflict_keeps_transaction(self, graph_store, sample_file_data,
+                                                monkeypatch, returning):
+        """Test a duplicate insert is ignored without rolling back earlier work."""
+        from src.storage.models import Company
 
-            result = graph_store.add_file_to_company(
-                file_id,
-                "Test Corp",
-                session=session
-            )
+        # False covers SQLite builds older than 3.35 (no RETURNING)
+        monkeypatch.setattr('src.storage.graph_store.SQLITE_RETURNING', returning)
 
-            assert result is True
+        with graph_store.transaction() as session:
+            graph_store.add_file(**sample_file_data, session=session)
+            company = graph_store.get_or_create_company("Acme", session=session)
+            duplicate = GraphStore._insert_or_ignore(session, Company, {
+                'name': 'ACME', 'normalized_name': company.normalized_name,
+            })
+            assert duplicate is None
+            assert graph_store.get_or_create_company("acme ", session=session) is company
 
-            # Verify association
-            updated = graph_store.get_file(file_id=file_id, session=session)
-            company_names = [c.name for c in updated.companies]
-            assert "Test Corp" in company_names
-        finally:
-            session.close()
+        assert graph_store.get_file(path=sample_file_data['original_path']) is not None
+
+    def test_add_file_to_company(self, graph_store, sample_file_data, db_session):
+        """Test associating file with company."""
+        session = db_session
+        file = graph_store.add_file(**sample_file_data, session=session)
+        file_id = file.id
+
+        result = graph_store.add_file_to_company(
+            file_id,
+            "Test Corp",
+            session=session
+        )
+
+        assert result is True
+
+        # Verify association
+        updated = graph_store.get_file(
+            file_id=file_id, session=session, load_relations=('companies',)
+        )
+        company_names = [c.name for c in updated.companies]
+        assert "Test Corp" in company_names
 
 
 class TestGraphStorePersonOperations:
     """Test person management."""
 
-    def test_get_or_create_person(self, graph_store):
+    def test_get_or_create_person(self, graph_store, db_session):
         """Test creating a person."""
-        session = graph_store.get_session()
-        try:
-            person = graph_store.get_or_create_person("John Doe", session=session)
+        session = db_session
+        person = graph_store.get_or_create_person("John Doe", session=session)
 
-            assert person is not None
-            assert person.name == "John Doe"
-            assert person.normalized_name == "john doe"
-            assert person.canonical_id is not None
-        finally:
-            session.close()
+        assert person is not None
+        assert person.name == "John Doe"
+        assert person.normalized_name == "john doe"
+        assert person.canonical_id is not None
 
-    def test_person_with_email(self, graph_store):
+    def test_person_with_email(self, graph_store, db_session):
         """Test creating person with email."""
-        session = graph_store.get_session()
-        try:
-            person = graph_store.get_or_create_person(
-                name="Jane Smith",
-                email="jane@example.com",
-                role="author",
-                session=session
-            )
+        session = db_session
+        person = graph_store.get_or_create_person(
+            name="Jane Smith",
+            email="jane@example.com",
+            role="author",
+            session=session
+        )
 
-            assert person.email == "jane@example.com"
-            assert person.role == "author"
-        finally:
-            session.close()
+        assert person.email == "jane@example.com"
+        assert person.role == "author"
 
-    def test_add_file_to_person(self, graph_store, sample_file_data):
+    def test_add_file_to_person(self, graph_store, sample_file_data, db_session):
         """Test associating file with person."""
-        session = graph_store.get_session()
-        try:
-            file = graph_store.add_file(**sample_file_data, session=session)
-            file_id = file.id
-
-            result = graph_store.add_file_to_person(
-                file_id,
-                "Test Person",
-                session=session
-            )
+        session = db_session
+        file = graph_store.add_file(**sample_file_data, session=session)
+        file_id = file.id
+
+        result = graph_store.add_file_to_person(
+            file_id,
+            "Test Person",
+            session=session
+        )
 
-            assert result is True
-        finally:
-            session.close()
+        assert result is True
 
 
 class TestGraphStoreLocationOperations:
     """Test location management."""
 
-    def test_get_or_create_location(self, graph_store):
+    def test_get_or_create_location(self, graph_store, db_session):
         """Test creating a location."""
-        session = graph_store.get_session()
-        try:
-            location = graph_store.get_or_create_location(
-                name="San Francisco",
-                city="San Francisco",
-                state="CA",
-                country="USA",
-                latitude=37.7749,
-                longitude=-122.4194,
-                session=session
-            )
+        session = db_session
+        location = graph_store.get_or_create_location(
+            name="San Francisco",
+            city="San Francisco",
+            state="CA",
+            country="USA",
+            latitude=37.7749,
+            longitude=-122.4194,
+            session=session
+        )
 
-            assert location is not None
-            assert location.name == "San Francisco"
-            assert location.latitude == 37.7749
-            assert location.canonical_id is not None
-        finally:
-            session.close()
+        assert location is not None
+        assert location.name == "San Francisco"
+        assert location.latitude == 37.7749
+        assert location.canonical_id is not None
 
-    def test_find_location_by_coordinates(self, graph_store):
+    def test_find_location_by_coordinates(self, graph_store, db_session):
         """Test finding location by nearby coordinates."""
-        session = graph_store.get_session()
-        try:
-            created = graph_store.get_or_create_location(
-                name="NYC",
-                latitude=40.7128,
-                longitude=-74.0060,
-                session=session
-            )
-            created_id = created.id
+        session = db_session
+        created = graph_store.get_or_create_location(
+            name="NYC",
+            latitude=40.7128,
+            longitude=-74.0060,
+            session=session
+        )
+        created_id = created.id
+
+        # Find with slightly different coordinates
+        found = graph_store.get_or_create_location(
+            name="NYC Area",
+            latitude=40.7130,
+            longitude=-74.0058,
+            session=session
+        )
 
-            # Find with slightly different coordinates
-            found = graph_store.get_or_create_location(
-                name="NYC Area",
-                latitude=40.7130,
-                longitude=-74.0058,
-                session=session
-            )
+        assert created_id == found.id
 
-            assert created_id == found.id
-        finally:
-            session.close()
+    def test_location_index_follows_moves(self, graph_store, db_session):
+        """Test the R*Tree is kept in step when a location's coordinates change."""
+        from sqlalchemy import text
+        from src.storage.models import LOCATION_RTREE
+
+        session = db_session
+        moved = graph_store.get_or_create_location(
+            name="Depot", latitude=10.0, longitude=10.0, session=session
+        )
+        graph_store.get_or_create_location(
+            name="Harbor", latitude=-10.0, longitude=-10.0, session=session
+        )
+        moved.latitude, moved.longitude = 51.5074, -0.1278
+        session.flush()
+
+        found = graph_store.get_or_create_location(
+            name="London", latitude=51.5075, longitude=-0.1277, session=session
+        )
+        assert found.id == moved.id
+        assert graph_store.get_or_create_location(
+            name="Old Depot", latitude=10.0, longitude=10.0, session=session
+        ).id != moved.id
+
+        rows = session.execute(text(f"SELECT COUNT(*) FROM {LOCATION_RTREE}")).scalar()
+        assert rows == 3
 
-    def test_add_file_to_location(self, graph_store, sample_file_data):
+    def test_add_file_to_location(self, graph_store, sample_file_data, db_session):
         """Test associating file with location."""
-        session = graph_store.get_session()
-        try:
-            file = graph_store.add_file(**sample_file_data, session=session)
-            file_id = file.id
-
-            result = graph_store.add_file_to_location(
-                file_id,
-                "Test Location",
-                latitude=40.0,
-                longitude=-74.0,
-                session=session
-            )
+        session = db_session
+        file = graph_store.add_file(**sample_file_data, session=session)
+        file_id = file.id
+
+        result = graph_store.add_file_to_location(
+            file_id,
+            "Test Location",
+            latitude=40.0,
+            longitude=-74.0,
+            session=session
+        )
 
-            assert result is True
-        finally:
-            session.close()
+        assert result is True
 
 
 class TestGraphStoreRelationships:
@@ -469,8 +623,7 @@ class TestGraphStoreRelationships:
 
     def test_add_relationship(self, graph_store):
         """Test adding relationship between files."""
-        session = graph_store.get_session()
-        try:
+        with graph_store.transaction() as session:
             file1 = graph_store.add_file(
                 original_path='/tmp/file1.jpg',
                 filename='file1.jpg',
@@ -494,24 +647,15 @@ class TestGraphStoreRelationships:
 
             assert relationship is not None
             assert relationship.confidence == 0.85
-        finally:
-            session.close()
 
     def test_find_related_files(self, graph_store):
         """Test finding related files."""
-        session = graph_store.get_session()
-        try:
-            file1 = graph_store.add_file(
-                original_path='/tmp/source.jpg',
-                filename='source.jpg',
-                session=session
-            )
+        with graph_store.transaction() as session:
+            file1, file2 = graph_store.add_files([
+                {'original_path': '/tmp/source.jpg', 'filename': 'source.jpg'},
+                {'original_path': '/tmp/related.jpg', 'filename': 'related.jpg'},
+            ], session=session)
             file1_id = file1.id
-            file2 = graph_store.add_file(
-                original_path='/tmp/related.jpg',
-                filename='related.jpg',
-                session=session
-            )
             file2_id = file2.id
 
             graph_store.add_relationship(
@@ -526,27 +670,16 @@ class TestGraphStoreRelationships:
             assert len(related) >= 1
             related_ids = [f.id for f, _, _ in related]
             assert file2_id in related_ids
-        finally:
-            session.close()
 
     def test_find_duplicates(self, graph_store):
         """Test finding duplicate files."""
-        session = graph_store.get_session()
-        try:
+        with graph_store.transaction() as session:
             # Add files with same content hash
-            file1 = graph_store.add_file(
-                original_path='/tmp/dup1.jpg',
-                filename='dup1.jpg',
-                content_hash='abc123',
-                session=session
-            )
+            file1, file2 = graph_store.add_files([
+                {'original_path': '/tmp/dup1.jpg', 'filename': 'dup1.jpg', 'content_hash': 'abc123'},
+                {'original_path': '/tmp/dup2.jpg', 'filename': 'dup2.jpg', 'content_hash': 'abc123'},
+            ], session=session)
             file1_id = file1.id
-            file2 = graph_store.add_file(
-                original_path='/tmp/dup2.jpg',
-                filename='dup2.jpg',
-                content_hash='abc123',
-                session=session
-            )
             file2_id = file2.id
 
             duplicates = graph_store.find_duplicates(session=session)
@@ -556,87 +689,281 @@ class TestGraphStoreRelationships:
             dup_ids = [f.id for f in dup_group]
             assert file1_id in dup_ids
             assert file2_id in dup_ids
-        finally:
-            session.close()
+
+    def test_find_duplicate_hashes(self, graph_store):
+        """Test duplicate groups come back as plain IDs."""
+        from src.storage.models import File
+
+        graph_store.add_files([
+            {'original_path': '/tmp/dup1.jpg', 'filename': 'dup1.jpg', 'content_hash': 'abc123'},
+            {'original_path': '/tmp/dup2.jpg', 'filename': 'dup2.jpg', 'content_hash': 'abc123'},
+            {'original_path': '/tmp/solo.jpg', 'filename': 'solo.jpg', 'content_hash': 'def456'},
+        ])
+
+        [(content_hash, file_ids)] = graph_store.find_duplicate_hashes()
+        assert content_hash == 'abc123'
+        assert sorted(file_ids) == sorted(
+            File.generate_id(f'/tmp/dup{i}.jpg') for i in (1, 2)
+        )
+        assert graph_store.find_duplicate_hashes(content_hash='def456') == []
+
+    def test_duplicate_group_tracks_members(self, graph_store, db_session):
+        """Test copies of one file share a group instead of pairwise edges."""
+        from src.storage.models import DuplicateGroup, File, FileRelationship
+
+        for name in ('a.jpg', 'b.jpg', 'c.jpg'):
+            graph_store.add_file(original_path=f'/tmp/{name}', filename=name, content_hash='h1')
+        graph_store.add_file(original_path='/tmp/d.jpg', filename='d.jpg', content_hash='h2')
+
+        session = db_session
+        group = session.query(DuplicateGroup).one()
+        assert (group.content_hash, group.member_count) == ('h1', 3)
+        assert session.query(FileRelationship).count() == 0
+
+        [members] = graph_store.find_duplicates(content_hash='h1', session=session)
+        assert {f.filename for f in members} == {'a.jpg', 'b.jpg', 'c.jpg'}
+        assert graph_store.find_duplicates(content_hash='h2', session=session) == []
+
+    def test_duplicate_group_attaches_every_copy(self, graph_store, db_session):
+        """Test a new copy joins all stored files with its hash, not just one."""
+        from sqlalchemy import update
+        from src.storage.models import DuplicateGroup, File
+
+        for name in ('a.jpg', 'b.jpg'):
+            graph_store.add_file(original_path=f'/tmp/{name}', filename=name)
+        with graph_store.engine.begin() as conn:
+            conn.execute(update(File).values(content_hash='h1'))
+        graph_store.add_file(original_path='/tmp/c.jpg', filename='c.jpg', content_hash='h1')
+
+        [(_, file_ids)] = graph_store.find_duplicate_hashes(content_hash='h1')
+        assert len(file_ids) == 3
+        assert db_session.query(DuplicateGroup.member_count).scalar() == 3
+
+    def test_find_duplicates_without_groups(self, graph_store):
+        """Test files sharing a hash are found even when no group was kept for them."""
+        from sqlalchemy import update
+        from src.storage.models import File
+
+        for name in ('c.jpg', 'a.jpg', 'b.jpg'):
+            graph_store.add_file(original_path=f'/tmp/{name}', filename=name)
+        with graph_store.engine.begin() as conn:
+            conn.execute(update(File).values(content_hash='h1'))
+
+        expected = sorted(File.generate_id(f'/tmp/{name}') for name in ('a.jpg', 'b.jpg', 'c.jpg'))
+        [(_, file_ids)] = graph_store.find_duplicate_hashes(content_hash='h1')
+        assert file_ids == expected
+        with graph_store.transaction() as session:
+            [members] = graph_store.find_duplicates(content_hash='h1', session=session)
+            assert [f.id for f in members] == expected
+
+    def test_rebuild_duplicate_groups(self, graph_store):
+        """Test groups are recomputed for files written without add_file."""
+        from sqlalchemy import update
+        from src.storage.models import File
+
+        graph_store.add_file(original_path='/tmp/a.jpg', filename='a.jpg')
+        graph_store.add_file(original_path='/tmp/b.jpg', filename='b.jpg')
+        with graph_store.engine.begin() as conn:
+            conn.execute(update(File).values(content_hash='h1'))
+
+        assert graph_store.rebuild_duplicate_groups() == 1
+        assert len(graph_store.find_duplicate_hashes(content_hash='h1')) == 1
+        assert graph_store.rebuild_duplicate_groups() == 1
+
+    def test_content_hash_filter(self, graph_store):
+        """Test the preflight filter tracks hashes added after seeding."""
+        import hashlib
+
+        seeded = hashlib.sha256(b'seeded').hexdigest()
+        added = hashlib.sha256(b'added').hexdigest()
+        graph_store.add_file('/tmp/seeded.jpg', 'seeded.jpg', content_hash=seeded)
+
+        assert graph_store.may_have_content_hash(seeded)
+        assert not graph_store.may_have_content_hash(added)
+        assert graph_store.find_duplicates(content_hash=added) == []
+
+        graph_store.add_file('/tmp/added.jpg', 'added.jpg', content_hash=added)
+        graph_store.add_file('/tmp/added2.jpg', 'added2.jpg', content_hash=added)
+
+        assert graph_store.may_have_content_hash(added)
+        [(_, file_ids)] = graph_store.find_duplicate_hashes(content_hash=added)
+        assert len(file_ids) == 2
+
+
+    def test_content_hash_filter_accepts_non_hex_hashes(self, graph_store):
+        """Test 64-character hashes that are not hex digests can be stored and checked."""
+        odd = 'z' * 64
+        graph_store.add_file('/tmp/odd.jpg', 'odd.jpg', content_hash=odd)
+        assert graph_store.may_have_content_hash(odd)
+
+    def test_duplicate_reads_ignore_hash_filter(self, graph_store):
+        """Test groups written outside the store are found despite the filter."""
+        import hashlib
+        from sqlalchemy import insert, update
+        from src.storage.models import DuplicateGroup, File
+
+        content_hash = hashlib.sha256(b'written elsewhere').hexdigest()
+        graph_store.add_file('/tmp/a.jpg', 'a.jpg')
+        graph_store.add_file('/tmp/b.jpg', 'b.jpg')
+        assert not graph_store.may_have_content_hash(content_hash)
+
+        with graph_store.engine.begin() as conn:
+            group_id = conn.execute(
+                insert(DuplicateGroup).values(content_hash=content_hash, member_count=2)
+            ).inserted_primary_key[0]
+            conn.execute(update(File).values(content_hash=content_hash,
+                                             duplicate_group_id=group_id))
+
+        [(_, file_ids)] = graph_store.find_duplicate_hashes(content_hash=content_hash)
+        assert len(file_ids) == 2
+        [members] = graph_store.find_duplicates(content_hash=content_hash)
+        assert len(members) == 2
 
 
 class TestGraphStoreSession:
     """Test organization session management."""
 
-    def test_create_session(self, graph_store):
+    def test_create_session(self, graph_store, db_session):
         """Test creating an organization session."""
-        db_session = graph_store.get_session()
-        try:
-            org_session = graph_store.create_session(
-                source_directories=['/tmp/source'],
-                base_path='/tmp/target',
-                dry_run=True,
-                session=db_session
-            )
+        org_session = graph_store.create_session(
+            source_directories=['/tmp/source'],
+            base_path='/tmp/target',
+            dry_run=True,
+            session=db_session
+        )
 
-            assert org_session is not None
-            assert org_session.dry_run is True
-            assert org_session.started_at is not None
-        finally:
-            db_session.close()
+        assert org_session is not None
+        assert org_session.dry_run is True
+        assert org_session.started_at is not None
 
-    def test_complete_session(self, graph_store):
+    def test_complete_session(self, graph_store, db_session):
         """Test completing a session with stats."""
-        db_session = graph_store.get_session()
-        try:
-            org_session = graph_store.create_session(
-                source_directories=['/tmp/source'],
-                base_path='/tmp/target',
-                session=db_session
-            )
-            session_id = org_session.id
-
-            result = graph_store.complete_session(
-                session_id=session_id,
-                stats={
-                    'total_files': 100,
-                    'organized': 95,
-                    'skipped': 3,
-                    'errors': 2
-                },
-                db_session=db_session
-            )
+        org_session = graph_store.create_session(
+            source_directories=['/tmp/source'],
+            base_path='/tmp/target',
+            session=db_session
+        )
+        session_id = org_session.id
+
+        result = graph_store.complete_session(
+            session_id=session_id,
+            stats={
+                'total_files': 100,
+                'organized': 95,
+                'skipped': 3,
+                'errors': 2
+            },
+            db_session=db_session
+        )
 
-            assert result is True
-        finally:
-            db_session.close()
+        assert result is True
+        assert org_session.completed_at == FROZEN_NOW
 
 
 class TestGraphStoreStatistics:
     """Test statistics and aggregations."""
 
-    def test_get_statistics(self, graph_store, sample_file_data):
+    def test_get_statistics(self, graph_store, sample_file_data, db_session):
         """Test getting overall statistics."""
-        session = graph_store.get_session()
+        session = db_session
+        # Add some data first
+        graph_store.add_file(**sample_file_data, session=session)
+        stats = graph_store.get_statistics(session=session)
+
+        assert 'total_files' in stats
+        assert 'total_categories' in stats
+        assert 'total_companies' in stats
+        assert stats['total_files'] >= 1
+
+    def test_get_cost_statistics(self, graph_store, db_session):
+        """Test getting cost statistics."""
+        session = db_session
+        stats = graph_store.get_cost_statistics(session=session)
+
+        assert 'total_records' in stats
+        assert 'total_cost' in stats
+        assert 'by_feature' in stats
+
+
+    @pytest.mark.persistent
+    def test_record_cost_is_written_in_background(self, graph_store):
+        """Test queued cost records show up in cost statistics."""
+        for _ in range(3):
+            graph_store.record_cost('ocr', 0.5, cost=0.01)
+        graph_store.record_cost('ocr', 0.5, success=False, error_message='timeout')
+
+        stats = graph_store.get_cost_statistics()
+
+        assert stats['total_records'] == 4
+        assert stats['by_feature']['ocr']['error_count'] == 1
+        assert stats['total_cost'] == pytest.approx(0.03)
+
+    @pytest.mark.persistent
+    def test_close_writes_queued_cost_records(self, graph_store, temp_db_path):
+        """Test close() flushes the cost writer before releasing the database."""
+        graph_store.record_cost('ocr', 1.0)
+        graph_store.close()
+
+        reopened = GraphStore(db_path=temp_db_path)
         try:
-            # Add some data first
-            graph_store.add_file(**sample_file_data, session=session)
-            stats = graph_store.get_statistics(session=session)
+            assert reopened.get_cost_statistics()['total_records'] == 1
+        finally:
+            reopened.close()
+
+    @pytest.mark.persistent
+    def test_cost_sink_flushes_full_batch(self, graph_store):
+        """Test a full batch is written without an explicit flush."""
+        from src.storage.graph_store import CostRecordSink
 
-            assert 'total_files' in stats
-            assert 'total_categories' in stats
-            assert 'total_companies' in stats
-            assert stats['total_files'] >= 1
+        sink = CostRecordSink(graph_store.engine, flush_interval=60, max_batch=2)
+        try:
+            sink.put({'feature_name': 'ocr', 'processing_time_sec': 1.0})
+            sink.put({'feature_name': 'ocr', 'processing_time_sec': 1.0})
+
+            for _ in range(100):
+                if graph_store.get_cost_statistics()['total_records'] == 2:
+                    break
+                time.sleep(0.01)
+            assert graph_store.get_cost_statistics()['total_records'] == 2
         finally:
-            session.close()
+            sink.close()
 
-    def test_get_cost_statistics(self, graph_store):
-        """Test getting cost statistics."""
-        session = graph_store.get_session()
+    @pytest.mark.persistent
+    def test_cost_sink_reraises_write_errors(self, graph_store):
+        """Test a failed background write is raised from flush()."""
+        from sqlalchemy.exc import IntegrityError
+        from src.storage.graph_store import CostRecordSink
+
+        sink = CostRecordSink(graph_store.engine, flush_interval=60)
         try:
-            stats = graph_store.get_cost_statistics(session=session)
+            sink.put({'feature_name': None, 'processing_time_sec': 1.0})
+            with pytest.raises(IntegrityError):
+                sink.flush()
 
-            assert 'total_records' in stats
-            assert 'total_cost' in stats
-            assert 'by_feature' in stats
+            sink.put({'feature_name': 'ocr', 'processing_time_sec': 1.0})
+            sink.flush()
+            assert graph_store.get_cost_statistics()['total_records'] == 1
         finally:
-            session.close()
+            sink.close()
 
+    def test_memory_cost_records_join_open_transaction(self, graph_store, sample_file_data):
+        """Test cost writes on a ':memory:' store leave the caller's transaction open."""
+        session = graph_store.get_session()
+        try:
+            session.add(File(
+                id=sample_file_data['file_id'],
+                original_path=sample_file_data['original_path'],
+                filename=sample_file_data['filename'],
+            ))
+            session.flush()
+            graph_store.record_cost('ocr', 1.0, file_id=sample_file_data['file_id'])
+            graph_store.flush_cost_records()
+            session.rollback()
+
+            assert session.query(File).count() == 0
+            assert session.query(CostRecord).count() == 0
+        finally:
+            session.close()
 
 class TestGraphStoreSearch:
     """Test search operations."""
@@ -672,3 +999,273 @@ class TestGraphStoreSearch:
         )
 
         assert len(results) >= 1
+
+    def test_search_index_follows_updates(self, graph_store):
+        """Test the full-text index is kept in step with file writes."""
+        from src.storage.models import SEARCH_TABLE
+
+        graph_store.add_file(
+            original_path='/tmp/scan.pdf', filename='scan.pdf', extracted_text='Quarterly Report'
+        )
+        assert [f.filename for f in graph_store.search_files('TERLY')] == ['scan.pdf']
+
+        graph_store.add_file(
+            original_path='/tmp/scan.pdf', filename='scan.pdf', extracted_text='Annual Summary'
+        )
+        assert graph_store.search_files('quarterly') == []
+        assert [f.filename for f in graph_store.search_files('annual sum')] == ['scan.pdf']
+
+        with graph_store.engine.connect() as conn:
+            assert conn.exec_driver_sql(f"SELECT COUNT(*) FROM {SEARCH_TABLE}").scalar() == 1
+
+    def test_search_short_query_scans(self, graph_store):
+        """Test queries shorter than a trigram fall back to a scan."""
+        graph_store.add_file(original_path='/tmp/a_b.txt', filename='a_b.txt')
+
+        assert [f.filename for f in graph_store.search_files('_b')] == ['a_b.txt']
+
+    def test_search_ranks_filename_matches_first(self, graph_store):
+        """Test filename hits come before content-only hits in the results."""
+        for i in range(6):
+            graph_store.add_file(original_path=f'/tmp/x{i}.txt', filename=f'x{i}.txt',
+                                 extracted_text='quarterly report draft')
+        graph_store.add_file(original_path='/tmp/report.txt', filename='report.txt')
+
+        assert graph_store.search_files('report')[0].filename == 'report.txt'
+
+    def test_search_short_query_matches_content(self, graph_store):
+        """Test queries shorter than a trigram still match extracted text."""
+        graph_store.add_file(original_path='/tmp/note.txt', filename='note.txt',
+                             extracted_text='Total: 42 EUR')
+
+        assert [f.filename for f in graph_store.search_files('42')] == ['note.txt']
+
+    def test_search_index_accepts_non_hex_ids(self, graph_store):
+        """Test 64-character IDs that are not hex digests are still indexed."""
+        graph_store.add_file(original_path='/tmp/odd.txt', filename='odd.txt', file_id='x' * 64)
+
+        assert [f.id for f in graph_store.search_files('odd')] == ['x' * 64]
+
+    def test_rebuild_search_index(self, graph_store, db_session):
+        """Test a rebuild picks up files written by the bulk helpers."""
+        from src.storage.models import File, bulk_upsert_files
+
+        bulk_upsert_files(db_session, [
+            {'id': File.generate_id('/tmp/bulk.txt'), 'filename': 'bulk.txt',
+             'original_path': '/tmp/bulk.txt', 'status': FileStatus.PENDING}
+        ])
+        db_session.commit()
+        assert [f.filename for f in graph_store.search_files('bulk')] == ['bulk.txt']
+
+        graph_store.rebuild_search_index()
+        assert [f.filename for f in graph_store.search_files('bulk')] == ['bulk.txt']
+
+
+class TestBulkHelpers:
+    """Test the chunked bulk write helpers in models."""
+
+    def test_bulk_upsert_files_inserts_and_updates(self, graph_store, db_session):
+        """Test reruns update existing files instead of failing."""
+        from src.storage.models import File, bulk_upsert_files
+
+        rows = [
+            {'id': File.generate_id(f'/tmp/{i}.txt'), 'filename': f'{i}.txt',
+             'original_path': f'/tmp/{i}.txt', 'status': FileStatus.PENDING}
+            for i in range(5)
+        ]
+        session = db_session
+        assert bulk_upsert_files(session, rows, batch_size=2) == 5
+
+        for row in rows:
+            row['status'] = FileStatus.ORGANIZED
+        assert bulk_upsert_files(session, rows[:2]) == 2
+
+        statuses = [f.status for f in session.query(File).order_by(File.filename)]
+        assert statuses == [FileStatus.ORGANIZED] * 2 + [FileStatus.PENDING] * 3
+        assert bulk_upsert_files(session, []) == 0
+
+    def test_bulk_helpers_leave_commit_to_caller(self, graph_store):
+        """Test a failure after some chunks leaves none of them written."""
+        from src.storage.models import File, bulk_upsert_files
+
+        rows = [
+            {'id': File.generate_id(f'/tmp/{i}.txt'), 'filename': f'{i}.txt',
+             'original_path': f'/tmp/{i}.txt'}
+            for i in range(4)
+        ]
+        with pytest.raises(RuntimeError):
+            with graph_store.transaction() as session:
+                bulk_upsert_files(session, rows, batch_size=2)
+                raise RuntimeError("later step failed")
+
+        with graph_store.transaction() as session:
+            assert session.query(File).count() == 0
+
+    def test_bulk_upsert_files_maintains_duplicate_groups(self, graph_store, db_session):
+        """Test upserted hashes join, move between and leave duplicate groups."""
+        from src.storage.models import DuplicateGroup, File, bulk_upsert_files
+
+        rows = [
+            {'id': File.generate_id(f'/tmp/{i}.jpg'), 'filename': f'{i}.jpg',
+             'original_path': f'/tmp/{i}.jpg', 'content_hash': 'h1'}
+            for i in range(3)
+        ]
+        session = db_session
+        bulk_upsert_files(session, rows)
+        group = session.query(DuplicateGroup).one()
+        assert (group.content_hash, group.member_count) == ('h1', 3)
+        assert session.query(File).filter(File.duplicate_group_id == group.id).count() == 3
+
+        rows[0]['content_hash'] = rows[1]['content_hash'] = 'h2'
+        bulk_upsert_files(session, rows[:2])
+        session.expire_all()
+        groups = {g.content_hash: g.member_count for g in session.query(DuplicateGroup)}
+        assert groups == {'h2': 2}
+        assert session.get(File, rows[2]['id']).duplicate_group_id is None
+
+    def test_bulk_link_helpers_skip_duplicates(self, graph_store, db_session):
+        """Test relationship and category inserts ignore existing pairs."""
+        from src.storage.models import (
+            File, FileRelationship, bulk_insert_file_relationships,
+            bulk_link_categories, bulk_upsert_files, file_categories
+        )
+
+        graph_store.get_or_create_category('Documents')
+        ids = [File.generate_id(p) for p in ('/tmp/a', '/tmp/b')]
+        session = db_session
+        bulk_upsert_files(session, [
+            {'id': file_id, 'filename': 'x', 'original_path': '/tmp/x'}
+            for file_id in ids
+        ])
+        edge = {'source_file_id': ids[0], 'target_file_id': ids[1],
+                'relationship_type': RelationshipType.DUPLICATE}
+        bulk_insert_file_relationships(session, [edge, edge])
+        link = {'file_id': ids[0], 'category_id': 1}
+        bulk_link_categories(session, [link])
+        bulk_link_categories(session, [link])
+
+        assert session.query(FileRelationship).count() == 1
+        assert session.query(file_categories).count() == 1
+
+
+class TestDimensionInterning:
+    """Test extension and MIME type interning."""
+
+    def test_files_share_dimension_rows(self, graph_store, db_session):
+        """Test each distinct value is stored once and filters still work."""
+        from src.storage.models import Extension, File, MimeType
+
+        for name in ('a.pdf', 'b.PDF', 'c.jpg'):
+            graph_store.add_file(f'/tmp/{name}', name, mime_type='application/pdf')
+
+        session = db_session
+        assert sorted(e.value for e in session.query(Extension)) == ['.jpg', '.pdf']
+        assert session.query(MimeType).count() == 1
+        pdfs = session.query(File).filter(File.file_extension == '.pdf').all()
+        assert sorted(f.filename for f in pdfs) == ['a.pdf', 'b.PDF']
+
+        pdf = pdfs[0]
+        pdf.mime_type = 'text/plain'
+        session.commit()
+        assert session.query(MimeType).count() == 2
+
+        assert graph_store.get_statistics()['extensions'] == {'.pdf': 2, '.jpg': 1}
+
+
+class TestEagerLoading:
+    """Test File relationships load without per-file queries."""
+
+    def test_list_with_relations_fixed_query_count(self, graph_store, query_counter):
+        """Test to_dict over many files costs the same queries as over one."""
+        from src.storage.models import File
+
+        ids = []
+        for i in range(10):
+            graph_store.add_file(f'/tmp/{i}.pdf', f'{i}.pdf')
+            file_id = File.generate_id(f'/tmp/{i}.pdf')
+            graph_store.add_file_to_category(file_id, 'Documents')
+            graph_store.add_file_to_company(file_id, 'Acme')
+            graph_store.add_file_to_person(file_id, 'Jane Doe')
+            ids.append(file_id)
+
+        def count_queries(file_ids):
+            query_counter.clear()
+            session = graph_store.get_session()
+            try:
+                dicts = [f.to_dict() for f in File.list_with_relations(session, file_ids)]
+            finally:
+                session.close()
+            return dicts, len(query_counter)
+
+        dicts, many = count_queries(ids)
+        _, one = count_queries(ids[:1])
+
+        assert len(dicts) == 10
+        assert all(d['categories'] == ['Documents'] for d in dicts)
+        assert all(d['people'] == ['Jane Doe'] for d in dicts)
+        assert many == one
+
+    def test_heavy_columns_deferred(self, graph_store, query_counter):
+        """Test bulky JSON columns load only when asked for."""
+        from sqlalchemy.orm import undefer_group
+        from src.storage.models import File, HEAVY_COLUMNS
+
+        graph_store.add_file('/tmp/a.jpg', 'a.jpg', schema_data={'@type': 'ImageObject'})
+
+        session = graph_store.get_session()
+        try:
+            query_counter.clear()
+            file = session.query(File).one()
+            assert all('schema_data' not in stmt for stmt in query_counter)
+            assert file.schema_data == {'@type': 'ImageObject'}
+            assert query_counter[-1].startswith('SELECT files.schema_data, files.image_classification')
+            session.expunge_all()
+
+            file = session.query(File).options(undefer_group(HEAVY_COLUMNS)).one()
+            session.expunge(file)
+            assert file.schema_data == {'@type': 'ImageObject'}
+        finally:
+            session.close()
+
+
+class TestInitDb:
+    """Test the standalone init_db session factory."""
+
+    def test_pragmas_applied(self, temp_db_path):
+        """Test new databases get the tuned page size and cache settings."""
+        from sqlalchemy import text
+        from src.storage.models import init_db
+
+        session = init_db(temp_db_path)
+        try:
+            assert session.execute(text("PRAGMA page_size")).scalar() == 8192
+            assert session.execute(text("PRAGMA cache_size")).scalar() == -65536
+            assert session.execute(text("PRAGMA journal_mode")).scalar() == 'wal'
+        finally:
+            session.close()
+
+    def test_cache_size_configurable(self, temp_db_path):
+        """Test callers can size the page cache for bulk loads."""
+        from sqlalchemy import text
+        from src.storage.models import init_db
+
+        session = init_db(temp_db_path, cache_size_mb=256)
+        try:
+            assert session.execute(text("PRAGMA cache_size")).scalar() == -262144
+        finally:
+            session.close()
+
+    def test_read_only_rejects_writes(self, temp_db_path):
+        """Test read-only sessions can query but not write."""
+        from sqlalchemy.exc import OperationalError
+        from src.storage.models import Category, init_db
+
+        session = init_db(temp_db_path, read_only=True)
+        try:
+            assert session.query(Category).count() == 0
+            session.add(Category(name='Documents'))
+            with pytest.raises(OperationalError):
+                session.commit()
+        finally:
+            session.rollback()
+            session.close()
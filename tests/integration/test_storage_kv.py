@@ -0,0 +1,90 @@
+"""
+Integration tests for KeyValueStorage.
+
+Tests key-value operations with real SQLite database.
+"""
+
+import pytest
+from datetime import datetime, timedelta
+
+from src.storage.kv_store import KeyValueStorage
+
+
+@pytest.fixture
+def kv_store(temp_db_path: str) -> KeyValueStorage:
+    """Create a KeyValueStorage instance with temp database."""
+    return KeyValueStorage(temp_db_path)
+
+
+class TestKeyValueBatchOperations:
+    """Test batched writes."""
+
+    def test_mset_inserts_and_overwrites(self, kv_store):
+        """Test mset writes new keys and overwrites existing ones."""
+        kv_store.set('a', 1)
+
+        kv_store.mset({'a': {'x': 1}, 'b': 'two'})
+
+        assert kv_store.mget(['a', 'b', 'missing']) == {'a': {'x': 1}, 'b': 'two'}
+
+    def test_mset_ttl(self, kv_store):
+        """Test mset applies the TTL to every key."""
+        kv_store.mset({'a': 1, 'b': 2}, ttl_seconds=60)
+
+        assert 0 < kv_store.ttl('a') <= 60
+        assert 0 < kv_store.ttl('b') <= 60
+
+    def test_hmset_many_across_hashes(self, kv_store):
+        """Test fields of several hashes are written in one call."""
+        kv_store.hset('report:1', 'summary', {'old': True}, namespace='stats')
+
+        kv_store.hmset_many([
+            ('report:1', 'summary', {'total': 1.5}, 'stats'),
+            ('report:1', 'roi', {'roi': 2.0}, 'stats'),
+            ('feature:ocr', 'report:1', {'invocations': 3}, 'stats'),
+        ])
+
+        assert kv_store.hgetall('report:1', namespace='stats') == {
+            'summary': {'total': 1.5},
+            'roi': {'roi': 2.0},
+        }
+        assert kv_store.hget('feature:ocr', 'report:1', namespace='stats') == {'invocations': 3}
+
+    def test_hmset_many_empty(self, kv_store):
+        """Test an empty batch is a no-op."""
+        assert kv_store.hmset_many([]) is True
+        assert kv_store.keys(namespace='stats') == []
+
+
+class TestKeyValueCleanup:
+    """Test TTL sweeps."""
+
+    def _expire(self, kv_store, namespace):
+        from sqlalchemy import update
+        from src.storage.models import KeyValueStore
+
+        with kv_store.session_scope() as session:
+            session.execute(
+                update(KeyValueStore)
+                .where(KeyValueStore.namespace == namespace)
+                .values(expires_at=datetime.utcnow() - timedelta(seconds=1))
+            )
+
+    def test_cleanup_expired_in_batches(self, kv_store):
+        """Test every expired key is removed across several batches."""
+        kv_store.mset({f'k{i}': i for i in range(5)}, ttl_seconds=60)
+        self._expire(kv_store, 'cache')
+        kv_store.set('permanent', 1)
+
+        assert kv_store.cleanup_expired(batch_size=2) == 5
+        assert kv_store.keys() == ['permanent']
+
+    def test_cleanup_expired_namespace(self, kv_store):
+        """Test a namespace sweep leaves other namespaces alone."""
+        kv_store.set('a', 1, namespace='cache', ttl_seconds=60)
+        kv_store.set('b', 1, namespace='session', ttl_seconds=60)
+        self._expire(kv_store, 'cache')
+        self._expire(kv_store, 'session')
+
+        assert kv_store.cleanup_expired(namespace='cache') == 1
+        assert kv_store.cleanup_expired() == 1
@@ -0,0 +1,707 @@
+"""
+Integration tests for JSONMigrator.
+
+Migrates small JSON result files into a real SQLite database.
+"""
+
+import hashlib
+import json
+import sqlite3
+import uuid
+import pytest
+from datetime import datetime
+from pathlib import Path
+from src.storage import migration
+from src.storage.graph_store import GraphStore
+
+from src.storage.migration import (
+    JSONMigrator, repack_json_columns, run_migration, _canonical_id_builder, _classify_report,
+    _compile_row_builder, _count_report, _load_json, _parse_report_timestamp, _session_id,
+    _stdlib_loads
+)
+from src.storage.models import (
+    File, Person, Location, Category, Company, FileStatus, NAMESPACES
+)
+
+
+@pytest.fixture
+def results_dir(temp_dir: Path) -> Path:
+    """Create a results directory with sample reports."""
+    results = temp_dir / "results"
+    results.mkdir()
+
+    report = {
+        'dry_run': False,
+        'total_files': 3,
+        'organized': 2,
+        'skipped': 1,
+        'errors': 0,
+        'results': [
+            {
+                'source': '/tmp/src/invoice.pdf',
+                'destination': '/tmp/dst/Financial/invoice.pdf',
+                'status': 'organized',
+                'category': 'Financial',
+                'subcategory': 'Invoices',
+                'company_name': 'Acme Corp',
+                'people_names': ['John Doe', 'Jane Smith'],
+                'schema': {'@type': 'DigitalDocument'},
+            },
+            {
+                'source': '/tmp/src/photo.jpg',
+                'destination': '/tmp/dst/Media/photo.jpg',
+                'status': 'organized',
+                'category': 'Media',
+                'people_names': ['john doe'],
+                'image_metadata': {
+                    'datetime': '2024-01-01T10:00:00',
+                    'gps_coordinates': [40.7128, -74.0060],
+                    'location_name': 'New York',
+                },
+            },
+            {
+                'source': '/tmp/src/notes.txt',
+                'status': 'skipped',
+                'category': 'uncategorized',
+            },
+            # Same file reported twice within one report
+            {
+                'source': '/tmp/src/notes.txt',
+                'status': 'skipped',
+            },
+            {'status': 'error'},
+        ],
+    }
+    (results / "content_organization_report_20240102_030405.json").write_text(json.dumps(report))
+
+    cost_report = {
+        'metadata': {'generated_at': '2024-01-02T03:04:05'},
+        'cost_summary': {'total_cost': 1.5, 'feature_breakdown': {'ocr': {'invocations': 3}}},
+        'roi_summary': {'roi': 2.0},
+    }
+    (results / "cost_report_20240102.json").write_text(json.dumps(cost_report))
+
+    (results / "model_evaluation.json").write_text(json.dumps({'accuracy': 0.9}))
+
+    return results
+
+
+@pytest.fixture
+def migrator(temp_db_path: str, results_dir: Path) -> JSONMigrator:
+    """Create a JSONMigrator over the sample results directory."""
+    return JSONMigrator(db_path=temp_db_path, results_dir=str(results_dir))
+
+
+class TestParseReportTimestamp:
+    """Test report filename timestamp parsing."""
+
+    def test_parses_fixed_width_timestamp(self):
+        """Test parsing a well-formed timestamp."""
+        assert _parse_report_timestamp('20240102_030405') == datetime(2024, 1, 2, 3, 4, 5)
+
+    @pytest.mark.parametrize('value', ['', '20240102030405', '2024-01-02_0304', '2024010a_030405',
+                                       '20241302_030405'])
+    def test_rejects_malformed_timestamp(self, value):
+        """Test malformed timestamps raise ValueError."""
+        with pytest.raises(ValueError):
+            _parse_report_timestamp(value)
+
+
+class TestLoadJson:
+    """Test memory-mapped JSON loading."""
+
+    def test_loads_file(self, temp_dir: Path):
+        """Test a report parses to the same value as json.loads."""
+        path = temp_dir / "report.json"
+        path.write_text(json.dumps({'results': [{'source': '/tmp/ü.txt'}]}))
+        assert _load_json(path) == {'results': [{'source': '/tmp/ü.txt'}]}
+
+    def test_stdlib_fallback_matches_json(self):
+        """Test the shared-decoder fallback parses like json.loads, BOM included."""
+        raw = json.dumps({'name': 'café', 'values': [1, 2.5, None]}).encode()
+        assert _stdlib_loads(raw) == json.loads(raw)
+        assert _stdlib_loads(b'\xef\xbb\xbf' + raw) == json.loads(raw)
+
+    def test_empty_file_raises(self, temp_dir: Path):
+        """Test an empty file raises a decode error rather than an mmap error."""
+        path = temp_dir / "empty.json"
+        path.touch()
+        with pytest.raises(ValueError):
+            _load_json(path)
+
+
+class TestCompileRowBuilder:
+    """Test generated file row builders."""
+
+    ROW_ARGS = ('file-id', FileStatus.ORGANIZED, 'session-id', None, None, None)
+
+    def test_specialized_and_generic_builders_agree(self):
+        """Test a shape-specific builder builds the same row as the generic one."""
+        result = {
+            'source': '/tmp/src/invoice.pdf',
+            'destination': '/tmp/dst/invoice.pdf',
+            'schema': {'@type': 'DigitalDocument'},
+        }
+        specialized = _compile_row_builder(frozenset(result))
+        generic = _compile_row_builder(frozenset())
+
+        row = specialized(result, *self.ROW_ARGS)
+        assert row == generic(result, *self.ROW_ARGS)
+        assert row['filename'] == 'invoice.pdf'
+        assert row['schema_type'] == 'DigitalDocument'
+        assert row['organization_reason'] is None
+        assert row['extracted_text_length'] == 0
+
+    def test_missing_promised_key_raises(self):
+        """Test a result without a promised key raises KeyError."""
+        builder = _compile_row_builder(frozenset({'source', 'destination'}))
+        with pytest.raises(KeyError):
+            builder({'source': '/tmp/a.txt'}, *self.ROW_ARGS)
+
+
+class TestSessionId:
+    """Test organization session ID derivation."""
+
+    def test_matches_sha256_of_path(self, temp_dir: Path):
+        """Test IDs stay compatible with previously migrated sessions."""
+        path = temp_dir / "content_organization_report_20240102_030405.json"
+        assert _session_id(path) == hashlib.sha256(str(path).encode()).hexdigest()
+        assert _session_id(path) == _session_id(path)
+
+
+class TestCountReport:
+    """Test report record counting."""
+
+    @pytest.mark.parametrize('streaming', [True, False])
+    def test_counts_total_files_and_results(self, results_dir: Path, monkeypatch, streaming):
+        """Test counts match the report contents, streamed or fully parsed."""
+        if streaming:
+            pytest.importorskip('ijson')
+        monkeypatch.setattr(migration, 'IJSON_AVAILABLE', streaming)
+        report = results_dir / "content_organization_report_20240102_030405.json"
+        assert _count_report(report) == (3, 5)
+
+    def test_missing_keys_count_as_zero(self, temp_dir: Path):
+        """Test a report without totals or results counts as empty."""
+        path = temp_dir / "content_organization_report_empty.json"
+        path.write_text('{"dry_run": true}')
+        assert _count_report(path) == (0, 0)
+
+
+class TestClassifyReport:
+    """Test result file classification."""
+
+    @pytest.mark.parametrize('filename, kind', [
+        ('content_organization_report_20240102_030405.json', 'organization'),
+        ('cost_report_20240102.json', 'cost'),
+        ('Monthly_COST_summary.json', 'cost'),
+        ('model_evaluation.json', 'other'),
+    ])
+    def test_classifies_by_filename(self, filename, kind):
+        """Test each result file lands in the right group."""
+        assert _classify_report(filename) == kind
+
+
+class TestJSONMigrator:
+    """Test migrating JSON result files."""
+
+    def test_migrate_all_stats(self, migrator):
+        """Test migration statistics."""
+        stats = migrator.migrate_all(verbose=False)
+
+        assert stats['sessions'] == 1
+        assert stats['files'] == 3
+        assert stats['categories'] == 2
+        assert stats['companies'] == 1
+        assert stats['people'] == 3
+        assert stats['locations'] == 1
+        assert stats['cost_reports'] == 1
+        assert stats['other_files'] == 1
+        assert stats.get('errors', 0) == 0
+
+    def test_migrate_without_ijson_matches_streaming(self, migrator, temp_dir, monkeypatch):
+        """Test whole-file parsing gives the same results as streaming."""
+        pytest.importorskip('ijson')
+        streamed = JSONMigrator(
+            db_path=str(temp_dir / "streamed.db"), results_dir=migrator.results_dir
+        ).migrate_all(verbose=False)
+
+        monkeypatch.setattr(migration, 'IJSON_AVAILABLE', False)
+
+        assert migrator.migrate_all(verbose=False) == streamed
+
+    def test_parallel_parsing_matches_serial(self, migrator, results_dir, temp_dir):
+        """Test parsing reports in a process pool gives the same results."""
+        second = json.loads(
+            (results_dir / "content_organization_report_20240102_030405.json").read_text()
+        )
+        second['results'] = [{'source': '/tmp/src/other.txt', 'status': 'organized'}]
+        (results_dir / "content_organization_report_20240103_030405.json").write_text(
+            json.dumps(second)
+        )
+        (results_dir / "content_organization_report_20240104_030405.json").write_text('{')
+
+        serial = JSONMigrator(
+            db_path=str(temp_dir / "serial.db"), results_dir=str(results_dir)
+        ).migrate_all(verbose=False)
+        parallel = migrator.migrate_all(verbose=False, workers=2)
+
+        assert parallel == serial
+        assert parallel['files'] == 4
+        assert parallel['errors'] == 1
+
+    def test_migrates_files_and_relationships(self, migrator):
+        """Test files are linked to their entities."""
+        migrator.migrate_all(verbose=False)
+
+        session = migrator.graph_store.get_session()
+        try:
+            invoice = session.query(File).filter(
+                File.id == File.generate_id('/tmp/src/invoice.pdf')
+            ).first()
+            assert invoice is not None
+            assert invoice.filename == 'invoice.pdf'
+            assert invoice.status == FileStatus.ORGANIZED
+            assert invoice.current_path == '/tmp/dst/Financial/invoice.pdf'
+            assert invoice.schema_type == 'DigitalDocument'
+            assert sorted(c.full_path for c in invoice.categories) == ['Financial/Invoices']
+            assert [c.name for c in invoice.companies] == ['Acme Corp']
+            assert sorted(p.normalized_name for p in invoice.people) == ['jane smith', 'john doe']
+
+            photo = session.query(File).filter(
+                File.id == File.generate_id('/tmp/src/photo.jpg')
+            ).first()
+            assert photo.exif_datetime == datetime(2024, 1, 1, 10, 0, 0)
+            assert photo.gps_latitude == 40.7128
+            assert [loc.name for loc in photo.locations] == ['New York']
+
+            notes = session.query(File).filter(
+                File.id == File.generate_id('/tmp/src/notes.txt')
+            ).first()
+            assert notes.status == FileStatus.SKIPPED
+            assert notes.categories == []
+
+            john = session.query(Person).filter(Person.normalized_name == 'john doe').one()
+            assert john.file_count == 2
+            assert session.query(Location).count() == 1
+            assert session.query(Company).one().file_count == 1
+            assert session.query(Category).filter(Category.name == 'Media').one().file_count == 1
+        finally:
+            session.close()
+
+    def test_migrated_files_are_searchable(self, migrator):
+        """Test files written by the migrator's Core upsert reach the search index."""
+        migrator.migrate_all(verbose=False)
+
+        results = migrator.graph_store.search_files('invoice')
+        assert [f.filename for f in results] == ['invoice.pdf']
+
+    def test_migration_is_idempotent(self, migrator):
+        """Test re-running the migration does not duplicate links."""
+        migrator.migrate_all(verbose=False)
+        stats = migrator.graph_store.get_statistics()
+
+        rerun = JSONMigrator(db_path=migrator.db_path, results_dir=str(migrator.results_dir))
+        rerun_stats = rerun.migrate_all(verbose=False)
+
+        assert rerun_stats.get('files', 0) == 0
+        assert rerun.graph_store.get_statistics()['total_files'] == stats['total_files']
+
+        session = rerun.graph_store.get_session()
+        try:
+            john = session.query(Person).filter(Person.normalized_name == 'john doe').one()
+            assert john.file_count == 2
+            assert len(john.files) == 2
+
+            invoice = session.get(File, File.generate_id('/tmp/src/invoice.pdf'))
+            assert invoice.status == FileStatus.ORGANIZED
+            assert invoice.current_path == '/tmp/dst/Financial/invoice.pdf'
+        finally:
+            session.close()
+
+    def test_rerun_updates_existing_files(self, migrator, results_dir):
+        """Test re-migrating a file updates its status but keeps a known path."""
+        migrator.migrate_all(verbose=False)
+
+        report_path = results_dir / "content_organization_report_20240102_030405.json"
+        report = json.loads(report_path.read_text())
+        report['results'] = [
+            {'source': '/tmp/src/invoice.pdf', 'status': 'error'},
+            {'source': '/tmp/src/notes.txt', 'status': 'organized',
+             'destination': '/tmp/dst/notes.txt'},
+        ]
+        report_path.write_text(json.dumps(report))
+
+        rerun = JSONMigrator(db_path=migrator.db_path, results_dir=str(results_dir))
+        assert rerun.migrate_all(verbose=False).get('files', 0) == 0
+
+        session = rerun.graph_store.get_session()
+        try:
+            invoice = session.get(File, File.generate_id('/tmp/src/invoice.pdf'))
+            assert invoice.status == FileStatus.ERROR
+            assert invoice.current_path == '/tmp/dst/Financial/invoice.pdf'
+
+            notes = session.get(File, File.generate_id('/tmp/src/notes.txt'))
+            assert notes.status == FileStatus.ORGANIZED
+            assert notes.current_path == '/tmp/dst/notes.txt'
+        finally:
+            session.close()
+
+    def test_stores_cost_and_generic_reports(self, migrator):
+        """Test cost and other reports land in the key-value store."""
+        migrator.migrate_all(verbose=False)
+
+        report_key = 'cost_report:2024-01-02T03:04:05'
+        assert migrator.kv_store.hget(report_key, 'summary', namespace='stats')['total_cost'] == 1.5
+        assert migrator.kv_store.hget(report_key, 'roi', namespace='stats') == {'roi': 2.0}
+        assert migrator.kv_store.hget(
+            'feature_stats:ocr', '2024-01-02T03:04:05', namespace='stats'
+        ) == {'invocations': 3}
+        assert migrator.kv_store.get(
+            'json_file:model_evaluation', namespace='metadata'
+        ) == {'accuracy': 0.9}
+
+    def test_verify_migration(self, migrator):
+        """Test verification compares JSON and database counts."""
+        migrator.migrate_all(verbose=False)
+
+        results = migrator.verify_migration(verbose=False)
+
+        assert results['json_files'] == 1
+        assert results['json_records'] == 5
+        assert results['db_files'] == 3
+
+    def test_verify_migration_uses_recorded_totals(self, migrator, results_dir):
+        """Test verification reads totals recorded during migration, not the reports."""
+        migrator.migrate_all(verbose=False)
+        assert migrator.kv_store.hgetall('verify:totals', namespace='audit') == {
+            'content_organization_report_20240102_030405': {'total_files': 3, 'records': 5}
+        }
+
+        # Totals live in the database, so a fresh migrator needs no re-read either
+        (results_dir / "content_organization_report_20240102_030405.json").write_text('{}')
+        assert migrator.verify_migration(verbose=False)['json_records'] == 5
+        fresh = JSONMigrator(db_path=migrator.db_path, results_dir=str(results_dir))
+        assert fresh.verify_migration(verbose=False)['json_records'] == 5
+
+    def test_verify_migration_reads_unrecorded_reports(self, migrator):
+        """Test reports without recorded totals are counted from the JSON."""
+        assert migrator.verify_migration(verbose=False)['json_records'] == 5
+
+
+class TestRepackJsonColumns:
+    """Test rewriting legacy JSON text as MessagePack."""
+
+    def test_repack_json_columns(self, migrator):
+        """Test JSON text rows are repacked and still read back unchanged."""
+        pytest.importorskip('msgpack')
+        migrator.kv_store.set('config', {'threshold': 0.5}, namespace='config')
+        conn = sqlite3.connect(migrator.db_path)
+        conn.execute("UPDATE key_value_store SET value = '{\"threshold\": 0.5}'")
+        conn.commit()
+        conn.close()
+
+        stats = repack_json_columns(migrator.db_path)
+
+        assert stats['key_value_store.value'] == 1
+        assert repack_json_columns(migrator.db_path)['key_value_store.value'] == 0
+        assert migrator.kv_store.get('config', namespace='config') == {'threshold': 0.5}
+
+    def test_repack_without_rowid_table(self, migrator):
+        """Test tables keyed without a rowid are repacked by primary key."""
+        pytest.importorskip('msgpack')
+        migrator.migrate_all(verbose=False)
+        source = File.generate_id('/tmp/src/invoice.pdf')
+        target = File.generate_id('/tmp/src/photo.jpg')
+        conn = sqlite3.connect(migrator.db_path)
+        conn.execute(
+            "INSERT INTO file_relationships "
+            "(source_file_id, relationship_type, target_file_id, extra_data) "
+            "VALUES (?, 'SIMILAR', ?, '{\"score\": 0.9}')",
+            (source, target)
+        )
+        conn.commit()
+        conn.close()
+
+        assert repack_json_columns(migrator.db_path)['file_relationships.extra_data'] == 1
+
+        conn = sqlite3.connect(migrator.db_path)
+        try:
+            kind = conn.execute("SELECT typeof(extra_data) FROM file_relationships").fetchone()[0]
+        finally:
+            conn.close()
+        assert kind == 'blob'
+
+    def test_repack_without_msgpack(self, migrator, monkeypatch):
+        """Test nothing is rewritten while values are still stored as JSON text."""
+        monkeypatch.setattr(migration, 'MSGPACK_AVAILABLE', False)
+        assert repack_json_columns(migrator.db_path) == {}
+
+
+class TestCanonicalIdBuilder:
+    """Test the namespace-bound UUID v5 builder."""
+
+    @pytest.mark.parametrize('name', ['Documents', '  ACME Corp ', 'José Núñez', ''])
+    def test_matches_uuid5(self, name):
+        """Test IDs equal uuid.uuid5 over the normalized name."""
+        build = _canonical_id_builder('person')
+        assert build(name) == str(uuid.uuid5(NAMESPACES['person'], name.lower().strip()))
+
+    def test_unknown_namespace(self):
+        """Test an unknown namespace is rejected up front."""
+        with pytest.raises(ValueError):
+            _canonical_id_builder('planet')
+
+
+class TestRunMigration:
+    """Test the canonical ID backfill migration."""
+
+    def test_backfills_missing_canonical_ids(self, migrator):
+        """Test people get deterministic canonical IDs; file IDs are generated by SQLite."""
+        migrator.migrate_all(verbose=False)
+
+        stats = run_migration(migrator.db_path)
+
+        assert 'files_backfilled' not in stats
+        assert stats['people_backfilled'] == 2
+
+        session = migrator.graph_store.get_session()
+        try:
+            file_id = File.generate_id('/tmp/src/invoice.pdf')
+            assert session.get(File, file_id).canonical_id == f"urn:sha256:{file_id}"
+            john = session.query(Person).filter(Person.normalized_name == 'john doe').one()
+            assert john.canonical_id == Person.generate_canonical_id('John Doe')
+        finally:
+            session.close()
+
+        # Nothing left to backfill on a second run
+        rerun_stats = run_migration(migrator.db_path)
+        assert not any(k.endswith('_backfilled') for k in rerun_stats)
+
+    def test_analyzes_after_backfill(self, migrator):
+        """Test planner statistics are gathered once the indexes exist."""
+        migrator.migrate_all(verbose=False)
+        run_migration(migrator.db_path)
+
+        conn = sqlite3.connect(migrator.db_path)
+        try:
+            indexes = {row[0] for row in conn.execute("SELECT idx FROM sqlite_stat1")}
+        finally:
+            conn.close()
+        assert 'ix_files_canonical_id' in indexes
+
+    def test_moves_legacy_extracted_text(self, migrator):
+        """Test text left in the old files column moves to its own table."""
+        migrator.migrate_all(verbose=False)
+        file_id = File.generate_id('/tmp/src/invoice.pdf')
+        conn = sqlite3.connect(migrator.db_path)
+        conn.execute("ALTER TABLE files ADD COLUMN extracted_text TEXT")
+        conn.execute("UPDATE files SET extracted_text = 'Invoice total' WHERE id = ?", (file_id,))
+        conn.commit()
+        conn.close()
+
+        assert run_migration(migrator.db_path)['extracted_text_moved'] == 1
+
+        session = migrator.graph_store.get_session()
+        try:
+            assert session.get(File, file_id).extracted_text == 'Invoice total'
+        finally:
+            session.close()
+        assert 'extracted_text_moved' not in run_migration(migrator.db_path)
+
+    def test_interns_legacy_extension_and_mime_type(self, migrator):
+        """Test string columns from older databases move to dimension rows."""
+        migrator.migrate_all(verbose=False)
+        file_id = File.generate_id('/tmp/src/invoice.pdf')
+        conn = sqlite3.connect(migrator.db_path)
+        conn.execute("ALTER TABLE files ADD COLUMN file_extension VARCHAR(20)")
+        conn.execute("ALTER TABLE files ADD COLUMN mime_type VARCHAR(100)")
+        conn.execute("UPDATE files SET file_extension = '.pdf'")
+        conn.execute("UPDATE files SET mime_type = 'application/pdf' WHERE id = ?", (file_id,))
+        conn.commit()
+        conn.close()
+
+        stats = run_migration(migrator.db_path)
+
+        assert stats['extension_id_interned'] == 3
+        assert stats['mime_type_id_interned'] == 1
+        session = migrator.graph_store.get_session()
+        try:
+            file = session.get(File, file_id)
+            assert (file.file_extension, file.mime_type) == ('.pdf', 'application/pdf')
+        finally:
+            session.close()
+        assert 'extension_id_interned' not in run_migration(migrator.db_path)
+
+    def test_legacy_tables_get_timestamp_triggers(self, temp_dir):
+        """Test tables without a schema default still get timestamps filled."""
+        db_path = str(temp_dir / "legacy.db")
+        conn = sqlite3.connect(db_path)
+        conn.execute(
+            "CREATE TABLE cost_records (id INTEGER PRIMARY KEY, feature_name VARCHAR(50), "
+            "processing_time_sec FLOAT, created_at DATETIME)"
+        )
+        conn.commit()
+        conn.close()
+
+        assert run_migration(db_path)['default_triggers'] == 1
+        assert 'default_triggers' not in run_migration(db_path)
+
+        conn = sqlite3.connect(db_path)
+        try:
+            conn.execute("INSERT INTO cost_records (feature_name, processing_time_sec) VALUES ('ocr', 1)")
+            assert conn.execute("SELECT created_at FROM cost_records").fetchone()[0] is not None
+        finally:
+            conn.close()
+
+    def test_legacy_files_get_no_canonical_id_trigger(self, temp_dir):
+        """Test generated columns are not mistaken for timestamp defaults."""
+        db_path = str(temp_dir / "legacy.db")
+        conn = sqlite3.connect(db_path)
+        conn.execute(
+            "CREATE TABLE files (id VARCHAR(64) PRIMARY KEY, canonical_id VARCHAR(100), "
+            "filename VARCHAR(255), original_path TEXT, content_hash VARCHAR(64), "
+            "db_created_at DATETIME)"
+        )
+        conn.commit()
+        conn.close()
+
+        run_migration(db_path)
+
+        conn = sqlite3.connect(db_path)
+        try:
+            triggers = {row[0] for row in conn.execute(
+                "SELECT name FROM sqlite_master WHERE type='trigger' AND tbl_name='files'"
+            )}
+        finally:
+            conn.close()
+        assert 'trg_files_db_created_at_default' in triggers
+        assert 'trg_files_canonical_id_default' not in triggers
+
+    def test_legacy_stored_canonical_id_is_filled(self, temp_dir):
+        """Test files added after upgrading a stored-column database get canonical IDs."""
+        db_path = str(temp_dir / "legacy.db")
+        conn = sqlite3.connect(db_path)
+        conn.execute(
+            "CREATE TABLE files (id VARCHAR(64) NOT NULL PRIMARY KEY, "
+            "canonical_id VARCHAR(100), source_ids JSON, filename VARCHAR(255) NOT NULL, "
+            "original_path TEXT NOT NULL, current_path TEXT, file_extension VARCHAR(20), "
+            "mime_type VARCHAR(100), file_size INTEGER, content_hash VARCHAR(64), "
+            "created_at DATETIME, modified_at DATETIME, organized_at DATETIME, "
+            "status VARCHAR(17), organization_reason TEXT, extracted_text TEXT, "
+            "extracted_text_length INTEGER, schema_type VARCHAR(50), schema_data JSON, "
+            "image_width INTEGER, image_height INTEGER, has_faces BOOLEAN, face_count INTEGER, "
+            "image_classification JSON, exif_datetime DATETIME, gps_latitude FLOAT, "
+            "gps_longitude FLOAT, processing_time_sec FLOAT, session_id VARCHAR(64), "
+            "db_created_at DATETIME, db_updated_at DATETIME)"
+        )
+        conn.execute("CREATE UNIQUE INDEX ix_files_canonical_id ON files (canonical_id)")
+        # Left behind by an earlier migration that treated the column as a timestamp
+        conn.execute(
+            "CREATE TRIGGER trg_files_canonical_id_default AFTER INSERT ON files "
+            "FOR EACH ROW WHEN NEW.canonical_id IS NULL BEGIN "
+            "UPDATE files SET canonical_id = CURRENT_TIMESTAMP WHERE rowid = NEW.rowid; END"
+        )
+        conn.execute(
+            "INSERT INTO files (id, filename, original_path) VALUES ('old', 'old.pdf', '/old.pdf')"
+        )
+        conn.commit()
+        conn.close()
+
+        assert run_migration(db_path)['files_backfilled'] == 1
+
+        store = GraphStore(db_path)
+        try:
+            for name in ('a.pdf', 'b.pdf'):
+                store.add_file(f'/tmp/{name}', name)
+        finally:
+            store.close()
+
+        conn = sqlite3.connect(db_path)
+        try:
+            rows = conn.execute("SELECT id, canonical_id FROM files").fetchall()
+        finally:
+            conn.close()
+        assert len(rows) == 3
+        assert all(canonical_id == f"urn:sha256:{file_id}" for file_id, canonical_id in rows)
+
+    def test_rebuilds_legacy_relationships_table(self, temp_dir):
+        """Test surrogate-keyed edges are copied into the composite-key table."""
+        db_path = str(temp_dir / "legacy.db")
+        conn = sqlite3.connect(db_path)
+        conn.execute(
+            "CREATE TABLE file_relationships (id INTEGER PRIMARY KEY, source_file_id VARCHAR(64), "
+            "target_file_id VARCHAR(64), relationship_type VARCHAR(11), confidence FLOAT, "
+            "extra_data TEXT, created_at DATETIME)"
+        )
+        conn.executemany(
+            "INSERT INTO file_relationships (source_file_id, target_file_id, relationship_type) "
+            "VALUES (?, ?, ?)",
+            [('a', 'b', 'DUPLICATE'), ('a', 'b', 'DUPLICATE'), ('b', 'a', 'SIMILAR')]
+        )
+        conn.commit()
+        conn.close()
+
+        assert run_migration(db_path)['relationships_rebuilt'] == 2
+        assert 'relationships_rebuilt' not in run_migration(db_path)
+
+        conn = sqlite3.connect(db_path)
+        try:
+            pk = [row[1] for row in conn.execute("PRAGMA table_info(file_relationships)") if row[5]]
+            assert pk == ['source_file_id', 'relationship_type', 'target_file_id']
+            assert conn.execute("SELECT COUNT(*) FROM file_relationships").fetchone()[0] == 2
+            assert conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE name='ix_filerel_tgt_type'"
+            ).fetchone()
+        finally:
+            conn.close()
+
+    def test_groups_legacy_duplicates(self, temp_dir):
+        """Test duplicate hashes become groups and their pairwise edges go away."""
+        db_path = str(temp_dir / "legacy.db")
+        conn = sqlite3.connect(db_path)
+        conn.execute(
+            "CREATE TABLE files (id VARCHAR(64) PRIMARY KEY, original_path TEXT, "
+            "content_hash VARCHAR(64))"
+        )
+        conn.executemany(
+            "INSERT INTO files VALUES (?, ?, ?)",
+            [('a', '/a', 'h1'), ('b', '/b', 'h1'), ('c', '/c', 'h2'), ('d', '/d', None)]
+        )
+        conn.execute(
+            "CREATE TABLE file_relationships (source_file_id VARCHAR(64), "
+            "target_file_id VARCHAR(64), relationship_type VARCHAR(11))"
+        )
+        conn.executemany(
+            "INSERT INTO file_relationships VALUES (?, ?, ?)",
+            [('a', 'b', 'DUPLICATE'), ('b', 'a', 'DUPLICATE'), ('a', 'c', 'DUPLICATE'),
+             ('a', 'c', 'DERIVED')]
+        )
+        conn.commit()
+        conn.close()
+
+        stats = run_migration(db_path)
+
+        assert stats['duplicate_groups_created'] == 1
+        assert stats['duplicate_edges_removed'] == 2
+        assert 'duplicate_groups_created' not in run_migration(db_path)
+
+        conn = sqlite3.connect(db_path)
+        try:
+            assert conn.execute(
+                "SELECT content_hash, canonical_file_id, member_count FROM duplicate_groups"
+            ).fetchall() == [('h1', 'a', 2)]
+            grouped = conn.execute(
+                "SELECT id FROM files WHERE duplicate_group_id IS NOT NULL ORDER BY id"
+            ).fetchall()
+            assert grouped == [('a',), ('b',)]
+            assert conn.execute("SELECT COUNT(*) FROM file_relationships").fetchone()[0] == 2
+        finally:
+            conn.close()
+
+    def test_dry_run_makes_no_changes(self, migrator):
+        """Test a dry run reports work without writing it."""
+        migrator.migrate_all(verbose=False)
+
+        assert run_migration(migrator.db_path, dry_run=True)['people_backfilled'] == 2
+        assert run_migration(migrator.db_path, dry_run=True)['people_backfilled'] == 2
@@ -8,6 +8,7 @@ import sys
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
 
+import copy
 import unittest
 from datetime import datetime
 from generators import (
@@ -25,10 +26,15 @@ from validator import SchemaValidator
 class TestDocumentGenerator(unittest.TestCase):
     """Test DocumentGenerator class."""
 
+    @classmethod
+    def setUpClass(cls):
+        """Build the shared fixtures once per class."""
+        cls._proto = DocumentGenerator()
+        cls.validator = SchemaValidator()
+
     def setUp(self):
         """Set up test fixtures."""
-        self.generator = DocumentGenerator()
-        self.validator = SchemaValidator()
+        self.generator = copy.copy(self._proto)
 
     def test_basic_document_creation(self):
         """Test creating a basic document schema."""
@@ -94,10 +100,15 @@ class TestDocumentGenerator(unittest.TestCase):
 class TestImageGenerator(unittest.TestCase):
     """Test ImageGenerator class."""
 
+    @classmethod
+    def setUpClass(cls):
+        """Build the shared fixtures once per class."""
+        cls._proto = ImageGenerator()
+        cls.validator = SchemaValidator()
+
     def setUp(self):
         """Set up test fixtures."""
-        self.generator = ImageGenerator()
-        self.validator = SchemaValidator()
+        self.generator = copy.copy(self._proto)
 
     def test_basic_image_creation(self):
         """Test creating a basic image schema."""
@@ -146,9 +157,14 @@ class TestImageGenerator(unittest.TestCase):
 class TestVideoGenerator(unittest.TestCase):
     """Test VideoGenerator class."""
 
+    @classmethod
+    def setUpClass(cls):
+        """Build the shared fixtures once per class."""
+        cls._proto = VideoGenerator()
+
     def setUp(self):
         """Set up test fixtures."""
-        self.generator = VideoGenerator()
+        self.generator = copy.copy(self._proto)
 
     def test_basic_video_creation(self):
         """Test creating a basic video schema."""
@@ -189,9 +205,14 @@ class TestVideoGenerator(unittest.TestCase):
 class TestAudioGenerator(unittest.TestCase):
     """Test AudioGenerator class."""
 
+    @classmethod
+    def setUpClass(cls):
+        """Build the shared fixtures once per class."""
+        cls._proto = AudioGenerator()
+
     def setUp(self):
         """Set up test fixtures."""
-        self.generator = AudioGenerator()
+        self.generator = copy.copy(self._proto)
 
     def test_basic_audio_creation(self):
         """Test creating a basic audio schema."""
@@ -243,9 +264,14 @@ class TestAudioGenerator(unittest.TestCase):
 class TestCodeGenerator(unittest.TestCase):
     """Test CodeGenerator class."""
 
+    @classmethod
+    def setUpClass(cls):
+        """Build the shared fixtures once per class."""
+        cls._proto = CodeGenerator()
+
     def setUp(self):
         """Set up test fixtures."""
-        self.generator = CodeGenerator()
+        self.generator = copy.copy(self._proto)
 
     def test_basic_code_creation(self):
         """Test creating a basic code schema."""
@@ -289,9 +315,14 @@ class TestCodeGenerator(unittest.TestCase):
 class TestDatasetGenerator(unittest.TestCase):
     """Test DatasetGenerator class."""
 
+    @classmethod
+    def setUpClass(cls):
+        """Build the shared fixtures once per class."""
+        cls._proto = DatasetGenerator()
+
     def setUp(self):
         """Set up test fixtures."""
-        self.generator = DatasetGenerator()
+        self.generator = copy.copy(self._proto)
 
     def test_basic_dataset_creation(self):
         """Test creating a basic dataset schema."""
@@ -338,9 +369,14 @@ class TestDatasetGenerator(unittest.TestCase):
 class TestArchiveGenerator(unittest.TestCase):
     """Test ArchiveGenerator class."""
 
+    @classmethod
+    def setUpClass(cls):
+        """Build the shared fixtures once per class."""
+        cls._proto = ArchiveGenerator()
+
     def setUp(self):
         """Set up test fixtures."""
-        self.generator = ArchiveGenerator()
+        self.generator = copy.copy(self._proto)
 
     def test_basic_archive_creation(self):
         """Test creating a basic archive schema."""
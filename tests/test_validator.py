@@ -15,68 +15,102 @@ from validator import SchemaValidator, ValidationReport, ValidationLevel
 class TestSchemaValidator(unittest.TestCase):
     """Test SchemaValidator class."""
 
-    def setUp(self):
-        """Set up test fixtures."""
-        self.validator = SchemaValidator()
+    @classmethod
+    def setUpClass(cls):
+        """Build one validator for the class; its compiled per-type code is reused."""
+        cls.validator = SchemaValidator()
+
+    def test_schema_checks(self):
+        """Test pass/fail outcomes of single schemas, validated as one batch."""
+        cases = [
+            # (description, schema, expected outcome)
+            ("valid schema", {
+                "@context": "https://schema.org",
+                "@type": "DigitalDocument",
+                "name": "Test Document",
+                "encodingFormat": "application/pdf"
+            }, 'valid'),
+            ("missing @context", {
+                "@type": "DigitalDocument",
+                "name": "Test Document"
+            }, 'errors'),
+            ("missing @type", {
+                "@context": "https://schema.org",
+                "name": "Test Document"
+            }, 'errors'),
+            # Missing 'name' which is required
+            ("missing required properties", {
+                "@context": "https://schema.org",
+                "@type": "DigitalDocument"
+            }, 'messages'),
+            ("invalid URL format", {
+                "@context": "https://schema.org",
+                "@type": "ImageObject",
+                "contentUrl": "not-a-valid-url",
+                "name": "Test Image"
+            }, 'errors'),
+            # Article missing headline, image, author, datePublished for Rich Results
+            ("rich results compatibility", {
+                "@context": "https://schema.org",
+                "@type": "Article",
+                "name": "Test"
+            }, 'errors or warnings'),
+            # VideoObject missing description, thumbnailUrl, uploadDate
+            ("video object requirements", {
+                "@context": "https://schema.org",
+                "@type": "VideoObject",
+                "name": "Test Video"
+            }, 'errors'),
+        ]
 
-    def test_valid_schema(self):
-        """Test validation of a valid schema."""
-        schema = {
-            "@context": "https://schema.org",
-            "@type": "DigitalDocument",
-            "name": "Test Document",
-            "encodingFormat": "application/pdf"
+        outcomes = {
+            'valid': lambda report: report.is_valid() and not report.has_errors(),
+            'errors': lambda report: report.has_errors(),
+            'errors or warnings': lambda report: report.has_errors() or report.has_warnings(),
+            'messages': lambda report: len(report.messages) > 0,
         }
 
-        report = self.validator.validate(schema)
-        self.assertTrue(report.is_valid())
-        self.assertFalse(report.has_errors())
+        reports = self.validator.validate_batch([schema for _, schema, _ in cases])
 
-    def test_missing_context(self):
-        """Test detection of missing @context."""
-        schema = {
-            "@type": "DigitalDocument",
-            "name": "Test Document"
-        }
+        for (description, _, outcome), report in zip(cases, reports):
+            with self.subTest(description):
+                self.assertTrue(outcomes[outcome](report), outcome)
 
-        report = self.validator.validate(schema)
-        self.assertTrue(report.has_errors())
-        errors = report.get_messages_by_level(ValidationLevel.ERROR)
+        # The missing-@context error names the key
+        errors = reports[1].get_messages_by_level(ValidationLevel.ERROR)
         self.assertTrue(any("@context" in msg.message for msg in errors))
 
-    def test_missing_type(self):
-        """Test detection of missing @type."""
+    def test_format_matched_by_property(self):
+        """Test a value valid for another format is still rejected."""
         schema = {
             "@context": "https://schema.org",
-            "name": "Test Document"
+            "@type": "ImageObject",
+            "contentUrl": "2024-01-01",
+            "dateCreated": "https://example.com",
+            "duration": "PT1H30M",
         }
 
         report = self.validator.validate(schema)
-        self.assertTrue(report.has_errors())
+        props = {msg.property_name for msg in report.messages
+                 if msg.level in (ValidationLevel.ERROR, ValidationLevel.WARNING)}
+        self.assertIn("contentUrl", props)
+        self.assertIn("dateCreated", props)
+        self.assertNotIn("duration", props)
 
-    def test_missing_required_properties(self):
-        """Test detection of missing required properties."""
-        schema = {
-            "@context": "https://schema.org",
-            "@type": "DigitalDocument"
-            # Missing 'name' which is required
-        }
-
-        report = self.validator.validate(schema)
-        # Should have warning about missing recommended properties
-        self.assertTrue(len(report.messages) > 0)
+    def test_format_results_memoized(self):
+        """Test a recurring URL is matched against the pattern once."""
+        from validator import _format_of
 
-    def test_invalid_url_format(self):
-        """Test detection of invalid URL format."""
-        schema = {
-            "@context": "https://schema.org",
-            "@type": "ImageObject",
-            "contentUrl": "not-a-valid-url",
-            "name": "Test Image"
-        }
+        logo = "https://example.com/logo-memo-test.png"
+        schemas = [
+            {"@context": "https://schema.org", "@type": "ImageObject", "contentUrl": logo}
+            for _ in range(3)
+        ]
 
-        report = self.validator.validate(schema)
-        self.assertTrue(report.has_errors())
+        self.validator.validate_batch(schemas)
+        hits = _format_of.cache_info().hits
+        self.validator.validate(schemas[0])
+        self.assertEqual(_format_of.cache_info().hits, hits + 1)
 
     def test_recommended_properties(self):
         """Test checking of recommended properties."""
@@ -107,30 +141,79 @@ class TestSchemaValidator(unittest.TestCase):
         # Nested schema should be validated
         self.assertIsNotNone(report)
 
-    def test_rich_results_compatibility(self):
-        """Test Google Rich Results compatibility checks."""
-        # Article without required fields for Rich Results
+    def test_nested_schema_errors_flagged_without_reports(self):
+        """Test erroneous nested schemas warn on the parent without full validation."""
+        from unittest import mock
+
         schema = {
             "@context": "https://schema.org",
             "@type": "Article",
-            "name": "Test"
-            # Missing headline, image, author, datePublished
+            "headline": "Test Article",
+            "author": {"@context": "https://schema.org", "@type": "Person", "name": "John Doe"},
+            "image": [{"@type": "ImageObject"}],
         }
 
-        report = self.validator.validate(schema)
-        self.assertTrue(report.has_errors() or report.has_warnings())
+        with mock.patch.object(self.validator, "validate", wraps=self.validator.validate) as spy:
+            report = spy(schema)
+        self.assertEqual(spy.call_count, 1)
 
-    def test_video_object_requirements(self):
-        """Test VideoObject requirements for Rich Results."""
-        schema = {
-            "@context": "https://schema.org",
-            "@type": "VideoObject",
-            "name": "Test Video"
-            # Missing description, thumbnailUrl, uploadDate
-        }
+        warned = [msg.message for msg in report.get_messages_by_level(ValidationLevel.WARNING)]
+        self.assertIn("Nested schema in 'image[0]' has validation errors", warned)
+        self.assertFalse(any("'author'" in message for message in warned))
 
-        report = self.validator.validate(schema)
-        self.assertTrue(report.has_errors())
+    def test_repeated_nested_schemas_checked_once(self):
+        """Test an author shared across a batch is only checked once."""
+        from unittest import mock
+
+        # Fresh nested-schema cache, not the one shared by the class
+        validator = SchemaValidator()
+
+        schemas = [
+            {
+                "@context": "https://schema.org",
+                "@type": "Article",
+                "headline": f"Article {i}",
+                "author": {"@type": "Person", "name": "John Doe"},
+                "image": {"@type": "ImageObject"},
+            }
+            for i in range(5)
+        ]
+
+        with mock.patch.object(validator, "_has_errors_fast",
+                               wraps=validator._has_errors_fast) as spy:
+            reports = validator.validate_batch(schemas)
+        self.assertEqual(spy.call_count, 2)
+
+        for report in reports:
+            warned = [msg.message for msg in report.get_messages_by_level(ValidationLevel.WARNING)]
+            self.assertIn("Nested schema 'image' has validation errors", warned)
+
+    def test_property_messages_keep_declared_order(self):
+        """Test missing and empty properties are reported in the type's declared order."""
+        dataset = {"@context": "https://schema.org", "@type": "Dataset", "description": ""}
+        image = {"@context": "https://schema.org", "@type": "ImageObject",
+                 "contentUrl": "https://example.com/a.jpg"}
+        expected_errors = ["Missing required property: name",
+                           "Required property is empty: description"]
+        expected_info = "Missing recommended properties: name, description"
+
+        # Compiled per-type validator
+        errors = [m.message for m in
+                  self.validator.validate(dataset).get_messages_by_level(ValidationLevel.ERROR)]
+        self.assertEqual(errors, expected_errors)
+        info = [m.message for m in
+                self.validator.validate(image).get_messages_by_level(ValidationLevel.INFO)]
+        self.assertIn(expected_info, info)
+
+        # Generic passes
+        report = ValidationReport("Dataset")
+        self.validator._validate_required_properties(
+            dataset, report, self.validator.SCHEMA_TYPES["Dataset"])
+        self.assertEqual([m.message for m in report.messages], expected_errors)
+        report = ValidationReport("ImageObject")
+        self.validator._check_recommended_properties(
+            image, report, self.validator.SCHEMA_TYPES["ImageObject"])
+        self.assertEqual([m.message for m in report.messages], [expected_info])
 
     def test_batch_validation(self):
         """Test batch validation of multiple schemas."""
@@ -152,6 +235,41 @@ class TestSchemaValidator(unittest.TestCase):
         reports = self.validator.validate_batch(schemas)
         self.assertEqual(len(reports), 2)
 
+    def test_parallel_batch_validation(self):
+        """Test parallel batch validation returns the serial results in order."""
+        schemas = [
+            {"@context": "https://schema.org", "@type": "DigitalDocument", "name": f"Doc {i}"}
+            for i in range(8)
+        ] + [{"@context": "https://schema.org", "@type": "ImageObject"}]
+        self.validator.validate(schemas[0])  # compiled validators must not be pickled
+
+        serial = self.validator.validate_batch(schemas)
+        for threads in (False, True):
+            reports = self.validator.validate_batch(schemas, workers=2, threads=threads)
+            self.assertEqual([r.is_valid() for r in reports], [r.is_valid() for r in serial])
+            self.assertEqual(
+                [[str(m) for m in r.messages] for r in reports],
+                [[str(m) for m in r.messages] for r in serial],
+            )
+
+    def test_fail_fast(self):
+        """Test fail-fast validation stops at the first error but keeps validity."""
+        schemas = [
+            {"@type": "VideoObject"},  # Missing @context, name, uploadDate, ...
+            {"@context": "https://schema.org", "@type": "DigitalDocument", "name": "Doc"},
+        ]
+
+        for workers in (1, 2):
+            reports = self.validator.validate_batch(schemas, workers=workers, fail_fast=True)
+            self.assertFalse(reports[0].is_valid())
+            self.assertEqual(reports[0].get_statistics()["errors"], 1)
+            self.assertEqual(reports[0].messages[-1].message, "Missing @context property")
+            self.assertTrue(reports[1].is_valid())
+            self.assertEqual(
+                [str(m) for m in reports[1].messages],
+                [str(m) for m in self.validator.validate(schemas[1]).messages],
+            )
+
     def test_summary_report(self):
         """Test generation of summary report."""
         schemas = [
@@ -175,6 +293,47 @@ class TestSchemaValidator(unittest.TestCase):
         self.assertIn("valid_schemas", summary)
         self.assertIn("success_rate", summary)
 
+    def test_streaming_summary_report(self):
+        """Test the streamed summary matches the list-based one."""
+        schemas = [
+            {"@context": "https://schema.org", "@type": "Person", "name": "Ada"},
+            {"@context": "https://schema.org", "@type": "ImageObject"},
+        ]
+        reports = self.validator.validate_batch(schemas)
+
+        summary, report_dicts = self.validator.generate_summary_report_streaming(
+            iter(reports)
+        )
+        streamed = list(report_dicts)
+
+        expected = self.validator.generate_summary_report(reports)
+        self.assertEqual(len(streamed), len(expected.pop("reports")))
+        self.assertEqual(summary, expected)
+        self.assertEqual(summary["invalid_schemas"], 1)
+
+    def test_compiled_validator_matches_generic_passes(self):
+        """Test the per-type compiled validator reports what the generic passes do."""
+        schema = {
+            "@context": "https://schema.org",
+            "@type": "VideoObject",
+            "name": "",
+            "uploadDate": "yesterday",
+            "thumbnailUrl": "not-a-url",
+            "width": "wide",
+        }
+
+        # Compilation is switched off below, so not the shared validator
+        validator = SchemaValidator()
+        report = validator.validate(schema)
+        self.assertIn("VideoObject", validator._compiled)
+
+        validator.COMPILED_TYPE_LIMIT = 0
+        validator._compiled.clear()
+        generic = validator.validate(schema)
+        self.assertEqual(validator._compiled, {})
+
+        self.assertEqual([str(m) for m in report.messages], [str(m) for m in generic.messages])
+
 
 class TestValidationReport(unittest.TestCase):
     """Test ValidationReport class."""
@@ -238,6 +397,41 @@ class TestValidationReport(unittest.TestCase):
         self.assertIn("statistics", report_dict)
         self.assertIn("messages", report_dict)
 
+    def test_to_json(self):
+        """Test JSON export matches the dictionary form."""
+        import json
+        self.report.add_error("Test error", "name", "Fix it")
+        self.report.finalize()
+
+        self.assertEqual(json.loads(self.report.to_json()), self.report.to_dict())
+        self.assertEqual(json.loads(self.report.to_json(indent=4)), self.report.to_dict())
+
+    def test_to_json_matches_stdlib_output(self):
+        """Test the orjson fast path writes exactly what json.dumps would."""
+        import json
+        from datetime import timedelta
+
+        self.report.add_error("Caf\u00e9 name", "name", "Fix it")
+        for seconds in (0.5, 5e-06):
+            self.report.end_time = self.report.start_time + timedelta(seconds=seconds)
+            for indent in (2, None, 4):
+                self.assertEqual(self.report.to_json(indent=indent),
+                                 json.dumps(self.report.to_dict(), indent=indent))
+
+        ascii_report = ValidationReport("Thing")
+        ascii_report.add_error("Missing name", "name")
+        ascii_report.end_time = ascii_report.start_time + timedelta(seconds=0.25)
+        self.assertEqual(ascii_report.to_json(), json.dumps(ascii_report.to_dict(), indent=2))
+
+    def test_message_timestamp_is_lazy(self):
+        """Test message timestamps are only taken when serialized."""
+        self.report.add_error("Test error")
+        message = self.report.messages[0]
+        self.assertIsNone(message.timestamp)
+
+        first = message.to_dict()["timestamp"]
+        self.assertEqual(message.to_dict()["timestamp"], first)
+
     def test_duration_tracking(self):
         """Test duration tracking."""
         import time
@@ -247,6 +441,17 @@ class TestValidationReport(unittest.TestCase):
         duration = self.report.get_duration()
         self.assertGreater(duration, 0)
 
+    def test_end_time(self):
+        """Test end_time is set by finalize and can still be assigned."""
+        from datetime import timedelta
+
+        self.assertIsNone(self.report.end_time)
+        self.report.finalize()
+        self.assertGreaterEqual(self.report.end_time, self.report.start_time)
+
+        self.report.end_time = self.report.start_time + timedelta(seconds=2)
+        self.assertAlmostEqual(self.report.get_duration(), 2.0)
+
 
 def run_tests():
     """Run all tests."""
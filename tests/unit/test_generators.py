@@ -200,6 +200,24 @@ class TestDocumentGenerator:
         doc.add_citation("Citation 2")
         assert len(doc.data["citation"]) == 2
 
+    def test_copy_is_independent(self):
+        """Test a copied generator can be filled in without touching the original."""
+        import copy
+
+        proto = DocumentGenerator("Article")
+        proto.add_citation("Citation 1")
+
+        doc = copy.copy(proto)
+        doc.add_citation("Citation 2")
+        doc.set_basic_info("Copy")
+
+        assert isinstance(doc, DocumentGenerator)
+        assert doc.document_type == "Article"
+        assert doc.get_id() == proto.get_id()
+        assert len(doc.data["citation"]) == 2
+        assert len(proto.data["citation"]) == 1
+        assert "name" not in proto.data
+
     def test_set_scholarly_info(self):
         """Test setting scholarly information."""
         doc = DocumentGenerator("ScholarlyArticle")
@@ -4,6 +4,7 @@ Unit tests for storage models.
 Tests model methods, ID generation, and serialization.
 """
 
+import hashlib
 import pytest
 import uuid
 
@@ -41,6 +42,13 @@ class TestFileModel:
         assert canonical.startswith("urn:sha256:")
         assert len(canonical) == len("urn:sha256:") + 64
 
+    def test_generate_canonical_id_matches_id(self):
+        """Test canonical ID wraps the same SHA-256 used for the file ID."""
+        path = "/tmp/test.jpg"
+
+        assert File.generate_canonical_id(path) == f"urn:sha256:{File.generate_id(path)}"
+        assert File.generate_id(path) == hashlib.sha256(path.encode()).hexdigest()
+
     def test_get_iri_with_canonical(self):
         """Test get_iri returns canonical_id when set."""
         file = File(
@@ -80,6 +88,35 @@ class TestFileModel:
         assert data['status'] == 'organized'
         assert '@id' in data
 
+    def test_to_dict_slim_skips_relationships(self):
+        """Test the slim form has no relationship keys and handles no status."""
+        file = File(id="abc123", filename="test.jpg", original_path="/tmp/test.jpg")
+
+        data = file.to_dict_slim()
+
+        assert data['status'] is None
+        assert 'categories' not in data
+
+    def test_to_dict_slim_is_generated(self):
+        """Test the generated serializer converts datetimes."""
+        from datetime import datetime
+
+        file = File(id="abc123", filename="test.jpg", original_path="/tmp/test.jpg",
+                    organized_at=datetime(2024, 1, 2, 3, 4, 5))
+
+        assert file.to_dict_slim()['organized_at'] == '2024-01-02T03:04:05'
+        assert file.to_dict_slim()['@id'] == 'urn:sha256:abc123'
+
+    def test_to_dict_full_uses_given_names(self):
+        """Test the full form takes relationship names from the caller."""
+        file = File(id="abc123", filename="test.jpg", original_path="/tmp/test.jpg")
+
+        data = file.to_dict_full(['Photos'], ['Acme'], [])
+
+        assert data['categories'] == ['Photos']
+        assert data['companies'] == ['Acme']
+        assert data['people'] == []
+
 
 class TestCategoryModel:
     """Tests for Category model."""
@@ -186,6 +223,14 @@ class TestPersonModel:
         assert Person.normalize_name("John Doe") == "john doe"
         assert Person.normalize_name("  JANE SMITH  ") == "jane smith"
 
+    def test_normalize_name_is_memoized(self):
+        """Test repeated names are served from the cache."""
+        Person.normalize_name("Memo Person")
+        hits = Person.normalize_name.cache_info().hits
+
+        assert Person.normalize_name("Memo Person") == "memo person"
+        assert Person.normalize_name.cache_info().hits == hits + 1
+
     def test_generate_canonical_id(self):
         """Test UUID v5 generation."""
         canonical = Person.generate_canonical_id("John Doe")
@@ -331,3 +376,93 @@ class TestNamespaces:
         expected = ['file', 'category', 'company', 'person', 'location', 'session', 'merge_event']
         for ns in expected:
             assert ns in NAMESPACES, f"Missing namespace: {ns}"
+
+
+class TestMsgPackType:
+    """Tests for the MessagePack column type."""
+
+    def test_round_trip(self):
+        """Test values survive a bind/result round trip in either format."""
+        from src.storage.models import MsgPackType
+
+        column_type = MsgPackType()
+        value = {'labels': ['cat', 'dog'], 'score': 0.75, 'nested': {'n': 1}}
+
+        stored = column_type.process_bind_param(value, None)
+
+        assert column_type.process_result_value(stored, None) == value
+        assert column_type.process_bind_param(None, None) is None
+
+    def test_reads_legacy_json_text(self):
+        """Test rows written by the old JSON column still decode."""
+        from src.storage.models import MsgPackType
+
+        assert MsgPackType().process_result_value('{"a": [1, 2]}', None) == {'a': [1, 2]}
+
+    def test_writes_messagepack_blob(self):
+        """Test values are packed as MessagePack when msgpack is installed."""
+        msgpack = pytest.importorskip('msgpack')
+        from src.storage.models import MsgPackType
+
+        stored = MsgPackType().process_bind_param({'a': [1, 2]}, None)
+
+        assert isinstance(stored, bytes)
+        assert msgpack.unpackb(stored) == {'a': [1, 2]}
+
+    def test_json_fallback(self, monkeypatch):
+        """Test values are written as JSON text without msgpack."""
+        from src.storage import models
+
+        monkeypatch.setattr(models, 'MSGPACK_AVAILABLE', False)
+        column_type = models.MsgPackType()
+
+        stored = column_type.process_bind_param({'a': [1, 2]}, None)
+
+        assert stored == '{"a": [1, 2]}'
+        assert column_type.process_result_value(stored, None) == {'a': [1, 2]}
+        with pytest.raises(RuntimeError):
+            column_type.process_result_value(b'\x81\xa1a\x01', None)
+
+
+class TestExtractedTextCompression:
+    """Tests for extracted text encoding."""
+
+    def test_round_trip(self):
+        """Test compressed text decodes to the original."""
+        from src.storage.models import compress_text, decompress_text
+
+        text = 'Invoice Nº 42 — total €1,000 ' * 100
+
+        assert decompress_text(compress_text(text)) == text
+
+    def test_writes_zstd_frame(self):
+        """Test text is zstd-compressed when zstandard is installed."""
+        zstandard = pytest.importorskip('zstandard')
+        from src.storage.models import compress_text
+
+        data = compress_text('hello ' * 100)
+
+        assert data[:4] == b'\x28\xb5\x2f\xfd'
+        assert zstandard.ZstdDecompressor().decompress(data) == b'hello ' * 100
+
+    def test_uncompressed_fallback(self, monkeypatch):
+        """Test text is stored as plain UTF-8 without zstandard."""
+        from src.storage import models
+
+        monkeypatch.setattr(models, 'ZSTD_AVAILABLE', False)
+
+        assert models.compress_text('Nº 42') == 'Nº 42'.encode('utf-8')
+        assert models.decompress_text('Nº 42'.encode('utf-8')) == 'Nº 42'
+        with pytest.raises(RuntimeError):
+            models.decompress_text(b'\x28\xb5\x2f\xfd' + b'\x00' * 8)
+
+    def test_file_property(self):
+        """Test File.extracted_text reads and writes through the side table."""
+        file = File(id='abc', filename='a.txt', original_path='/tmp/a.txt',
+                    extracted_text='hello')
+
+        assert file.extracted_text == 'hello'
+        assert file.extracted_text_blob.length == 5
+
+        file.extracted_text = None
+        assert file.extracted_text is None
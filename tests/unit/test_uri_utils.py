@@ -0,0 +1,155 @@
+"""
+Unit tests for URI generation utilities.
+
+Tests IRI generation, validation and normalization.
+"""
+
+import hashlib
+import sys
+import uuid
+from pathlib import Path
+
+import pytest
+
+from src.uri_utils import (
+    NAMESPACES, generate_canonical_iri, generate_canonical_iris, generate_file_iri,
+    generate_file_iris, is_valid_iri, is_valid_iri_batch,
+    normalize_to_iri, normalize_to_iri_batch
+)
+
+
+class TestGenerateCanonicalIri:
+    """Tests for generate_canonical_iri."""
+
+    @pytest.mark.parametrize('entity_type', sorted(NAMESPACES))
+    def test_matches_uuid5(self, entity_type):
+        """Test the inlined UUID v5 matches the uuid module."""
+        for name in ('Acme Corporation', '  José Núñez ', ''):
+            expected = uuid.uuid5(NAMESPACES[entity_type], name.lower().strip())
+            assert generate_canonical_iri(entity_type.upper(), name) == f"urn:uuid:{expected}"
+
+    def test_unknown_type(self):
+        """Test unknown entity types are rejected."""
+        with pytest.raises(ValueError):
+            generate_canonical_iri('planet', 'Mars')
+
+
+class TestGenerateFileIri:
+    """Tests for generate_file_iri path resolution."""
+
+    def test_matches_full_resolve(self, temp_dir, monkeypatch):
+        """Test cached directory resolution agrees with Path.resolve."""
+        real = temp_dir / 'real'
+        real.mkdir()
+        (real / 'doc.pdf').write_text('x')
+        (temp_dir / 'link').symlink_to(real)
+        (temp_dir / 'doc-link.pdf').symlink_to(real / 'doc.pdf')
+        monkeypatch.chdir(temp_dir)
+
+        for path in ['link/doc.pdf', str(temp_dir / 'link' / 'doc.pdf'), 'doc-link.pdf',
+                     'real/../real/doc.pdf', 'real/.', 'missing/new.pdf']:
+            expected = hashlib.sha256(str(Path(path).resolve()).encode()).hexdigest()
+            assert generate_file_iri(path) == f"urn:sha256:{expected}", path
+
+    def test_assume_absolute_skips_resolve(self):
+        """Test assume_absolute hashes the path exactly as given."""
+        path = '/not/resolved/../doc.pdf'
+        expected = hashlib.sha256(path.encode()).hexdigest()
+
+        assert generate_file_iri(path, assume_absolute=True) == f"urn:sha256:{expected}"
+        assert generate_file_iris([path], assume_absolute=True) == [f"urn:sha256:{expected}"]
+
+
+class TestHashFactories:
+    """Tests for the hash factories shared with storage."""
+
+    def test_storage_uses_same_factories(self):
+        """Test file IRIs and File.id hash paths the same way."""
+        from src.storage import models
+        from src import uri_utils
+
+        assert models._HASH_FACTORY is uri_utils._HASH_FACTORY
+        assert models._SHA1_FACTORY is uri_utils._SHA1_FACTORY
+
+    @pytest.mark.skipif(sys.version_info < (3, 9), reason="usedforsecurity needs Python 3.9")
+    def test_flagged_as_non_security(self):
+        """Test both factories pass usedforsecurity=False."""
+        from src import uri_utils
+
+        for factory in (uri_utils._HASH_FACTORY, uri_utils._SHA1_FACTORY):
+            assert factory.keywords == {'usedforsecurity': False}
+        assert uri_utils._HASH_FACTORY(b'x').hexdigest() == hashlib.sha256(b'x').hexdigest()
+
+
+class TestBatchGeneration:
+    """Tests for the batch IRI generators."""
+
+    def test_file_iris_match_single(self, temp_dir):
+        """Test batch file IRIs equal per-path IRIs."""
+        paths = [str(temp_dir / 'a.pdf'), 'relative/b.txt', str(temp_dir / 'a.pdf')]
+
+        assert generate_file_iris(paths) == [generate_file_iri(p) for p in paths]
+
+    def test_canonical_iris_match_single(self):
+        """Test batch canonical IRIs equal per-key IRIs."""
+        keys = ['Acme Corp', ' acme corp', 'Jane Doe']
+
+        assert generate_canonical_iris('Company', keys) == [
+            generate_canonical_iri('company', k) for k in keys
+        ]
+
+    def test_canonical_iris_unknown_type(self):
+        """Test the batch form rejects unknown types even when empty."""
+        with pytest.raises(ValueError):
+            generate_canonical_iris('planet', [])
+
+
+class TestIsValidIri:
+    """Tests for is_valid_iri and its batch form."""
+
+    VALUES = [
+        'https://example.com/entity/123', 'http://example.com', 'urn:uuid:abc',
+        'urn:sha256:abc', 'urn:isbn:123', 'urn:issn:123', 'urn:doi:10.1/x',
+        'urn:ietf:rfc:2648', 'ftp://example.com', 'just-a-string', '', None, 42,
+    ]
+
+    def test_is_valid_iri(self):
+        """Test accepted and rejected prefixes."""
+        assert [is_valid_iri(v) for v in self.VALUES] == [True] * 7 + [False] * 6
+
+    def test_batch_matches_single(self):
+        """Test the batch check agrees with the single check."""
+        assert is_valid_iri_batch(self.VALUES) == [is_valid_iri(v) for v in self.VALUES]
+
+
+class TestNormalizeToIri:
+    """Tests for normalize_to_iri and its batch form."""
+
+    VALUES = [
+        'https://example.com/entity',
+        '550e8400-e29b-41d4-a716-446655440000',
+        hashlib.sha256(b'x').hexdigest(),
+        hashlib.sha256(b'y').hexdigest().upper(),
+        'g' * 64,
+        'é' * 64,
+        'plain-name',
+    ]
+
+    def test_normalize_to_iri(self):
+        """Test each input format maps to the expected URN."""
+        sha = hashlib.sha256(b'x').hexdigest()
+
+        assert normalize_to_iri('https://example.com/entity') == 'https://example.com/entity'
+        assert normalize_to_iri(sha) == f'urn:sha256:{sha}'
+        assert normalize_to_iri('g' * 64).startswith('urn:uuid:')
+        assert normalize_to_iri('plain-name') == (
+            f"urn:uuid:{uuid.uuid5(NAMESPACES['file'], 'plain-name')}"
+        )
+
+    def test_batch_matches_single(self):
+        """Test the batch path agrees with per-value normalization."""
+        assert normalize_to_iri_batch(self.VALUES) == [normalize_to_iri(v) for v in self.VALUES]
+
+    def test_batch_empty(self):
+        """Test an empty batch returns an empty list."""
+        assert normalize_to_iri_batch([]) == []